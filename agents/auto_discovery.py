@@ -265,7 +265,10 @@ class AutoDiscovery:
             "date": datetime.now().isoformat()
         })
         
-        self.processed_file.write_text(json.dumps(processed, indent=2, ensure_ascii=False))
+        # Compact JSON, written to a sibling and renamed so readers never see a torn file
+        tmp = self.processed_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(processed, ensure_ascii=False, separators=(",", ":")))
+        os.replace(tmp, self.processed_file)
     
     def get_pain_hash(self, pain: Dict) -> str:
         """Generate unique hash for pain."""
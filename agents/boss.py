@@ -341,7 +341,7 @@ class TheBoss:
         # Start all
         for name, runner in runners.items():
             try:
-                runner.start()
+                await runner.start_async()
                 print(f"   🚀 {name.upper()} started")
             except Exception as e:
                 print(f"   ❌ {name} failed: {e}")
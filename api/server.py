@@ -150,7 +150,9 @@ def get_project_folders() -> List[str]:
     """Get list of all project folders."""
     if not PROJECTS_DIR.exists():
         return []
-    return [f.name for f in PROJECTS_DIR.iterdir() if f.is_dir()]
+    # DirEntry.is_dir() uses the type from the directory read, no stat per entry
+    with os.scandir(PROJECTS_DIR) as entries:
+        return [e.name for e in entries if e.is_dir()]
 
 def get_project_artifacts(project_name: str) -> Dict[str, str]:
     """Get all artifacts for a project."""
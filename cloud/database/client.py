@@ -4,10 +4,14 @@ Database Client — PostgreSQL Integration
 """
 
 import os
+import io
+import csv
 import json
+import struct
 import logging
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from decimal import Decimal
+from typing import Optional, Dict, List, Any, Iterator, Union
 from contextlib import contextmanager
 
 # PostgreSQL driver
@@ -21,6 +25,158 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("database")
 
+# Колонки market_pains в порядке COPY (SoA-буферы для add_pains_bulk)
+PAIN_COLUMNS = (
+    "title", "description", "category", "frequency",
+    "pain_score", "monetization_potential",
+    "sources", "keywords", "examples", "business_idea",
+    "estimated_price_min", "estimated_price_max",
+)
+# DEFAULT из schema.sql для колонок PAIN_COLUMNS (COPY их не применяет)
+PAIN_COLUMN_DEFAULTS = {"frequency": 1, "sources": []}
+PAIN_JSON_COLUMNS = frozenset({"sources"})
+PAIN_ARRAY_COLUMNS = frozenset({"keywords", "examples"})
+COPY_NULL = "\\N"
+
+
+def _pg_array(items: List[str]) -> str:
+    """Литерал TEXT[] для COPY"""
+    quoted = (
+        '"' + str(item).replace("\\", "\\\\").replace('"', '\\"') + '"'
+        for item in items
+    )
+    return "{" + ",".join(quoted) + "}"
+
+
+def _pains_csv_buffer(cols: List[List[Any]]) -> io.StringIO:
+    """Текстовый COPY (FORMAT csv) по параллельным колонкам PAIN_COLUMNS"""
+    cols = list(cols)
+    # JSONB/TEXT[] сериализуем поколоночно, один раз на пачку
+    for i, name in enumerate(PAIN_COLUMNS):
+        if name in PAIN_JSON_COLUMNS:
+            cols[i] = [
+                None if v is None else json.dumps(v, separators=(",", ":"))
+                for v in cols[i]
+            ]
+        elif name in PAIN_ARRAY_COLUMNS:
+            cols[i] = [None if v is None else _pg_array(v) for v in cols[i]]
+    
+    # csv.writer (C) экранирует табы/переводы строк/кавычки в описаниях;
+    # NULL передаем маркером \N, т.к. пустая строка — валидное значение
+    buf = io.StringIO()
+    writer = csv.writer(
+        buf, delimiter="\t", quoting=csv.QUOTE_MINIMAL, lineterminator="\n"
+    )
+    writer.writerows(
+        tuple(COPY_NULL if v is None else v for v in row)
+        for row in zip(*cols)
+    )
+    buf.seek(0)
+    return buf
+
+
+# ============================================================
+# BINARY COPY
+# ============================================================
+
+_PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_PGCOPY_TRAILER = struct.pack("!h", -1)
+_TEXT_OID = 25
+_NUMERIC_POS = 0x0000
+_NUMERIC_NEG = 0x4000
+
+
+def _bin_text(value: Any) -> bytes:
+    return str(value).encode("utf-8")
+
+
+def _bin_int4(value: Any) -> bytes:
+    return struct.pack("!i", int(value))
+
+
+def _bin_jsonb(value: Any) -> bytes:
+    # 1 байт версии формата JSONB + текст JSON
+    return b"\x01" + json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _bin_text_array(items: List[Any]) -> bytes:
+    if not items:
+        return struct.pack("!iii", 0, 0, _TEXT_OID)
+    has_null = any(item is None for item in items)
+    parts = [struct.pack("!iiiii", 1, int(has_null), _TEXT_OID, len(items), 1)]
+    for item in items:
+        if item is None:
+            parts.append(struct.pack("!i", -1))
+        else:
+            data = _bin_text(item)
+            parts.append(struct.pack("!i", len(data)))
+            parts.append(data)
+    return b"".join(parts)
+
+
+def _bin_numeric(value: Any) -> bytes:
+    """NUMERIC: цифры по основанию 10000, выровненные по десятичной точке"""
+    sign, digits, exp = Decimal(str(value)).as_tuple()
+    if not isinstance(exp, int):
+        raise ValueError(f"Unsupported numeric value: {value!r}")
+    
+    number = "".join(map(str, digits))
+    if exp >= 0:
+        int_part, frac_part = number + "0" * exp, ""
+    else:
+        number = number.rjust(-exp, "0")
+        int_part, frac_part = number[:exp], number[exp:]
+    dscale = len(frac_part)
+    
+    int_part = int_part.lstrip("0")
+    int_part = int_part.rjust(-(-len(int_part) // 4) * 4, "0")
+    frac_part = frac_part.ljust(-(-len(frac_part) // 4) * 4, "0")
+    groups = [int(int_part[i:i + 4]) for i in range(0, len(int_part), 4)]
+    weight = len(groups) - 1
+    groups += [int(frac_part[i:i + 4]) for i in range(0, len(frac_part), 4)]
+    
+    while groups and groups[0] == 0:
+        groups.pop(0)
+        weight -= 1
+    while groups and groups[-1] == 0:
+        groups.pop()
+    if not groups:
+        weight, sign = 0, 0
+    
+    return struct.pack(
+        f"!hhHH{len(groups)}H",
+        len(groups), weight, _NUMERIC_NEG if sign else _NUMERIC_POS, dscale, *groups
+    )
+
+
+# Бинарные кодеры в порядке PAIN_COLUMNS (должны совпадать с типами schema.sql)
+_PAIN_BINARY_ENCODERS = (
+    _bin_text, _bin_text, _bin_text, _bin_int4,
+    _bin_int4, _bin_int4,
+    _bin_jsonb, _bin_text_array, _bin_text_array, _bin_text,
+    _bin_numeric, _bin_numeric,
+)
+
+
+def _pains_binary_buffer(cols: List[List[Any]]) -> io.BytesIO:
+    """Бинарный COPY (FORMAT binary) по параллельным колонкам PAIN_COLUMNS"""
+    field_count = struct.pack("!h", len(PAIN_COLUMNS))
+    null_field = struct.pack("!i", -1)
+    
+    parts = [_PGCOPY_HEADER]
+    for row in zip(*cols):
+        parts.append(field_count)
+        for encode, value in zip(_PAIN_BINARY_ENCODERS, row):
+            if value is None:
+                parts.append(null_field)
+            else:
+                data = encode(value)
+                parts.append(struct.pack("!i", len(data)))
+                parts.append(data)
+    parts.append(_PGCOPY_TRAILER)
+    
+    return io.BytesIO(b"".join(parts))
+
 
 class DatabaseClient:
     """
@@ -46,14 +202,17 @@ class DatabaseClient:
         self.connection = None
     
     @contextmanager
-    def get_cursor(self, dict_cursor: bool = True):
-        """Context manager для курсора"""
+    def get_cursor(self, dict_cursor: bool = True, name: str = None):
+        """
+        Context manager для курсора.
+        name — серверный (именованный) курсор для потокового чтения.
+        """
         if not PSYCOPG2_AVAILABLE:
             raise ImportError("psycopg2 not installed")
         
         conn = psycopg2.connect(**self.config)
         cursor_factory = RealDictCursor if dict_cursor else None
-        cursor = conn.cursor(cursor_factory=cursor_factory)
+        cursor = conn.cursor(name=name, cursor_factory=cursor_factory)
         
         try:
             yield cursor
@@ -66,6 +225,19 @@ class DatabaseClient:
             cursor.close()
             conn.close()
     
+    def _stream_query(
+        self,
+        name: str,
+        query: str,
+        params: tuple = None,
+        itersize: int = 500
+    ) -> Iterator[Dict]:
+        """Построчно читает результат через серверный курсор (пачками по itersize)"""
+        with self.get_cursor(name=name) as cur:
+            cur.itersize = itersize
+            cur.execute(query, params)
+            yield from cur
+    
     # ============================================================
     # MARKET PAINS
     # ============================================================
@@ -104,12 +276,67 @@ class DatabaseClient:
             result = cur.fetchone()
             return result["id"] if result else None
     
-    def get_top_pains(self, limit: int = 10) -> List[Dict]:
-        """Получает топ болей по композитному скору"""
+    def add_pains_bulk(self, columns: Dict[str, List[Any]], binary: bool = True) -> int:
+        """
+        Массовая вставка болей через COPY FROM STDIN.
+        
+        Args:
+            columns: {колонка: список значений} — параллельные списки
+                     одинаковой длины по PAIN_COLUMNS; пропущенные колонки
+                     и None получают DEFAULT из schema.sql (или NULL)
+            binary: COPY в бинарном формате (JSONB без повторного парсинга
+                    на сервере); при ошибке кодирования — текстовый CSV
+        
+        Returns:
+            количество вставленных строк
+        """
+        row_count = max((len(col) for col in columns.values()), default=0)
+        if not row_count:
+            return 0
+        # COPY пишет NULL вместо DEFAULT: отсутствующие колонки и None
+        # в колонках с DEFAULT заполняем значениями из schema.sql
+        cols = []
+        for name in PAIN_COLUMNS:
+            values = columns.get(name) or [None] * row_count
+            if name in PAIN_COLUMN_DEFAULTS:
+                default = PAIN_COLUMN_DEFAULTS[name]
+                values = [default if v is None else v for v in values]
+            cols.append(values)
+        column_list = ", ".join(PAIN_COLUMNS)
+        
+        buf = None
+        if binary:
+            try:
+                buf = _pains_binary_buffer(cols)
+                query = f"COPY market_pains ({column_list}) FROM STDIN WITH (FORMAT binary)"
+            except (TypeError, ValueError, ArithmeticError) as e:
+                logger.warning(f"Binary COPY encoding failed, falling back to CSV: {e}")
+        if buf is None:
+            buf = _pains_csv_buffer(cols)
+            query = (
+                f"COPY market_pains ({column_list}) FROM STDIN "
+                f"WITH (FORMAT csv, DELIMITER E'\\t', NULL '{COPY_NULL}')"
+            )
+        
+        with self.get_cursor() as cur:
+            cur.copy_expert(query, buf)
+            return cur.rowcount
+    
+    def get_top_pains(
+        self,
+        limit: int = 10,
+        stream: bool = False
+    ) -> Union[List[Dict], Iterator[Dict]]:
+        """
+        Получает топ болей по композитному скору.
+        stream=True — итератор по серверному курсору вместо fetchall.
+        """
+        query = "SELECT * FROM v_top_pains LIMIT %s"
+        if stream:
+            return self._stream_query("stream_pains", query, (limit,))
+        
         with self.get_cursor() as cur:
-            cur.execute("""
-                SELECT * FROM v_top_pains LIMIT %s
-            """, (limit,))
+            cur.execute(query, (limit,))
             return cur.fetchall()
     
     def update_pain_status(self, pain_id: str, status: str):
@@ -156,12 +383,21 @@ class DatabaseClient:
                 WHERE id = %s
             """, (status, xp_earned, project_id))
     
-    def get_projects_by_status(self, status: str) -> List[Dict]:
-        """Получает проекты по статусу"""
+    def get_projects_by_status(
+        self,
+        status: str,
+        stream: bool = False
+    ) -> Union[List[Dict], Iterator[Dict]]:
+        """
+        Получает проекты по статусу.
+        stream=True — итератор по серверному курсору вместо fetchall.
+        """
+        query = "SELECT * FROM projects WHERE status = %s ORDER BY created_at DESC"
+        if stream:
+            return self._stream_query("stream_projects", query, (status,))
+        
         with self.get_cursor() as cur:
-            cur.execute("""
-                SELECT * FROM projects WHERE status = %s ORDER BY created_at DESC
-            """, (status,))
+            cur.execute(query, (status,))
             return cur.fetchall()
     
     # ============================================================
@@ -216,11 +452,12 @@ class DatabaseClient:
     def get_agent_stats(self, days: int = 7) -> List[Dict]:
         """Получает статистику агентов за последние N дней"""
         with self.get_cursor() as cur:
+            # Параметр вне строкового литерала: настоящий bind, а не подстановка в '...'
             cur.execute("""
                 SELECT * FROM v_agent_stats 
-                WHERE date >= CURRENT_DATE - INTERVAL '%s days'
+                WHERE date >= CURRENT_DATE - %s * INTERVAL '1 day'
                 ORDER BY date DESC, agent_type
-            """, (days,))
+            """, (int(days),))
             return cur.fetchall()
     
     # ============================================================
@@ -249,10 +486,17 @@ class DatabaseClient:
                     active_users = EXCLUDED.active_users
             """, metric)
     
-    def get_financial_dashboard(self) -> List[Dict]:
-        """Получает финансовый дашборд"""
+    def get_financial_dashboard(self, stream: bool = False) -> Union[List[Dict], Iterator[Dict]]:
+        """
+        Получает финансовый дашборд.
+        stream=True — итератор по серверному курсору вместо fetchall.
+        """
+        query = "SELECT * FROM v_financial_dashboard ORDER BY total_revenue DESC"
+        if stream:
+            return self._stream_query("stream_financials", query)
+        
         with self.get_cursor() as cur:
-            cur.execute("SELECT * FROM v_financial_dashboard ORDER BY total_revenue DESC")
+            cur.execute(query)
             return cur.fetchall()
 
 
@@ -13,6 +13,7 @@ import json
 import logging
 import subprocess
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional, Dict
 
 # Alibaba Cloud SDK
@@ -238,7 +239,8 @@ class AlibabaDeployer:
         self,
         instance_id: str = None,
         docker_image: str = None,
-        container_port: int = 8000
+        container_port: int = 8000,
+        build_id: str = None
     ) -> Dict:
         """
         Деплоит Docker контейнер на ECS.
@@ -249,11 +251,12 @@ class AlibabaDeployer:
             instance_id: ID существующего ECS инстанса
             docker_image: Docker образ для деплоя
             container_port: Порт контейнера
+            build_id: Метка сборки для заголовка скрипта
         """
         logger.info(f"🐳 Deploying to ECS: {docker_image}")
         
         # Генерируем deploy скрипт
-        deploy_script = self._generate_deploy_script(docker_image, container_port)
+        deploy_script = self._generate_deploy_script(docker_image, container_port, build_id)
         
         return {
             "instance_id": instance_id or "i-mock-instance",
@@ -263,35 +266,9 @@ class AlibabaDeployer:
             "status": "deployed"
         }
     
-    def _generate_deploy_script(self, image: str, port: int) -> str:
+    def _generate_deploy_script(self, image: str, port: int, build_id: str = None) -> str:
         """Генерирует bash скрипт для деплоя"""
-        return f"""#!/bin/bash
-# UZ AI Factory — ECS Deploy Script
-# Auto-generated at {datetime.now().isoformat()}
-
-set -e
-
-echo "🐳 Pulling Docker image..."
-docker pull {image}
-
-echo "🛑 Stopping existing container..."
-docker stop uz-ai-factory 2>/dev/null || true
-docker rm uz-ai-factory 2>/dev/null || true
-
-echo "🚀 Starting new container..."
-docker run -d \\
-    --name uz-ai-factory \\
-    --restart unless-stopped \\
-    -p {port}:{port} \\
-    -e ALIBABA_REGION={self.region} \\
-    -e REDIS_HOST=$REDIS_HOST \\
-    -e PG_HOST=$PG_HOST \\
-    -e GEMINI_API_KEY=$GEMINI_API_KEY \\
-    {image}
-
-echo "✅ Deployment complete!"
-docker ps | grep uz-ai-factory
-"""
+        return _render_deploy_script(image, port, self.region, build_id)
     
     # ============================================================
     # FULL PIPELINE
@@ -337,7 +314,7 @@ docker ps | grep uz-ai-factory
         results["steps"].append({"step": "https", "result": https_result})
         
         # 5. ECS Backend
-        ecs_result = self.deploy_to_ecs(docker_image=backend_image)
+        ecs_result = self.deploy_to_ecs(docker_image=backend_image, build_id=project_name)
         results["steps"].append({"step": "ecs", "result": ecs_result})
         
         results["status"] = "success"
@@ -351,6 +328,45 @@ docker ps | grep uz-ai-factory
         return results
 
 
+# ============================================================
+# TEMPLATES
+# ============================================================
+
+@lru_cache(maxsize=32)
+def _render_deploy_script(image: str, port: int, region: str, build_id: str = None) -> str:
+    """
+    Рендерит deploy скрипт. Чистая функция от аргументов —
+    без времени генерации, поэтому результат кэшируется и идемпотентен.
+    """
+    return f"""#!/bin/bash
+# UZ AI Factory — ECS Deploy Script
+# Build: {build_id or "unversioned"}
+
+set -e
+
+echo "🐳 Pulling Docker image..."
+docker pull {image}
+
+echo "🛑 Stopping existing container..."
+docker stop uz-ai-factory 2>/dev/null || true
+docker rm uz-ai-factory 2>/dev/null || true
+
+echo "🚀 Starting new container..."
+docker run -d \\
+    --name uz-ai-factory \\
+    --restart unless-stopped \\
+    -p {port}:{port} \\
+    -e ALIBABA_REGION={region} \\
+    -e REDIS_HOST=$REDIS_HOST \\
+    -e PG_HOST=$PG_HOST \\
+    -e GEMINI_API_KEY=$GEMINI_API_KEY \\
+    {image}
+
+echo "✅ Deployment complete!"
+docker ps | grep uz-ai-factory
+"""
+
+
 # ============================================================
 # CLI
 # ============================================================
@@ -8,27 +8,38 @@ Scout Agent — Alibaba Function Compute
 """
 
 import json
+import time
+import importlib
+import asyncio
 import hashlib
 import logging
+from types import MappingProxyType
+from functools import lru_cache
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple, Callable
 
-# Alibaba FC SDK
+# Fast JSON
 try:
-    import redis
-    REDIS_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    REDIS_AVAILABLE = False
+    ORJSON_AVAILABLE = False
+
+
+@lru_cache(maxsize=None)
+def optional_import(module_name: str):
+    """
+    Ленивый импорт тяжелых SDK (redis, google.generativeai, psycopg2-клиент).
+    На холодном старте FC модуль грузится только если путь кода его требует.
+    Возвращает модуль или None, если пакет не установлен.
+    """
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
 
-# Gemini API
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
 
-# Logging
-logging.basicConfig(level=logging.INFO)
+# Logging (уровень и handlers настраивает рантайм FC)
 logger = logging.getLogger("scout_agent")
 
 
@@ -36,6 +47,49 @@ logger = logging.getLogger("scout_agent")
 # REDIS TASK QUEUE
 # ============================================================
 
+def json_bytes(obj: Any) -> bytes:
+    """JSON в bytes: orjson, если доступен, иначе компактный stdlib json"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def dumps_task(task: dict) -> bytes:
+    """Сериализует payload задачи"""
+    return json_bytes(task)
+
+
+def loads_task(raw: bytes) -> dict:
+    """Десериализует payload задачи (bytes из Redis без decode_responses)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Пулы живут на уровне модуля: теплые вызовы FC переиспользуют соединения
+_REDIS_POOLS: Dict[tuple, Any] = {}
+
+
+def get_redis_pool(host: str, port: int, password: str, db: int = 0):
+    """Возвращает (и кэширует) пул соединений Redis.
+    Парсер hiredis (C) подхватывается redis-py автоматически, если установлен."""
+    key = (host, port, password, db)
+    pool = _REDIS_POOLS.get(key)
+    if pool is None:
+        pool = optional_import("redis").ConnectionPool(
+            host=host,
+            port=port,
+            password=password,
+            db=db,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+            socket_keepalive=True,
+            max_connections=8,
+        )
+        _REDIS_POOLS[key] = pool
+    return pool
+
+
 class TaskQueue:
     """
     Redis-based Task Queue для дедупликации работы агентов.
@@ -44,26 +98,42 @@ class TaskQueue:
     
     def __init__(self, host: str, port: int, password: str, db: int = 0):
         self.redis_client = None
-        if REDIS_AVAILABLE and host:
+        redis = optional_import("redis") if host else None
+        if redis:
             try:
                 self.redis_client = redis.Redis(
-                    host=host,
-                    port=port,
-                    password=password,
-                    db=db,
-                    decode_responses=True,
-                    socket_timeout=5,
+                    connection_pool=get_redis_pool(host, port, password, db)
                 )
                 self.redis_client.ping()
                 logger.info("✅ Redis connected")
             except Exception as e:
-                logger.warning(f"⚠️ Redis connection failed: {e}")
+                logger.warning("⚠️ Redis connection failed: %s", e)
                 self.redis_client = None
     
     def _generate_task_id(self, task_type: str, data: dict) -> str:
-        """Генерирует уникальный ID задачи"""
-        content = f"{task_type}:{json.dumps(data, sort_keys=True)}"
-        return hashlib.md5(content.encode()).hexdigest()[:12]
+        """Генерирует уникальный ID задачи (12 hex = 6 байт blake2b)"""
+        if ORJSON_AVAILABLE:
+            payload = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+        else:
+            # Тот же байтовый вид, что и у orjson
+            payload = json.dumps(
+                data, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+            ).encode()
+        content = task_type.encode() + b":" + payload
+        return hashlib.blake2b(content, digest_size=6).hexdigest()
+    
+    @staticmethod
+    def _pending_key(task_type: str) -> str:
+        """Sorted set ожидающих задач: member = task_id, score = время истечения TTL"""
+        return f"pending_z:{task_type}"
+    
+    def _task_payload(self, data: dict) -> bytes:
+        """Сериализует новую задачу"""
+        return dumps_task({
+            "data": data,
+            "created_at": datetime.now().isoformat(),
+            "status": "pending"
+        })
     
     def add_task(self, task_type: str, data: dict, ttl_hours: int = 24) -> bool:
         """
@@ -76,71 +146,129 @@ class TaskQueue:
         task_id = self._generate_task_id(task_type, data)
         key = f"task:{task_type}:{task_id}"
         
-        # Проверяем существование
-        if self.redis_client.exists(key):
-            logger.info(f"⏭️ Task already exists: {task_id}")
-            return False
-        
-        # Добавляем с TTL
-        self.redis_client.setex(
+        # SET NX EX — проверка и вставка за один атомарный запрос
+        ok = self.redis_client.set(
             key,
-            timedelta(hours=ttl_hours),
-            json.dumps({
-                "data": data,
-                "created_at": datetime.now().isoformat(),
-                "status": "pending"
-            })
+            self._task_payload(data),
+            nx=True,
+            ex=timedelta(hours=ttl_hours),
         )
-        logger.info(f"✅ Task added: {task_id}")
+        if not ok:
+            logger.info("⏭️ Task already exists: %s", task_id)
+            return False
+        
+        expires_at = time.time() + ttl_hours * 3600
+        self.redis_client.zadd(self._pending_key(task_type), {task_id: expires_at})
+        logger.info("✅ Task added: %s", task_id)
         return True
     
+    def add_tasks_bulk(
+        self,
+        items: List[Tuple[str, dict]],
+        ttl_hours: int = 24
+    ) -> List[bool]:
+        """
+        Добавляет пачку задач за один round-trip (pipeline).
+        items: список пар (task_type, data).
+        Возвращает список флагов «задача новая» в том же порядке.
+        """
+        if not self.redis_client:
+            return [True] * len(items)
+        if not items:
+            return []
+        
+        ttl = timedelta(hours=ttl_hours)
+        task_ids = [self._generate_task_id(task_type, data) for task_type, data in items]
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            for (task_type, data), task_id in zip(items, task_ids):
+                pipe.set(
+                    f"task:{task_type}:{task_id}",
+                    self._task_payload(data),
+                    nx=True,
+                    ex=ttl,
+                )
+            added = [bool(ok) for ok in pipe.execute()]
+            
+            # Индексируем только реально новые задачи
+            if any(added):
+                expires_at = time.time() + ttl_hours * 3600
+                for (task_type, _), task_id, is_new in zip(items, task_ids, added):
+                    if is_new:
+                        pipe.zadd(self._pending_key(task_type), {task_id: expires_at})
+                pipe.execute()
+        return added
+    
     def complete_task(self, task_type: str, data: dict):
         """Помечает задачу как выполненную"""
-        if not self.redis_client:
+        self.complete_tasks_bulk([(task_type, data)])
+    
+    def complete_tasks_bulk(self, items: List[Tuple[str, dict]]):
+        """Помечает пачку задач выполненными: один pipeline на чтение, один на запись"""
+        if not self.redis_client or not items:
             return
         
-        task_id = self._generate_task_id(task_type, data)
-        key = f"task:{task_type}:{task_id}"
+        task_ids = [self._generate_task_id(task_type, data) for task_type, data in items]
+        keys = [f"task:{task_type}:{task_id}" for (task_type, _), task_id in zip(items, task_ids)]
+        
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(key)
+            raws = pipe.execute()
+            
+            completed_at = datetime.now().isoformat()
+            for (task_type, _), task_id, key, raw in zip(items, task_ids, keys, raws):
+                if raw is not None:
+                    task = loads_task(raw)
+                    task["status"] = "completed"
+                    task["completed_at"] = completed_at
+                    pipe.setex(key, timedelta(hours=48), dumps_task(task))
+                pipe.zrem(self._pending_key(task_type), task_id)
+            pipe.execute()
+    
+    def _prune_pending(self, task_type: str) -> str:
+        """Удаляет из индекса задачи с истекшим TTL, возвращает ключ индекса"""
+        pending_key = self._pending_key(task_type)
+        self.redis_client.zremrangebyscore(pending_key, 0, time.time())
+        return pending_key
+    
+    def get_pending_ids(self, task_type: str) -> List[str]:
+        """ID ожидающих задач — O(pending), без обхода keyspace"""
+        if not self.redis_client:
+            return []
         
-        if self.redis_client.exists(key):
-            task = json.loads(self.redis_client.get(key))
-            task["status"] = "completed"
-            task["completed_at"] = datetime.now().isoformat()
-            self.redis_client.setex(key, timedelta(hours=48), json.dumps(task))
+        pending_key = self._prune_pending(task_type)
+        return [
+            m.decode() if isinstance(m, bytes) else m
+            for m in self.redis_client.zrange(pending_key, 0, -1)
+        ]
     
     def get_pending_count(self, task_type: str) -> int:
         """Количество ожидающих задач"""
         if not self.redis_client:
             return 0
         
-        pattern = f"task:{task_type}:*"
-        count = 0
-        for key in self.redis_client.scan_iter(pattern):
-            task = json.loads(self.redis_client.get(key))
-            if task.get("status") == "pending":
-                count += 1
-        return count
+        return self.redis_client.zcard(self._prune_pending(task_type))
 
 
 # ============================================================
 # TREND SOURCES
 # ============================================================
 
-TREND_SOURCES = [
+TREND_SOURCES = (
     # Google Trends — без API
-    {"type": "google_trends", "region": "UZ", "keywords": [
+    MappingProxyType({"type": "google_trends", "region": "UZ", "keywords": (
         "работа на дому", "фриланс", "онлайн заработок",
         "DTM подготовка", "IT курсы", "кредит онлайн",
-    ]},
+    )}),
     # YouTube — API free tier
-    {"type": "youtube", "region": "UZ", "queries": [
+    MappingProxyType({"type": "youtube", "region": "UZ", "queries": (
         "qanday pul ishlash", "biznes g'oyalar",
-    ]},
+    )}),
     # Telegram — public channels
-    {"type": "telegram", "channels": [
+    MappingProxyType({"type": "telegram", "channels": (
         "@tashkent_help", "@ishbilish", "@freelanceuz",
-    ]},
-]
+    )}),
+)
 
 
 # ============================================================
@@ -155,43 +283,183 @@ class PainClassifier:
     
     SYSTEM_PROMPT = """You are a market researcher for Uzbekistan.
 Analyze the text and extract user pains that could be monetized.
-Return JSON: {"pains": [{"text": "...", "category": "...", "score": 1-10}]}
+Each text starts with its [index]; set "idx" to the index of the text the pain comes from.
+Return JSON: {"pains": [{"text": "...", "category": "...", "score": 1-10, "idx": 0}]}
 Categories: work, education, finance, tech, health, housing, shopping, family
 Be very brief. Max 5 pains per request."""
 
+    BATCH_SIZE = 10  # Текстов на один запрос
+    MAX_CONCURRENCY = 5  # Параллельных запросов к Gemini
+    
+    # Structured output: Gemini отдает чистый JSON без ```json обертки
+    GENERATION_CONFIG = {
+        "max_output_tokens": 256,
+        "temperature": 0.3,
+        "response_mime_type": "application/json",
+        "response_schema": {
+            "type": "object",
+            "properties": {
+                "pains": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "text": {"type": "string"},
+                            "category": {"type": "string"},
+                            "score": {"type": "integer"},
+                            "idx": {"type": "integer"},
+                        },
+                        "required": ["text", "category", "score"],
+                    },
+                },
+            },
+            "required": ["pains"],
+        },
+    }
+
     def __init__(self, api_key: str):
         self.model = None
-        if GEMINI_AVAILABLE and api_key:
+        genai = optional_import("google.generativeai") if api_key else None
+        if genai:
             try:
                 genai.configure(api_key=api_key)
-                self.model = genai.GenerativeModel('gemini-1.5-flash')
+                self.model = genai.GenerativeModel(
+                    'gemini-1.5-flash',
+                    generation_config=self.GENERATION_CONFIG,
+                )
                 logger.info("✅ Gemini connected")
             except Exception as e:
-                logger.warning(f"⚠️ Gemini init failed: {e}")
+                logger.warning("⚠️ Gemini init failed: %s", e)
     
     def classify(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Классифицирует тексты и извлекает боли (синхронная обертка для CLI)"""
+        if not self.model or not texts:
+            return []
+        return asyncio.run(self.classify_async(texts))
+    
+    async def classify_async(self, texts: List[str]) -> List[Dict[str, Any]]:
         """Классифицирует тексты и извлекает боли"""
         if not self.model or not texts:
             return []
         
-        # Объединяем тексты для экономии токенов
-        combined = "\n---\n".join(texts[:10])  # Макс 10 за раз
+        # Объединяем тексты для экономии токенов, [i] — для атрибуции болей
+        combined = "\n---\n".join(
+            f"[{i}] {text}" for i, text in enumerate(texts[:self.BATCH_SIZE])
+        )
         
         try:
-            response = self.model.generate_content(
-                f"{self.SYSTEM_PROMPT}\n\nTexts:\n{combined}",
-                generation_config={
-                    "max_output_tokens": 256,
-                    "temperature": 0.3,
-                }
+            response = await self.model.generate_content_async(
+                f"{self.SYSTEM_PROMPT}\n\nTexts:\n{combined}"
             )
-            
-            # Парсим JSON из ответа
-            result = json.loads(response.text)
-            return result.get("pains", [])
+            raw = response.text
         except Exception as e:
-            logger.error(f"❌ Gemini classify error: {e}")
+            logger.error("❌ Gemini classify error: %s", e)
             return []
+        
+        return self.parse_pains(raw)
+    
+    @staticmethod
+    def parse_pains(raw: str) -> List[Dict[str, Any]]:
+        """Разбирает ответ модели (граница доверия: ответ может быть невалидным)"""
+        try:
+            result = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError — подкласс
+            logger.error("❌ Gemini returned invalid JSON (%s): %r", e, raw[:200])
+            return []
+        
+        pains = result.get("pains", []) if isinstance(result, dict) else []
+        valid = []
+        for pain in pains:
+            if not isinstance(pain, dict) or not isinstance(pain.get("text"), str) or not pain["text"]:
+                continue
+            score = pain.get("score")
+            # bool — подкласс int, а "7" от модели — допустимая оценка
+            if isinstance(score, bool) or not isinstance(score, (int, str)):
+                continue
+            try:
+                score = int(score)
+            except ValueError:
+                continue
+            pain["score"] = min(max(score, 1), 10)
+            valid.append(pain)
+        return valid
+    
+    async def classify_many(self, text_groups: List[List[str]]) -> List[List[Dict[str, Any]]]:
+        """
+        Классифицирует тексты всех групп (источников) общими пачками.
+        Тексты склеиваются в один список, режутся на пачки по BATCH_SIZE —
+        запросов столько, сколько пачек, а не групп. Пачки уходят в Gemini
+        параллельно, но не больше MAX_CONCURRENCY запросов (RPM квота).
+        Боли раскладываются обратно по группам через поле idx.
+        """
+        if not self.model:
+            return [[] for _ in text_groups]
+        
+        batch_size = self.BATCH_SIZE
+        all_texts = []
+        owners = []  # индекс группы для каждого текста
+        for group_idx, texts in enumerate(text_groups):
+            all_texts.extend(texts)
+            owners.extend([group_idx] * len(texts))
+        
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+        
+        async def run(batch: List[str]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self.classify_async(batch)
+        
+        starts = range(0, len(all_texts), batch_size)
+        batch_results = await asyncio.gather(
+            *(run(all_texts[start:start + batch_size]) for start in starts)
+        )
+        
+        grouped = [[] for _ in text_groups]
+        for start, pains in zip(starts, batch_results):
+            end = min(start + batch_size, len(all_texts))
+            for pain in pains:
+                idx = pain.pop("idx", None)
+                # Невалидный idx — относим к первому тексту пачки
+                pos = start + idx if isinstance(idx, int) and 0 <= idx < end - start else start
+                grouped[owners[pos]].append(pain)
+        return grouped
+
+
+# ============================================================
+# PAIN BUFFER (SoA → COPY)
+# ============================================================
+
+PAIN_CATEGORIES = frozenset({
+    "work", "education", "finance", "tech",
+    "health", "housing", "shopping", "family",
+})
+
+
+def new_pain_columns() -> Dict[str, List[Any]]:
+    """Пустые параллельные списки по колонкам market_pains"""
+    from cloud.database.client import PAIN_COLUMNS
+    return {name: [] for name in PAIN_COLUMNS}
+
+
+def append_pain(columns: Dict[str, List[Any]], pain: Dict[str, Any], source_type: str):
+    """
+    Раскладывает боль из классификатора по колонкам без промежуточного dict.
+    Ожидает боль из parse_pains: text — строка, score — int в диапазоне 1-10.
+    """
+    text = pain["text"]
+    category = pain.get("category")
+    
+    columns["title"].append(text[:255])
+    columns["description"].append(text)
+    columns["category"].append(category if category in PAIN_CATEGORIES else "other")
+    columns["frequency"].append(1)
+    columns["pain_score"].append(pain["score"])
+    columns["monetization_potential"].append(None)
+    columns["sources"].append([{"type": source_type}])
+    columns["keywords"].append([])
+    columns["examples"].append([text])
+    columns["business_idea"].append(None)
+    columns["estimated_price_min"].append(None)
+    columns["estimated_price_max"].append(None)
 
 
 # ============================================================
@@ -208,6 +476,8 @@ def handler(event, context):
     """
     logger.info("🚀 Scout Agent started")
     start_time = datetime.now()
+    t0 = time.perf_counter()
+    date_key = start_time.strftime("%Y-%m-%d")
     
     # Конфигурация из окружения
     import os
@@ -216,78 +486,173 @@ def handler(event, context):
     gemini_key = os.getenv("GEMINI_API_KEY", "")
     
     # Инициализация
+    if not redis_host:
+        logger.warning("⚠️ REDIS_HOST not set — running without deduplication")
     queue = TaskQueue(redis_host, 6379, redis_password)
     classifier = PainClassifier(gemini_key)
     
+    # Буфер болей для RDS (только если БД настроена)
+    db_client = optional_import("cloud.database.client") if os.getenv("ALIBABA_PG_HOST") else None
+    pain_columns = new_pain_columns() if db_client else None
+    
     results = {
         "timestamp": start_time.isoformat(),
         "sources_processed": 0,
         "pains_found": 0,
+        "pains_saved": 0,
         "tasks_created": 0,
     }
     
-    # Обработка источников
-    for source in TREND_SOURCES:
-        source_type = source["type"]
-        logger.info(f"📡 Processing: {source_type}")
+    # Дедупликация всех источников одним pipeline
+    scan_items = [
+        ("scan", {"source": source["type"], "date": date_key})
+        for source in TREND_SOURCES
+    ]
+    scan_is_new = queue.add_tasks_bulk(scan_items)
+    
+    sources = []
+    for source, is_new in zip(TREND_SOURCES, scan_is_new):
+        logger.info("📡 Processing: %s", source["type"])
         
         # Проверяем, не обрабатывали ли уже
-        if not queue.add_task("scan", {"source": source_type, "date": start_time.strftime("%Y-%m-%d")}):
-            logger.info(f"⏭️ Skipping (already processed): {source_type}")
+        if not is_new:
+            logger.info("⏭️ Skipping (already processed): %s", source["type"])
             continue
+        sources.append(source)
+    
+    # Сбор данных и классификация — один event loop, все источники параллельно
+    collected, pains_by_source = asyncio.run(collect_and_classify(sources, classifier))
+    
+    analyze_items = []
+    for (source_type, texts), pains in zip(collected, pains_by_source):
+        results["pains_found"] += len(pains)
         
-        # Сбор данных (mock для примера)
-        texts = collect_data_from_source(source)
-        
-        # Классификация болей
-        if texts:
-            pains = classifier.classify(texts)
-            results["pains_found"] += len(pains)
-            
-            # Создаем задачи для следующих этапов
+        if pain_columns is not None:
             for pain in pains:
-                if pain.get("score", 0) >= 7:  # Только высокий скор
-                    if queue.add_task("analyze", {"pain": pain["text"], "category": pain.get("category")}):
-                        results["tasks_created"] += 1
+                append_pain(pain_columns, pain, source_type)
+        
+        # Задачи для следующих этапов (только высокий скор) — копим и отправляем пачкой
+        analyze_items.extend(
+            ("analyze", {"pain": pain["text"], "category": pain.get("category")})
+            for pain in pains
+            if pain.get("score", 0) >= 7
+        )
         
-        queue.complete_task("scan", {"source": source_type, "date": start_time.strftime("%Y-%m-%d")})
         results["sources_processed"] += 1
     
+    results["tasks_created"] = sum(queue.add_tasks_bulk(analyze_items))
+    queue.complete_tasks_bulk([
+        ("scan", {"source": source_type, "date": date_key})
+        for source_type, _ in collected
+    ])
+    
+    # Сохранение болей одной COPY-пачкой
+    if pain_columns and pain_columns["title"]:
+        try:
+            results["pains_saved"] = db_client.DatabaseClient().add_pains_bulk(pain_columns)
+        except Exception as e:
+            logger.error("❌ Failed to save pains: %s", e)
+    
     # Финализация
-    duration = (datetime.now() - start_time).total_seconds()
+    duration = time.perf_counter() - t0
     results["duration_sec"] = duration
     
-    logger.info(f"✅ Scout Agent completed in {duration:.2f}s")
-    logger.info(f"📊 Results: {json.dumps(results)}")
+    body = json_bytes(results)
+    logger.info("✅ Scout Agent completed in %.2fs", duration)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("📊 Results: %s", body.decode())
     
+    # bytes body — FC отдает буфер как есть, без повторного UTF-8 encode
     return {
         "statusCode": 200,
-        "body": json.dumps(results)
+        "headers": {"Content-Type": "application/json"},
+        "isBase64Encoded": False,
+        "body": body,
     }
 
 
+async def collect_and_classify(
+    sources: List[Dict[str, Any]],
+    classifier: PainClassifier
+) -> Tuple[List[Tuple[str, List[str]]], List[List[Dict[str, Any]]]]:
+    """
+    Параллельно собирает тексты со всех источников (asyncio.gather),
+    затем классифицирует их. Возвращает ([(source_type, texts)], боли по источникам).
+    """
+    aiohttp = optional_import("aiohttp")
+    session = None
+    if aiohttp and sources:
+        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=len(sources)))
+    
+    try:
+        fetched = await asyncio.gather(
+            *(fetch_source(source, session) for source in sources),
+            return_exceptions=True,
+        )
+    finally:
+        if session:
+            await session.close()
+    
+    collected = []
+    for source, texts in zip(sources, fetched):
+        if isinstance(texts, Exception):
+            logger.error("❌ Fetch failed for %s: %s", source["type"], texts)
+            texts = []
+        collected.append((source["type"], texts))
+    
+    pains_by_source = await classifier.classify_many([texts for _, texts in collected])
+    return collected, pains_by_source
+
+
+async def fetch_source(source: dict, session=None) -> List[str]:
+    """
+    Асинхронный сбор данных из источника.
+    session — общий aiohttp.ClientSession для реальных API-вызовов.
+    """
+    # Mock: реальные запросы к API пойдут через session
+    return collect_data_from_source(source)
+
+
+def _fetch_google_trends(source: dict) -> List[str]:
+    """Google Trends (mock)"""
+    return [
+        "работа на дому в ташкенте",
+        "как заработать фрилансом",
+        "подготовка к DTM бесплатно",
+    ]
+
+
+def _fetch_youtube(source: dict) -> List[str]:
+    """YouTube (mock)"""
+    return [
+        "помогите найти работу",
+        "где взять кредит без отказа",
+    ]
+
+
+def _fetch_telegram(source: dict) -> List[str]:
+    """Telegram каналы (mock)"""
+    return [
+        "ищу репетитора по математике",
+        "подскажите хорошего врача",
+    ]
+
+
+def _fetch_unknown(source: dict) -> List[str]:
+    return []
+
+
+# Диспетчер источников: source["type"] → fetcher (В реальности здесь вызовы API)
+_SOURCE_HANDLERS: Dict[str, Callable[[dict], List[str]]] = {
+    "google_trends": _fetch_google_trends,
+    "youtube": _fetch_youtube,
+    "telegram": _fetch_telegram,
+}
+
+
 def collect_data_from_source(source: dict) -> List[str]:
     """Собирает данные из источника (mock для примера)"""
-    source_type = source["type"]
-    
-    # В реальности здесь вызовы API
-    mock_data = {
-        "google_trends": [
-            "работа на дому в ташкенте",
-            "как заработать фрилансом",
-            "подготовка к DTM бесплатно",
-        ],
-        "youtube": [
-            "помогите найти работу",
-            "где взять кредит без отказа",
-        ],
-        "telegram": [
-            "ищу репетитора по математике",
-            "подскажите хорошего врача",
-        ],
-    }
-    
-    return mock_data.get(source_type, [])
+    return _SOURCE_HANDLERS.get(source["type"], _fetch_unknown)(source)
 
 
 # ============================================================
@@ -296,9 +661,11 @@ def collect_data_from_source(source: dict) -> List[str]:
 
 if __name__ == "__main__":
     # Локальный тест
+    logging.basicConfig(level=logging.INFO)
     import os
     os.environ["REDIS_HOST"] = ""
     os.environ["GEMINI_API_KEY"] = ""
     
     result = handler({}, None)
-    print(json.dumps(result, indent=2))
+    result["body"] = json.loads(result["body"])
+    print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -7,15 +7,140 @@ Alibaba PAI DSW Free Tier: 50 часов GPU
 """
 
 import os
+import sys
 import json
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("pai_integration")
 
 
+# ============================================================
+# INFERENCE TEMPLATES
+# Готовые строки, собираются один раз при импорте
+# ============================================================
+
+_PLANT_INFERENCE_CODE = sys.intern('''
+# Dr. Plant Inference — Local model, 0 tokens!
+import os
+import onnxruntime as ort
+from PIL import Image
+import numpy as np
+
+# Numba: кэш JIT на диск (на FC писать можно только в /tmp)
+os.environ.setdefault("NUMBA_CACHE_DIR", "/tmp/numba_cache")
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def _preprocess_numpy(img_u8):
+    img = img_u8.astype(np.float32) / 255.0
+    return np.transpose(img, (2, 0, 1))[np.newaxis, ...]
+
+if njit:
+    @njit(cache=True, fastmath=True)
+    def _preprocess(img_u8):
+        # HWC uint8 -> NCHW float32 [0, 1] за один проход
+        h, w, c = img_u8.shape
+        out = np.empty((1, c, h, w), np.float32)
+        scale = np.float32(1.0 / 255.0)
+        for ch in range(c):
+            for y in range(h):
+                for x in range(w):
+                    out[0, ch, y, x] = img_u8[y, x, ch] * scale
+        return out
+else:
+    _preprocess = _preprocess_numpy
+
+def _create_session(model_path: str) -> ort.InferenceSession:
+    so = ort.SessionOptions()
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    so.intra_op_num_threads = int(os.cpu_count() or 1)
+    return ort.InferenceSession(model_path, so, providers=["CPUExecutionProvider"])
+
+class PlantDiseaseClassifier:
+    def __init__(self, model_path: str):
+        self.session = _create_session(model_path)
+        self.classes = [
+            "Apple_scab", "Apple_black_rot", "Apple_healthy",
+            "Tomato_bacterial_spot", "Tomato_healthy",
+            # ... 38 классов
+        ]
+    
+    def predict(self, image_path: str) -> dict:
+        img = Image.open(image_path).convert("RGB").resize((224, 224))
+        img_array = _preprocess(np.asarray(img, dtype=np.uint8))
+        
+        outputs = self.session.run(None, {"input": img_array})
+        probs = outputs[0][0]
+        
+        top_idx = np.argmax(probs)
+        return {
+            "disease": self.classes[top_idx],
+            "confidence": float(probs[top_idx]),
+            "cost": "$0"  # Локальный inference!
+        }
+
+# Использование:
+# classifier = PlantDiseaseClassifier("model.onnx")
+# result = classifier.predict("leaf_photo.jpg")
+''')
+
+_PAIN_INFERENCE_CODE = sys.intern('''
+# Pain Classifier Inference — Local model, 0 tokens!
+import os
+import onnxruntime as ort
+from transformers import AutoTokenizer
+import numpy as np
+
+def _create_session(model_path: str) -> ort.InferenceSession:
+    so = ort.SessionOptions()
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    so.intra_op_num_threads = int(os.cpu_count() or 1)
+    return ort.InferenceSession(model_path, so, providers=["CPUExecutionProvider"])
+
+class PainClassifier:
+    def __init__(self, model_path: str):
+        # model_path: предпочтительно pain_model_int8.onnx (в ~4x меньше, быстрее на CPU)
+        self.session = _create_session(model_path)
+        # use_fast=True — токенизатор на Rust (tokenizers)
+        self.tokenizer = AutoTokenizer.from_pretrained("distilbert-base-multilingual-cased", use_fast=True)
+        self.categories = ["work", "education", "finance", "tech", "health", "housing", "shopping", "family"]
+        # Буферы входа переиспользуются между вызовами
+        self._ids = np.zeros((1, 128), np.int64)
+        self._mask = np.zeros((1, 128), np.int64)
+        self._feed = {"input_ids": self._ids, "attention_mask": self._mask}
+    
+    def predict(self, text: str) -> dict:
+        enc = self.tokenizer(text, max_length=128, truncation=True, padding="max_length")
+        self._ids[0, :] = enc["input_ids"]
+        self._mask[0, :] = enc["attention_mask"]
+        
+        outputs = self.session.run(None, self._feed)
+        
+        probs = outputs[0][0]
+        top_idx = np.argmax(probs)
+        
+        return {
+            "category": self.categories[top_idx],
+            "confidence": float(probs[top_idx]),
+            "cost": "$0"
+        }
+
+# Использование:
+# classifier = PainClassifier("pain_model_int8.onnx")
+# result = classifier.predict("Ищу работу в Ташкенте, помогите!")
+# >>> {"category": "work", "confidence": 0.92, "cost": "$0"}
+''')
+
+_INFERENCE_TEMPLATES: Dict[str, str] = {
+    "plant": _PLANT_INFERENCE_CODE,
+    "pain": _PAIN_INFERENCE_CODE,
+}
+
+
 class PAITrainer:
     """
     Интеграция с Alibaba PAI для обучения ML моделей.
@@ -31,6 +156,8 @@ class PAITrainer:
     - Sentiment Analysis: анализ тональности отзывов
     """
     
+    __slots__ = ("access_key_id", "access_key_secret", "region", "gpu_hours_used", "gpu_hours_limit")
+    
     # Конфигурация для экономии GPU-часов
     EFFICIENCY_CONFIG = {
         "max_epochs": 10,  # Ограничиваем эпохи
@@ -76,7 +203,7 @@ class PAITrainer:
         Returns:
             dict с метриками обучения
         """
-        logger.info(f"🌱 Training Dr. Plant model: {model_name}")
+        logger.info("🌱 Training Dr. Plant model: %s", model_name)
         
         # Проверка лимитов
         estimated_hours = 2  # ~2 часа на обучение
@@ -119,7 +246,7 @@ class PAITrainer:
         }
         
         self.gpu_hours_used += estimated_hours
-        logger.info(f"✅ Training completed! Accuracy: {results['metrics']['accuracy']:.2%}")
+        logger.info("✅ Training completed! Accuracy: %.2f%%", results["metrics"]["accuracy"] * 100)
         
         return results
     
@@ -166,7 +293,7 @@ class PAITrainer:
         
         После обучения: 0 токенов на inference!
         """
-        logger.info(f"🧠 Training Pain Classifier: {model_name}")
+        logger.info("🧠 Training Pain Classifier: %s", model_name)
         
         estimated_hours = 0.5  # 30 минут на небольшой датасет
         
@@ -193,6 +320,7 @@ class PAITrainer:
                 "health", "housing", "shopping", "family"
             ],
             "model_path": f"oss://pai-models/{model_name}/model.onnx",
+            "model_path_int8": f"oss://pai-models/{model_name}/model_int8.onnx",
             "inference_speed": "~10ms per request (CPU)",
             "token_savings": "~$50/month vs Gemini"
         }
@@ -200,85 +328,29 @@ class PAITrainer:
         self.gpu_hours_used += estimated_hours
         return results
     
+    def quantize_model(self, model_fp32: str, model_int8: str = None) -> str:
+        """
+        Динамическая int8-квантизация ONNX модели (веса QInt8).
+        Для трансформеров (DistilBERT) калибровка не нужна;
+        модель в ~4x меньше и быстрее на CPU Function Compute.
+        
+        Returns:
+            путь к int8 модели
+        """
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        
+        model_int8 = model_int8 or model_fp32.replace(".onnx", "_int8.onnx")
+        logger.info("🗜️ Quantizing %s → %s", model_fp32, model_int8)
+        quantize_dynamic(model_fp32, model_int8, weight_type=QuantType.QInt8)
+        return model_int8
+    
     # ============================================================
     # INFERENCE — Использование обученных моделей
     # ============================================================
     
     def get_inference_code(self, model_type: str) -> str:
         """Генерирует код для inference обученной модели"""
-        
-        if model_type == "plant":
-            return '''
-# Dr. Plant Inference — Local model, 0 tokens!
-import onnxruntime as ort
-from PIL import Image
-import numpy as np
-
-class PlantDiseaseClassifier:
-    def __init__(self, model_path: str):
-        self.session = ort.InferenceSession(model_path)
-        self.classes = [
-            "Apple_scab", "Apple_black_rot", "Apple_healthy",
-            "Tomato_bacterial_spot", "Tomato_healthy",
-            # ... 38 классов
-        ]
-    
-    def predict(self, image_path: str) -> dict:
-        img = Image.open(image_path).resize((224, 224))
-        img_array = np.array(img).astype(np.float32) / 255.0
-        img_array = np.transpose(img_array, (2, 0, 1))[np.newaxis, ...]
-        
-        outputs = self.session.run(None, {"input": img_array})
-        probs = outputs[0][0]
-        
-        top_idx = np.argmax(probs)
-        return {
-            "disease": self.classes[top_idx],
-            "confidence": float(probs[top_idx]),
-            "cost": "$0"  # Локальный inference!
-        }
-
-# Использование:
-# classifier = PlantDiseaseClassifier("model.onnx")
-# result = classifier.predict("leaf_photo.jpg")
-'''
-        
-        elif model_type == "pain":
-            return '''
-# Pain Classifier Inference — Local model, 0 tokens!
-import onnxruntime as ort
-from transformers import AutoTokenizer
-
-class PainClassifier:
-    def __init__(self, model_path: str):
-        self.session = ort.InferenceSession(model_path)
-        self.tokenizer = AutoTokenizer.from_pretrained("distilbert-base-multilingual-cased")
-        self.categories = ["work", "education", "finance", "tech", "health", "housing", "shopping", "family"]
-    
-    def predict(self, text: str) -> dict:
-        inputs = self.tokenizer(text, return_tensors="np", max_length=128, truncation=True, padding="max_length")
-        
-        outputs = self.session.run(None, {
-            "input_ids": inputs["input_ids"],
-            "attention_mask": inputs["attention_mask"]
-        })
-        
-        probs = outputs[0][0]
-        top_idx = np.argmax(probs)
-        
-        return {
-            "category": self.categories[top_idx],
-            "confidence": float(probs[top_idx]),
-            "cost": "$0"
-        }
-
-# Использование:
-# classifier = PainClassifier("pain_model.onnx")
-# result = classifier.predict("Ищу работу в Ташкенте, помогите!")
-# >>> {"category": "work", "confidence": 0.92, "cost": "$0"}
-'''
-        
-        return "# Unknown model type"
+        return _INFERENCE_TEMPLATES.get(model_type, "# Unknown model type")
     
     # ============================================================
     # GPU BUDGET TRACKER
@@ -316,6 +388,7 @@ class PainClassifier:
 # ============================================================
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     trainer = PAITrainer()
     
     # Обучение Dr. Plant
@@ -11,12 +11,103 @@ import os
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("security")
 
 
+# ============================================================
+# STATIC CONFIG (создается один раз при импорте, read-only)
+# ============================================================
+
+_ANTI_DDOS_FEATURES = (
+    "TCP/UDP flood protection",
+    "SYN flood mitigation",
+    "HTTP flood protection",
+    "IP blackhole prevention",
+)
+
+_TLS_CIPHER_SUITES = (
+    "TLS_AES_256_GCM_SHA384",
+    "TLS_CHACHA20_POLY1305_SHA256",
+)
+
+_WAF_RULES = tuple(MappingProxyType(rule) for rule in (
+    {
+        "id": "rule-001",
+        "name": "SQL Injection Protection",
+        "type": "sqli",
+        "action": "block",
+        "priority": 1
+    },
+    {
+        "id": "rule-002",
+        "name": "XSS Protection",
+        "type": "xss",
+        "action": "block",
+        "priority": 2
+    },
+    {
+        "id": "rule-003",
+        "name": "Path Traversal Protection",
+        "type": "traversal",
+        "action": "block",
+        "priority": 3
+    },
+    {
+        "id": "rule-004",
+        "name": "Rate Limiting",
+        "type": "rate_limit",
+        "action": "throttle",
+        "priority": 4,
+        "config": MappingProxyType({
+            "requests_per_ip": 100,
+            "time_window_seconds": 60
+        })
+    },
+    {
+        "id": "rule-005",
+        "name": "Bot Protection",
+        "type": "bot",
+        "action": "challenge",  # CAPTCHA
+        "priority": 5
+    },
+    {
+        "id": "rule-006",
+        "name": "Geo Blocking",
+        "type": "geo",
+        "action": "allow",
+        "priority": 6,
+        "config": MappingProxyType({
+            "allowed_countries": ("UZ", "RU", "KZ", "TJ", "KG"),
+            "default": "block"
+        })
+    },
+    {
+        "id": "rule-007",
+        "name": "API Protection",
+        "type": "api",
+        "action": "validate",
+        "priority": 7,
+        "config": MappingProxyType({
+            "paths": ("/api/*",),
+            "require_auth": True
+        })
+    },
+))
+
+
+def _rule_to_dict(rule: Mapping) -> Dict:
+    """Изменяемая копия правила WAF (вложенный config тоже копируется)"""
+    return {
+        key: dict(value) if isinstance(value, Mapping) else value
+        for key, value in rule.items()
+    }
+
+
 class SecurityManager:
     """
     Управление безопасностью Alibaba Cloud.
@@ -28,6 +119,8 @@ class SecurityManager:
     4. Security Groups
     """
     
+    __slots__ = ("region",)
+    
     def __init__(self, region: str = "ap-southeast-1"):
         self.region = region
     
@@ -50,12 +143,7 @@ class SecurityManager:
             "protection_type": "basic",
             "max_bandwidth_gbps": 5,
             "status": "enabled",
-            "features": [
-                "TCP/UDP flood protection",
-                "SYN flood mitigation",
-                "HTTP flood protection",
-                "IP blackhole prevention"
-            ],
+            "features": _ANTI_DDOS_FEATURES,
             "cost": "$0 (Free Tier)"
         }
     
@@ -85,8 +173,8 @@ class SecurityManager:
         """
         logger.info(f"🔥 Configuring WAF for: {domain}")
         
-        # Базовые правила WAF
-        rules = self._generate_waf_rules()
+        # Базовые правила WAF (копии обычными dict — результат сериализуется в JSON)
+        rules = [_rule_to_dict(rule) for rule in self._generate_waf_rules()]
         
         return {
             "domain": domain,
@@ -101,71 +189,9 @@ class SecurityManager:
             "cost": "$0 (Trial)"
         }
     
-    def _generate_waf_rules(self) -> List[Dict]:
-        """Генерирует правила WAF"""
-        return [
-            {
-                "id": "rule-001",
-                "name": "SQL Injection Protection",
-                "type": "sqli",
-                "action": "block",
-                "priority": 1
-            },
-            {
-                "id": "rule-002",
-                "name": "XSS Protection",
-                "type": "xss",
-                "action": "block",
-                "priority": 2
-            },
-            {
-                "id": "rule-003",
-                "name": "Path Traversal Protection",
-                "type": "traversal",
-                "action": "block",
-                "priority": 3
-            },
-            {
-                "id": "rule-004",
-                "name": "Rate Limiting",
-                "type": "rate_limit",
-                "action": "throttle",
-                "priority": 4,
-                "config": {
-                    "requests_per_ip": 100,
-                    "time_window_seconds": 60
-                }
-            },
-            {
-                "id": "rule-005",
-                "name": "Bot Protection",
-                "type": "bot",
-                "action": "challenge",  # CAPTCHA
-                "priority": 5
-            },
-            {
-                "id": "rule-006",
-                "name": "Geo Blocking",
-                "type": "geo",
-                "action": "allow",
-                "priority": 6,
-                "config": {
-                    "allowed_countries": ["UZ", "RU", "KZ", "TJ", "KG"],
-                    "default": "block"
-                }
-            },
-            {
-                "id": "rule-007",
-                "name": "API Protection",
-                "type": "api",
-                "action": "validate",
-                "priority": 7,
-                "config": {
-                    "paths": ["/api/*"],
-                    "require_auth": True
-                }
-            }
-        ]
+    def _generate_waf_rules(self) -> Tuple[Mapping, ...]:
+        """Возвращает правила WAF (неизменяемая константа модуля)"""
+        return _WAF_RULES
     
     # ============================================================
     # SSL/TLS CERTIFICATES
@@ -189,10 +215,7 @@ class SecurityManager:
             "auto_renewal": True,
             "status": "issued",
             "tls_version": "TLS 1.3",
-            "cipher_suites": [
-                "TLS_AES_256_GCM_SHA384",
-                "TLS_CHACHA20_POLY1305_SHA256"
-            ],
+            "cipher_suites": _TLS_CIPHER_SUITES,
             "cost": "$0"
         }
     
@@ -240,21 +263,16 @@ class SecurityManager:
             "components": []
         }
         
-        # 1. Anti-DDoS
-        ddos = self.configure_anti_ddos(ecs_instance_id)
-        results["components"].append({"type": "anti_ddos", "result": ddos})
-        
-        # 2. WAF
-        waf = self.configure_waf(domain)
-        results["components"].append({"type": "waf", "result": waf})
-        
-        # 3. SSL
-        ssl = self.setup_ssl(domain)
-        results["components"].append({"type": "ssl", "result": ssl})
-        
-        # 4. Security Groups
-        sg = self.configure_security_groups(ecs_instance_id)
-        results["components"].append({"type": "security_groups", "result": sg})
+        # Компоненты независимы (разные ресурсы Alibaba) — настраиваем параллельно
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {
+                "anti_ddos": executor.submit(self.configure_anti_ddos, ecs_instance_id),
+                "waf": executor.submit(self.configure_waf, domain),
+                "ssl": executor.submit(self.setup_ssl, domain),
+                "security_groups": executor.submit(self.configure_security_groups, ecs_instance_id),
+            }
+            for component_type, future in futures.items():
+                results["components"].append({"type": component_type, "result": future.result()})
         
         results["status"] = "complete"
         results["total_cost"] = "$0 (all free tier)"
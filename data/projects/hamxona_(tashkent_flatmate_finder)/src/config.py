@@ -4,6 +4,7 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Hamxona MVP"
     DATABASE_URL: str
     BOT_TOKEN: str  # From BotFather
+    SERVERLESS: bool = False  # True on Function Compute / Lambda -> NullPool
 
     class Config:
         env_file = ".env"
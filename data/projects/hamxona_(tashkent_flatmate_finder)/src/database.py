@@ -1,14 +1,36 @@
+import orjson
+from sqlalchemy.pool import NullPool
 from sqlmodel import SQLModel, create_engine, Session
 from src.config import settings
 
 # Handle 'postgres://' fix for SQLAlchemy if using Supabase connection string directly
 db_url = settings.DATABASE_URL.replace("postgres://", "postgresql://")
 
-engine = create_engine(db_url, echo=False)
+def _orjson_serializer(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+_engine_kwargs = dict(
+    echo=False,
+    json_serializer=_orjson_serializer,
+    json_deserializer=orjson.loads,
+)
+if settings.SERVERLESS:
+    # Function Compute: no long-lived pool between invocations
+    _engine_kwargs["poolclass"] = NullPool
+else:
+    # Supabase/pgbouncer: recycle before the pooler drops idle connections
+    _engine_kwargs.update(pool_size=10, max_overflow=20, pool_recycle=300, pool_pre_ping=True)
+
+engine = create_engine(db_url, **_engine_kwargs)
 
 def get_session():
     with Session(engine) as session:
         yield session
 
 def init_db():
-    SQLModel.metadata.create_all(engine)
\ No newline at end of file
+    SQLModel.metadata.create_all(engine)
+    # create_all skips existing tables, so indexes added later are created here
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
\ No newline at end of file
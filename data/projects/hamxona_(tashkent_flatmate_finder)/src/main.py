@@ -1,5 +1,8 @@
 from fastapi import FastAPI, Depends, HTTPException, Header
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session, select, col
+from sqlalchemy import bindparam
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from contextlib import asynccontextmanager
 from typing import List
 
@@ -12,7 +15,17 @@ async def lifespan(app: FastAPI):
     init_db()
     yield
 
-app = FastAPI(title="Hamxona API", lifespan=lifespan)
+app = FastAPI(title="Hamxona API", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# --- Prebuilt queries (bound params -> SQLAlchemy compiled cache hit per request) ---
+_candidates_base = select(User).where(
+    User.telegram_id != bindparam("uid"),
+    User.is_searching == True,
+    User.budget_max >= bindparam("bmin"),
+    User.budget_min <= bindparam("bmax")
+)
+CANDIDATES_ANY_DISTRICT = _candidates_base.limit(20)
+CANDIDATES_BY_DISTRICT = _candidates_base.where(User.district_pref == bindparam("dist")).limit(20)
 
 # --- Dependencies ---
 def get_current_user_id(authorization: str = Header(None)) -> int:
@@ -40,28 +53,26 @@ def create_or_update_profile(
     tg_user = validate_telegram_data(authorization)
     user_id = tg_user['id']
     
-    existing_user = session.get(User, user_id)
-    if existing_user:
-        user_data_dict = user_data.model_dump(exclude_unset=True)
-        for key, value in user_data_dict.items():
-            setattr(existing_user, key, value)
-        session.add(existing_user)
-        session.commit()
-        session.refresh(existing_user)
-        return existing_user
-    else:
-        # Create new
-        new_user = User(telegram_id=user_id, **user_data.model_dump())
-        # Fill defaults from Telegram if missing
-        if not new_user.full_name:
-            new_user.full_name = f"{tg_user.get('first_name', '')} {tg_user.get('last_name', '')}".strip()
-        if not new_user.username:
-            new_user.username = tg_user.get('username')
-            
-        session.add(new_user)
-        session.commit()
-        session.refresh(new_user)
-        return new_user
+    # Row for a first-time user (fill defaults from Telegram if missing)
+    new_user = User(telegram_id=user_id, **user_data.model_dump())
+    if not new_user.full_name:
+        new_user.full_name = f"{tg_user.get('first_name', '')} {tg_user.get('last_name', '')}".strip()
+    if not new_user.username:
+        new_user.username = tg_user.get('username')
+    
+    # Existing user: only overwrite the fields sent in this request
+    stmt = pg_insert(User).values(**new_user.model_dump())
+    updates = user_data.model_dump(exclude_unset=True) or {"telegram_id": stmt.excluded.telegram_id}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.telegram_id],
+        set_=updates,
+    ).returning(User)
+    
+    # Single round trip: INSERT ... ON CONFLICT DO UPDATE ... RETURNING *
+    user = session.execute(stmt, execution_options={"populate_existing": True}).scalar_one()
+    session.expunge(user)  # keep loaded state, no refresh SELECT after commit
+    session.commit()
+    return user
 
 @app.get("/api/v1/matches/candidates", response_model=List[User])
 def find_candidates(user_id: int = Depends(get_current_user_id), session: Session = Depends(get_session)):
@@ -74,15 +85,12 @@ def find_candidates(user_id: int = Depends(get_current_user_id), session: Sessio
         raise HTTPException(status_code=400, detail="Complete your profile first")
 
     # Logic: Candidate's budget max must be >= my budget min
-    statement = select(User).where(
-        User.telegram_id != user_id,
-        User.is_searching == True,
-        User.budget_max >= me.budget_min,
-        User.budget_min <= me.budget_max
-    )
-    
+    params = {"uid": user_id, "bmin": me.budget_min, "bmax": me.budget_max}
     if me.district_pref:
-        statement = statement.where(User.district_pref == me.district_pref)
+        statement = CANDIDATES_BY_DISTRICT
+        params["dist"] = me.district_pref
+    else:
+        statement = CANDIDATES_ANY_DISTRICT
         
-    results = session.exec(statement.limit(20)).all()
+    results = session.exec(statement, params=params).all()
     return results
\ No newline at end of file
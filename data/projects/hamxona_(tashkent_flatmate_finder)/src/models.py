@@ -1,5 +1,6 @@
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Column, JSON
+from sqlalchemy import Index
 from datetime import datetime
 
 class UserBase(SQLModel):
@@ -15,6 +16,10 @@ class UserBase(SQLModel):
 
 class User(UserBase, table=True):
     __tablename__ = "users"
+    __table_args__ = (
+        # Covers the find_candidates filter
+        Index("ix_users_search", "is_searching", "district_pref", "budget_min", "budget_max"),
+    )
     telegram_id: int = Field(primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -1,10 +1,15 @@
-import hashlib
 import hmac
 import json
-from urllib.parse import unquote
+from functools import lru_cache
+from urllib.parse import parse_qsl
 from fastapi import HTTPException, Header
 from src.config import settings
 
+@lru_cache(maxsize=1)
+def get_secret_key() -> bytes:
+    """HMAC key derived from the bot token; constant, so computed once"""
+    return hmac.digest(b"WebAppData", settings.BOT_TOKEN.encode(), "sha256")
+
 def validate_telegram_data(init_data: str):
     """
     Validates the data received from Telegram Mini App.
@@ -14,16 +19,19 @@ def validate_telegram_data(init_data: str):
         raise HTTPException(status_code=401, detail="No auth data provided")
         
     try:
-        parsed_data = dict(x.split('=') for x in unquote(init_data).split('&'))
+        # Decodes each value once and keeps '=' inside values intact
+        pairs = parse_qsl(init_data, keep_blank_values=True, strict_parsing=True)
+        pairs.sort()
+        parsed_data = dict(pairs)
         hash_check = parsed_data.pop('hash')
         
-        # Sort keys alphabetically
-        data_check_string = '\n'.join([f'{k}={v}' for k, v in sorted(parsed_data.items())])
+        # Keys are already sorted alphabetically
+        data_check_string = '\n'.join(f'{k}={v}' for k, v in pairs if k != 'hash')
         
-        secret_key = hmac.new(b"WebAppData", settings.BOT_TOKEN.encode(), hashlib.sha256).digest()
-        calculated_hash = hmac.new(secret_key, data_check_string.encode(), hashlib.sha256).hexdigest()
+        # One-shot C implementation (OpenSSL), no Python-level HMAC object
+        calculated_hash = hmac.digest(get_secret_key(), data_check_string.encode(), "sha256").hex()
         
-        if calculated_hash != hash_check:
+        if not hmac.compare_digest(calculated_hash, hash_check):
             raise HTTPException(status_code=403, detail="Invalid hash")
             
         user_data = json.loads(parsed_data['user'])
@@ -1,8 +1,41 @@
+import asyncio
 import io
+import json
+import re
+import uuid
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Callable
+import httpx
+import openai
 from openai import AsyncOpenAI
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 from src.config import settings
 
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+# One shared HTTP/2 pool: STT, LLM and TTS calls multiplex over the same TLS session
+http_client = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(30.0, connect=5.0),
+    limits=httpx.Limits(max_keepalive_connections=200, max_connections=400)
+)
+client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
+
+# Shared cap on in-flight STT/LLM/TTS requests; 429s are retried with jitter
+openai_semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONC)
+
+def rate_limit_retrying() -> AsyncRetrying:
+    return AsyncRetrying(
+        wait=wait_random_exponential(multiplier=1, max=20),
+        stop=stop_after_attempt(5),
+        retry=retry_if_exception_type(openai.RateLimitError),
+        reraise=True
+    )
+
+async def call_openai(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run one OpenAI request under the concurrency cap, retrying on rate limits"""
+    async with openai_semaphore:
+        async for attempt in rate_limit_retrying():
+            with attempt:
+                return await fn(*args, **kwargs)
 
 SYSTEM_PROMPT = """
 You are 'InglizchaAI', a friendly English tutor for Uzbek students. 
@@ -13,39 +46,167 @@ You are 'InglizchaAI', a friendly English tutor for Uzbek students.
 Output format: JSON { "correction": "...", "response": "..." }
 """
 
-async def transcribe_audio(audio_bytes: io.BytesIO) -> str:
-    """Convert Voice to Text (Whisper)"""
-    audio_bytes.name = "voice.ogg" # OpenAI requires a filename
-    transcript = await client.audio.transcriptions.create(
-        model="whisper-1",
-        file=audio_bytes,
-        language="en"
-    )
-    return transcript.text
+# Every tutor request shares a byte-identical prefix (same model, system
+# message, response format) and a cache key, so OpenAI prompt caching can
+# route them to the same cached prefix.
+PROMPT_CACHE_KEY = "inglizcha_tutor_v1"
 
-async def get_tutor_response(user_text: str) -> dict:
-    """Get logic/correction from GPT-4o-mini"""
-    completion = await client.chat.completions.create(
+def tutor_request(user_text: str, **extra) -> dict:
+    """Chat Completions arguments for one tutor turn"""
+    return dict(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_text}
         ],
-        response_format={ "type": "json_object" }
+        response_format={ "type": "json_object" },
+        prompt_cache_key=PROMPT_CACHE_KEY,
+        store=False,
+        **extra
     )
-    import json
+
+async def transcribe_audio_stream(audio_bytes: io.BytesIO) -> AsyncIterator[str]:
+    """Convert Voice to Text, yielding the growing transcript as deltas arrive"""
+    audio_bytes.name = "voice.ogg" # OpenAI requires a filename
+
+    async def create():
+        audio_bytes.seek(0) # a retried attempt must upload the file again
+        return await client.audio.transcriptions.create(
+            model="gpt-4o-mini-transcribe",
+            file=audio_bytes,
+            language="en",
+            response_format="text",
+            stream=True
+        )
+
+    stream = await call_openai(create)
+    text = ""
+    async for event in stream:
+        if event.type == "transcript.text.delta":
+            text += event.delta
+            yield text
+        elif event.type == "transcript.text.done":
+            yield event.text
+
+async def transcribe_chunks_stream(chunks: AsyncIterator[bytes], filename: str = "voice.ogg") -> AsyncIterator[str]:
+    """
+    Streaming STT over a raw multipart request whose file part is fed from
+    `chunks` while they are still downloading. The SDK needs a complete file,
+    so the body is built by hand and sent chunked through the shared pool.
+    Not retried: the source iterator can only be consumed once.
+    """
+    boundary = uuid.uuid4().hex
+    fields = {
+        "model": "gpt-4o-mini-transcribe",
+        "language": "en",
+        "response_format": "text",
+        "stream": "true"
+    }
+
+    async def body() -> AsyncIterator[bytes]:
+        for name, value in fields.items():
+            yield f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        yield (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+               f'Content-Type: audio/ogg\r\n\r\n').encode()
+        async for chunk in chunks:
+            yield chunk
+        yield f'\r\n--{boundary}--\r\n'.encode()
+
+    headers = {
+        "Authorization": f"Bearer {client.api_key}",
+        "Content-Type": f"multipart/form-data; boundary={boundary}"
+    }
+    url = client.base_url.join("audio/transcriptions")
+    async with openai_semaphore:
+        async with http_client.stream("POST", url, content=body(), headers=headers) as response:
+            response.raise_for_status()
+            text = ""
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                event = json.loads(data)
+                if event.get("type") == "transcript.text.delta":
+                    text += event["delta"]
+                    yield text
+                elif event.get("type") == "transcript.text.done":
+                    yield event["text"]
+
+async def transcribe_audio(audio_bytes: io.BytesIO) -> str:
+    """Convert Voice to Text (final transcript only)"""
+    text = ""
+    async for partial in transcribe_audio_stream(audio_bytes):
+        text = partial
+    return text.strip()
+
+async def get_tutor_response(user_text: str) -> dict:
+    """Get logic/correction from GPT-4o-mini"""
+    completion = await call_openai(client.chat.completions.create, **tutor_request(user_text))
     return json.loads(completion.choices[0].message.content)
 
-async def text_to_speech(text: str) -> io.BytesIO:
-    """Convert text back to audio"""
-    response = await client.audio.speech.create(
-        model="tts-1",
-        voice="alloy",
-        input=text
-    )
-    # Stream to memory buffer
-    audio_buffer = io.BytesIO()
-    for chunk in response.iter_bytes():
-        audio_buffer.write(chunk)
-    audio_buffer.seek(0)
-    return audio_buffer
\ No newline at end of file
+# Start of the "response" value and its body (complete escapes only)
+RESPONSE_VALUE_RE = re.compile(r'"response"\s*:\s*"((?:[^"\\]|\\.)*)(")?')
+SENTENCE_END_RE = re.compile(r'[.!?]+\s+')
+
+async def get_tutor_response_stream(user_text: str, output: dict) -> AsyncIterator[str]:
+    """
+    Stream the tutor reply and yield complete sentences of the "response" field
+    as soon as they are decoded. The parsed JSON is stored into `output` at the end.
+    """
+    stream = await call_openai(client.chat.completions.create, **tutor_request(user_text, stream=True))
+    buf = ""
+    emitted = 0  # chars of the decoded response already yielded
+    field_done = False
+    async for chunk in stream:
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+        buf += chunk.choices[0].delta.content
+        if field_done:
+            continue
+        match = RESPONSE_VALUE_RE.search(buf)
+        if not match:
+            continue
+        try:
+            value = json.loads(f'"{match.group(1)}"')
+        except json.JSONDecodeError:
+            continue  # cut inside a \uXXXX escape, wait for more tokens
+        for end in SENTENCE_END_RE.finditer(value, emitted):
+            sentence = value[emitted:end.end()].strip()
+            emitted = end.end()
+            if sentence:
+                yield sentence
+        if match.group(2):
+            field_done = True
+            tail = value[emitted:].strip()
+            emitted = len(value)
+            if tail:
+                yield tail
+
+    output.update(json.loads(buf))
+    tail = output.get("response", "")[emitted:].strip()
+    if tail:
+        yield tail
+
+async def text_to_speech(text: str) -> AsyncIterator[bytes]:
+    """
+    Convert text back to audio, yielding OGG/Opus chunks as they arrive.
+    Callers should close it with contextlib.aclosing: the concurrency slot
+    and the HTTP response are held until the generator is closed.
+    """
+    # The slot is held while audio streams, so the cap bounds open TTS streams too
+    async with openai_semaphore, AsyncExitStack() as stack:
+        # Only opening the response is retried; a failed attempt leaves nothing on the stack
+        async for attempt in rate_limit_retrying():
+            with attempt:
+                response = await stack.enter_async_context(
+                    client.audio.speech.with_streaming_response.create(
+                        model="tts-1",
+                        voice="alloy",
+                        input=text,
+                        response_format="opus" # Telegram voice notes are OGG/Opus
+                    )
+                )
+        async for chunk in response.iter_bytes(4096):
+            yield chunk
@@ -1,14 +1,35 @@
 from aiogram import Bot, Dispatcher, F, types
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.filters import Command
-from aiogram.types import BufferedInputFile
-import io
+from aiogram.types import InputFile
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator
 from src.config import settings
-from src.ai_engine import transcribe_audio, get_tutor_response, text_to_speech
-from src.database import get_or_create_user, add_xp, log_conversation
+from src.ai_engine import transcribe_chunks_stream, get_tutor_response_stream, text_to_speech
+from src.database import get_or_create_user, log_conversation
+from src.ogg_opus import remux_opus
 
-bot = Bot(token=settings.TELEGRAM_BOT_TOKEN)
+# Larger keep-alive pool for Telegram API calls (downloads, voice uploads);
+# AiohttpSession already caches DNS for an hour
+session = AiohttpSession(limit=200)
+bot = Bot(token=settings.TELEGRAM_BOT_TOKEN, session=session)
 dp = Dispatcher()
 
+# A partial transcript this long that ends a sentence is treated as stable
+STABLE_PARTIAL_CHARS = 40
+
+class StreamingInputFile(InputFile):
+    """InputFile that forwards chunks of an async iterator straight into the upload"""
+
+    def __init__(self, chunks: AsyncIterator[bytes], filename: str):
+        super().__init__(filename=filename)
+        self.chunks = chunks
+
+    async def read(self, bot: Bot) -> AsyncIterator[bytes]:
+        async for chunk in self.chunks:
+            yield chunk
+
 @dp.message(Command("start"))
 async def cmd_start(message: types.Message):
     await get_or_create_user(message.from_user)
@@ -16,48 +37,118 @@ async def cmd_start(message: types.Message):
         "🇺🇿 Salom! Men InglizchaAI man.\n🇬🇧 Hi! I am InglizchaAI. Send me a voice message to start practicing!"
     )
 
+async def download_voice_stream(file_path: str) -> AsyncIterator[bytes]:
+    """Yield the voice note from Telegram chunk by chunk, without buffering it"""
+    url = bot.session.api.file_url(bot.token, file_path)
+    async for chunk in bot.session.stream_content(url=url, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield chunk
+
+async def synthesize(text: str) -> bytes:
+    """TTS for one sentence, collected so sentences can be synthesized in parallel"""
+    audio = bytearray()
+    async with aclosing(text_to_speech(text)) as chunks:
+        async for chunk in chunks:
+            audio += chunk
+    return bytes(audio)
+
+async def think_and_speak(user_text: str) -> tuple[dict, list[asyncio.Task]]:
+    """Stream the tutor reply and start TTS for each sentence as soon as it is complete"""
+    ai_output: dict = {}
+    tts_tasks: list[asyncio.Task] = []
+    try:
+        async with aclosing(get_tutor_response_stream(user_text, ai_output)) as sentences:
+            async for sentence in sentences:
+                tts_tasks.append(asyncio.create_task(synthesize(sentence)))
+    except BaseException:
+        for task in tts_tasks:
+            task.cancel()
+        raise
+    return ai_output, tts_tasks
+
+async def voice_chunks(tts_tasks: list[asyncio.Task]) -> AsyncIterator[bytes]:
+    """Yield the per-sentence OGG/Opus files in order (remuxed into one stream by remux_opus)"""
+    for task in tts_tasks:
+        yield await task
+
+def discard(task: asyncio.Task):
+    """Cancel a speculative reply together with the TTS it already started"""
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled() and task.exception() is None:
+        for tts_task in task.result()[1]:
+            tts_task.cancel()
+
+async def transcribe_and_respond(audio_chunks: AsyncIterator[bytes]) -> tuple[str, dict | None, list[asyncio.Task]]:
+    """
+    Consume streaming STT partials and speculatively start the tutor request
+    on the first stable one. The speculative answer is used only if the final
+    transcript matches it, otherwise the request is repeated on the final text.
+    """
+    user_text = ""
+    speculative_text, speculative_task = None, None
+    async with aclosing(transcribe_chunks_stream(audio_chunks)) as partials:
+        async for partial in partials:
+            user_text = partial
+            if (speculative_task is None and len(partial) >= STABLE_PARTIAL_CHARS
+                    and partial.rstrip().endswith((".", "!", "?"))):
+                speculative_text = partial.strip()
+                speculative_task = asyncio.create_task(think_and_speak(speculative_text))
+
+    user_text = user_text.strip()
+    if speculative_task is not None:
+        if speculative_text == user_text:
+            return (user_text, *await speculative_task)
+        discard(speculative_task)
+    if not user_text:
+        return "", None, []
+    return (user_text, *await think_and_speak(user_text))
+
 @dp.message(F.voice)
 async def handle_voice(message: types.Message):
     user_id = message.from_user.id
     
-    # 1. Feedback to user
+    # 1. Resolve the voice file right away, feedback to user goes out in parallel
+    file_task = asyncio.create_task(bot.get_file(message.voice.file_id))
     processing_msg = await message.answer("🎧 Listening & Thinking...")
+    tts_tasks: list[asyncio.Task] = []
     
     try:
-        # 2. Download Voice
-        voice_file_info = await bot.get_file(message.voice.file_id)
-        voice_bytes = io.BytesIO()
-        await bot.download_file(voice_file_info.file_path, destination=voice_bytes)
+        voice_file_info = await file_task
         
-        # 3. Transcribe
-        user_text = await transcribe_audio(voice_bytes)
+        # 2-5. Download streamed into STT + AI Logic, TTS starts per finished sentence
+        user_text, ai_output, tts_tasks = await transcribe_and_respond(download_voice_stream(voice_file_info.file_path))
         if not user_text:
             await processing_msg.edit_text("I couldn't hear you clearly. Please try again.")
             return
 
-        # 4. AI Logic
-        ai_output = await get_tutor_response(user_text)
         correction = ai_output.get("correction", "")
         reply_text = ai_output.get("response", "")
 
-        # 5. TTS
-        audio_reply = await text_to_speech(reply_text)
-        
-        # 6. Send Response
-        await message.answer_voice(
-            voice=BufferedInputFile(audio_reply.read(), filename="reply.ogg"),
-            caption=f"🗣 **You said:** {user_text}\n\n✅ **Correction:** {correction}\n\n🤖 **Reply:** {reply_text}"
-        )
+        if not tts_tasks and reply_text.strip():
+            tts_tasks = [asyncio.create_task(synthesize(reply_text))]
+
+        # 6. Send Response, sentence audio joined into one Opus stream and streamed into the upload
+        caption = f"🗣 **You said:** {user_text}\n\n✅ **Correction:** {correction}\n\n🤖 **Reply:** {reply_text}"
+        if tts_tasks:
+            await message.answer_voice(
+                voice=StreamingInputFile(remux_opus(voice_chunks(tts_tasks)), filename="reply.ogg"),
+                caption=caption
+            )
+        else:
+            await message.answer(caption)
         
-        # 7. Update DB & Gamification
+        # 7. Update DB in the background (XP is awarded by the learning_logs trigger)
         await log_conversation(user_id, user_text, correction, reply_text)
-        await add_xp(user_id, 10)
         
         await processing_msg.delete()
         
     except Exception as e:
         print(e)
         await processing_msg.edit_text("⚠️ Sorry, I had a brain freeze. Try again later.")
+    finally:
+        # Stop sentence TTS still running if the upload or the tutor stream failed
+        for task in tts_tasks:
+            task.cancel()
 
 @dp.message(Command("upgrade"))
 async def cmd_upgrade(message: types.Message):
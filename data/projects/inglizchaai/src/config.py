@@ -8,6 +8,7 @@ class Settings(BaseSettings):
     SUPABASE_KEY: str
     WEBHOOK_URL: str  # Public HTTPS url of the server
     ADMIN_IDS: list[int] = []
+    OPENAI_MAX_CONC: int = 32  # concurrent STT/LLM/TTS requests
 
     class Config:
         env_file = ".env"
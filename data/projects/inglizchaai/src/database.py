@@ -1,9 +1,15 @@
+from cachetools import TTLCache
 from supabase import create_client, Client
 from src.config import settings
 import asyncio
 
+# supabase-py is synchronous: every .execute() runs in a worker thread so the
+# HTTP round-trip does not block the event loop serving other updates.
 supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
+# Returning users skip the upsert: telegram_id -> (profile fields, users row)
+_user_cache: TTLCache = TTLCache(maxsize=50_000, ttl=3600)
+
 async def get_or_create_user(tg_user):
     """Upsert user into Supabase"""
     data = {
@@ -11,32 +17,79 @@ async def get_or_create_user(tg_user):
         "full_name": tg_user.full_name,
         "username": tg_user.username
     }
+    # A changed name/username misses the cache and is upserted again
+    profile = (tg_user.full_name, tg_user.username)
+    cached = _user_cache.get(tg_user.id)
+    if cached and cached[0] == profile:
+        return cached[1]
     # Using upsert to handle existence check efficiently
     try:
-        response = supabase.table("users").upsert(data).execute()
-        return response.data[0] if response.data else None
+        response = await asyncio.to_thread(supabase.table("users").upsert(data).execute)
+        row = response.data[0] if response.data else None
+        if row:
+            _user_cache[tg_user.id] = (profile, row)
+        return row
     except Exception as e:
         print(f"DB Error: {e}")
         return None
 
-async def add_xp(user_id: int, amount: int):
-    """Increment XP for gamification"""
-    # Note: In a real RPC, this would be an atomic SQL function
-    try:
-        user = supabase.table("users").select("xp_points").eq("telegram_id", user_id).execute()
-        if user.data:
-            current_xp = user.data[0]['xp_points']
-            supabase.table("users").update({"xp_points": current_xp + amount}).eq("telegram_id", user_id).execute()
-    except Exception as e:
-        print(f"XP Error: {e}")
+# learning_logs rows are inserted in batches: up to LOG_BATCH_SIZE rows or
+# whatever arrived within LOG_FLUSH_INTERVAL seconds, one HTTP request each.
+LOG_BATCH_SIZE = 50
+LOG_FLUSH_INTERVAL = 0.5
+log_queue: asyncio.Queue = asyncio.Queue(maxsize=5000)
 
 async def log_conversation(user_id, user_text, corrected, ai_resp):
+    """Queue a learning log row for the batch flusher"""
+    _user_cache.pop(user_id, None)  # the insert trigger bumps xp_points
     try:
-        supabase.table("learning_logs").insert({
+        log_queue.put_nowait({
             "user_id": user_id,
             "user_text": user_text,
             "corrected_text": corrected,
             "ai_response": ai_resp
-        }).execute()
+        })
+    except asyncio.QueueFull:
+        print("Log queue full, dropping row")
+
+async def _insert_logs(rows: list[dict]):
+    try:
+        await asyncio.to_thread(supabase.table("learning_logs").insert(rows).execute)
     except Exception as e:
-        print(f"Log Error: {e}")
\ No newline at end of file
+        print(f"Log Error: {e}")
+
+async def _log_flusher():
+    """Insert queued rows in batches until a None sentinel arrives"""
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        row = await log_queue.get()
+        if row is None:
+            return
+        batch = [row]
+        deadline = loop.time() + LOG_FLUSH_INTERVAL
+        while len(batch) < LOG_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                row = await asyncio.wait_for(log_queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if row is None:
+                stopping = True
+                break
+            batch.append(row)
+        await _insert_logs(batch)
+
+_log_flusher_task: asyncio.Task | None = None
+
+def start_log_flusher():
+    global _log_flusher_task
+    _log_flusher_task = asyncio.create_task(_log_flusher())
+
+async def stop_log_flusher():
+    """Flush buffered learning logs: the sentinel lands after every queued row"""
+    if _log_flusher_task is not None:
+        await log_queue.put(None)
+        await _log_flusher_task
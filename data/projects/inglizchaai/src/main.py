@@ -1,23 +1,55 @@
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+import orjson
 from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from aiogram.types import Update
+from src.ai_engine import http_client
 from src.bot import bot, dp
 from src.config import settings
+from src.database import start_log_flusher, stop_log_flusher
 import uvicorn
 
-app = FastAPI(title="InglizchaAI Backend")
+# Updates are acked immediately and processed in the background. Telegram
+# redelivers slow/failed webhooks with the same update_id, so recent ids are
+# remembered to drop duplicates.
+SEEN_UPDATES_MAX = 10_000
+_seen_updates: OrderedDict[int, None] = OrderedDict()
+_update_tasks: set[asyncio.Task] = set()
 
-@app.on_event("startup")
-async def on_startup():
+def is_duplicate(update_id: int) -> bool:
+    if update_id in _seen_updates:
+        return True
+    _seen_updates[update_id] = None
+    if len(_seen_updates) > SEEN_UPDATES_MAX:
+        _seen_updates.popitem(last=False)
+    return False
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     # Set webhook on startup
     webhook_url = f"{settings.WEBHOOK_URL}/api/webhook/telegram"
     await bot.set_webhook(webhook_url)
     print(f"Webhook set to {webhook_url}")
+    start_log_flusher()
+    yield
+    # Shutdown: finish in-flight updates, flush pending learning logs,
+    # close the OpenAI and Telegram connection pools
+    await asyncio.gather(*_update_tasks, return_exceptions=True)
+    await stop_log_flusher()
+    await http_client.aclose()
+    await bot.session.close()
+
+app = FastAPI(title="InglizchaAI Backend", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 @app.post("/api/webhook/telegram")
 async def telegram_webhook(request: Request):
-    update_data = await request.json()
-    update = Update(**update_data)
-    await dp.feed_update(bot, update)
+    update = Update.model_validate(orjson.loads(await request.body()), context={"bot": bot})
+    if not is_duplicate(update.update_id):
+        task = asyncio.create_task(dp.feed_update(bot, update))
+        _update_tasks.add(task)
+        task.add_done_callback(_update_tasks.discard)
     return {"status": "ok"}
 
 @app.get("/")
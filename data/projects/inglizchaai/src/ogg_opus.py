@@ -0,0 +1,145 @@
+import struct
+from typing import AsyncIterator
+
+# Joins the per-sentence OGG/Opus files from TTS into ONE logical Opus stream
+# (one OpusHead/OpusTags, one serial number, continuous granule positions),
+# so the voice note is a plain single-stream file. Chained Ogg (the files
+# simply concatenated) is not reliably played past its first link, and its
+# duration/waveform would describe only that link.
+
+_PAGE_HEADER = struct.Struct("<4sBBqIIIB")  # capture, version, flags, granule, serial, seq, crc, segments
+_FLAG_BOS, _FLAG_EOS = 0x02, 0x04
+_SERIAL = 0x494E474C  # any fixed value: the output has a single stream
+
+# Ogg CRC-32: polynomial 0x04C11DB7, not reflected, init 0, no final xor
+_CRC_TABLE = []
+for _i in range(256):
+    _r = _i << 24
+    for _ in range(8):
+        _r = ((_r << 1) ^ 0x04C11DB7) if _r & 0x80000000 else (_r << 1)
+    _CRC_TABLE.append(_r & 0xFFFFFFFF)
+
+# Samples (at 48 kHz) per frame for each TOC config, RFC 6716 section 3.1
+_FRAME_SAMPLES = (
+    [480, 960, 1920, 2880] * 3  # SILK-only 10/20/40/60 ms
+    + [480, 960] * 2            # Hybrid 10/20 ms
+    + [120, 240, 480, 960] * 4  # CELT-only 2.5/5/10/20 ms
+)
+
+def ogg_crc(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ _CRC_TABLE[(crc >> 24) ^ byte]
+    return crc
+
+def opus_packet_samples(packet: bytes) -> int:
+    """Decoded length of one Opus packet in 48 kHz samples"""
+    toc = packet[0]
+    code = toc & 0x03
+    if code == 0:
+        frames = 1
+    elif code in (1, 2):
+        frames = 2
+    else:
+        frames = packet[1] & 0x3F
+    return _FRAME_SAMPLES[toc >> 3] * frames
+
+def read_packets(data: bytes) -> tuple[list[bytes], int]:
+    """Split one single-stream Ogg file into packets; also returns the last page's granule"""
+    packets, partial, granule, pos = [], b"", 0, 0
+    while pos < len(data):
+        capture, _, _, page_granule, _, _, _, nsegs = _PAGE_HEADER.unpack_from(data, pos)
+        if capture != b"OggS":
+            raise ValueError(f"not an Ogg page at offset {pos}")
+        pos += _PAGE_HEADER.size
+        lacing = data[pos:pos + nsegs]
+        pos += nsegs
+        for lace in lacing:
+            partial += data[pos:pos + lace]
+            pos += lace
+            if lace < 255:
+                packets.append(partial)
+                partial = b""
+        if page_granule != -1:
+            granule = page_granule
+    return packets, granule
+
+def _page(flags: int, granule: int, seq: int, packets: list[bytes]) -> bytes:
+    lacing = bytearray()
+    for packet in packets:
+        lacing += b"\xff" * (len(packet) // 255) + bytes([len(packet) % 255])
+    header = _PAGE_HEADER.pack(b"OggS", 0, flags, granule, _SERIAL, seq, 0, len(lacing))
+    page = header + lacing + b"".join(packets)
+    return page[:22] + struct.pack("<I", ogg_crc(page)) + page[26:]
+
+class OpusRemuxer:
+    """Feed complete OGG/Opus files with add(), get the joined stream's pages back"""
+
+    def __init__(self):
+        self.channels: int | None = None
+        self.samples = 0  # granule position: 48 kHz samples decoded so far
+        self.seq = 0
+        self.trim = 0  # encoder padding at the end of the last file added
+        self.last_granule = 0  # granule of the last page emitted
+        self.held: tuple[int, list[bytes]] | None = None  # last page, sent once we know if it ends the stream
+
+    def _emit(self, flags: int, granule: int, packets: list[bytes]) -> bytes:
+        page = _page(flags, granule, self.seq, packets)
+        self.seq += 1
+        self.last_granule = granule
+        return page
+
+    def add(self, ogg: bytes) -> bytes:
+        packets, last_granule = read_packets(ogg)
+        if len(packets) < 2 or not packets[0].startswith(b"OpusHead") or not packets[1].startswith(b"OpusTags"):
+            raise ValueError("not an Ogg Opus stream")
+        head, audio = packets[0], packets[2:]
+        out = bytearray()
+        if self.channels is None:
+            self.channels = head[9]
+            out += self._emit(_FLAG_BOS, 0, [head])
+            out += self._emit(0, 0, [packets[1]])
+        elif head[9] != self.channels:
+            raise ValueError(f"channel count changed from {self.channels} to {head[9]}")
+        # Samples the encoder padded this file with; trimmed only if it ends the stream
+        self.trim = max(0, sum(map(opus_packet_samples, audio)) - last_granule)
+
+        page: list[bytes] = []
+        segments = size = 0
+        for packet in audio:
+            lace = len(packet) // 255 + 1
+            if page and (segments + lace > 255 or size + len(packet) > 8192):
+                out += self._flush_held()
+                self.held = (self.samples, page)
+                page, segments, size = [], 0, 0
+            page.append(packet)
+            segments += lace
+            size += len(packet)
+            self.samples += opus_packet_samples(packet)
+        if page:
+            out += self._flush_held()
+            self.held = (self.samples, page)
+        return bytes(out)
+
+    def _flush_held(self) -> bytes:
+        if self.held is None:
+            return b""
+        granule, packets = self.held
+        self.held = None
+        return self._emit(0, granule, packets)
+
+    def finish(self) -> bytes:
+        """Final page, flagged end-of-stream with the last file's end trimming"""
+        if self.held is None:
+            return b""
+        granule, packets = self.held
+        self.held = None
+        return self._emit(_FLAG_EOS, max(granule - self.trim, self.last_granule), packets)
+
+async def remux_opus(files: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yield one continuous OGG/Opus stream built from a sequence of OGG/Opus files"""
+    remuxer = OpusRemuxer()
+    async for ogg in files:
+        if ogg:
+            yield remuxer.add(ogg)
+    yield remuxer.finish()
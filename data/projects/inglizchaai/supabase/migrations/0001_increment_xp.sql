@@ -0,0 +1,11 @@
+-- Atomic XP increment (supabase.rpc). Superseded by the learning_logs
+-- trigger and dropped in 0002.
+create or replace function increment_xp(uid bigint, delta int)
+returns int
+language sql
+as $$
+    update users
+    set xp_points = xp_points + delta
+    where telegram_id = uid
+    returning xp_points;
+$$;
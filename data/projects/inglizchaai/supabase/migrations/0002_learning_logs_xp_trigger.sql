@@ -0,0 +1,22 @@
+-- XP accounting server-side: every logged conversation turn is worth 10 XP,
+-- so the bot no longer calls increment_xp separately.
+create or replace function bump_xp()
+returns trigger
+language plpgsql
+as $$
+begin
+    update users
+    set xp_points = xp_points + 10
+    where telegram_id = new.user_id;
+    return new;
+end;
+$$;
+
+-- Re-runnable: replace the trigger if this migration was applied before
+drop trigger if exists trg_xp on learning_logs;
+create trigger trg_xp
+after insert on learning_logs
+for each row execute function bump_xp();
+
+-- increment_xp (0001) has no callers left
+drop function if exists increment_xp(bigint, int);
@@ -3,7 +3,9 @@ from aiogram.types import Message, ReplyKeyboardMarkup, KeyboardButton, ReplyKey
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
+from sqlalchemy import and_, func
 from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
 from src.database import AsyncSessionLocal
 from src.models import User
 
@@ -82,29 +84,34 @@ async def process_district(message: Message, state: FSMContext):
 
 @router.message(F.text == "🔍 Search Roommates")
 async def search_handler(message: Message):
+    me = aliased(User)
+    candidate = aliased(User)
+    # One round-trip: the user's own row LEFT JOINed to matches
+    # (opposite role + same district). No rows -> not registered.
+    query = select(me, candidate).outerjoin(
+        candidate,
+        and_(
+            candidate.district_pref == me.district_pref,
+            # has_room may be NULL on old rows; treat that as searching
+            func.coalesce(candidate.has_room, False) != func.coalesce(me.has_room, False),
+            candidate.telegram_id != me.telegram_id
+        )
+    ).where(me.telegram_id == message.from_user.id).limit(5)
+
     async with AsyncSessionLocal() as session:
-        # Get current user
-        result = await session.execute(select(User).where(User.telegram_id == message.from_user.id))
-        me = result.scalar_one_or_none()
+        rows = (await session.execute(query)).all()
         
-        if not me:
+        if not rows:
             return await message.answer("Please /start to register first.")
 
-        # Simple matching logic: Opposite role + Same District
-        target_role = not me.has_room
-        query = select(User).where(
-            User.has_room == target_role,
-            User.district_pref == me.district_pref,
-            User.telegram_id != me.telegram_id
-        ).limit(5)
-        
-        matches = await session.execute(query)
-        results = matches.scalars().all()
+        results = [u for _, u in rows if u is not None]
         
         if not results:
             await message.answer("No matches found in your district yet. Try again later!")
         else:
-            response = "🤝 **Potential Roommates:**\n\n"
-            for u in results:
-                response += f"👤 {u.full_name} ({u.age})\n💰 Budget: ${u.budget_limit}\n📍 {u.district_pref}\n💬 @{u.contact_username}\n\n"
-            await message.answer(response)
\ No newline at end of file
+            parts = ["🤝 **Potential Roommates:**\n\n"]
+            parts.extend(
+                f"👤 {u.full_name} ({u.age})\n💰 Budget: ${u.budget_limit}\n📍 {u.district_pref}\n💬 @{u.contact_username}\n\n"
+                for u in results
+            )
+            await message.answer("".join(parts))
\ No newline at end of file
@@ -5,9 +5,16 @@ from src.models import Base
 engine = create_async_engine(settings.DATABASE_URL, echo=False)
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
+def _create_schema(conn):
+    Base.metadata.create_all(conn)
+    # create_all skips existing tables, so indexes added later are created here
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
 async def init_db():
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_schema)
 
 async def get_db():
     async with AsyncSessionLocal() as session:
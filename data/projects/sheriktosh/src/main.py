@@ -1,12 +1,18 @@
+import orjson
 from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from aiogram import Bot, Dispatcher, types
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.fsm.storage.memory import MemoryStorage
 from contextlib import asynccontextmanager
 from src.config import settings
 from src.bot_logic import router
 from src.database import init_db
 
-bot = Bot(token=settings.BOT_TOKEN)
+# Larger keep-alive pool for Telegram API calls;
+# AiohttpSession already caches DNS for an hour
+session = AiohttpSession(limit=200)
+bot = Bot(token=settings.BOT_TOKEN, session=session)
 dp = Dispatcher(storage=MemoryStorage())
 dp.include_router(router)
 
@@ -19,12 +25,13 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     await bot.delete_webhook()
+    await bot.session.close()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 @app.post("/webhook")
 async def webhook_handler(request: Request):
-    update = types.Update.model_validate(await request.json(), context={"bot": bot})
+    update = types.Update.model_validate(orjson.loads(await request.body()), context={"bot": bot})
     await dp.feed_update(bot, update)
     return {}
 
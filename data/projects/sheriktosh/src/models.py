@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, String, Integer, Boolean, DateTime
+from sqlalchemy import Column, BigInteger, String, Integer, Boolean, DateTime, Index
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.sql import func
 
@@ -7,6 +7,10 @@ class Base(DeclarativeBase):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Roommate search: same district, opposite role
+        Index("ix_users_district_role", "district_pref", "has_room"),
+    )
 
     telegram_id = Column(BigInteger, primary_key=True, index=True)
     full_name = Column(String, nullable=True)
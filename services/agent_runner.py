@@ -7,18 +7,278 @@ Runs agents in their own process with:
 - PID tracking for monitoring
 """
 
+import asyncio
+import gc
 import subprocess
 import os
+import select
+import selectors
 import sys
 import signal
 import time
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Literal
 from datetime import datetime
 import logging
 
 logger = logging.getLogger("AgentRunner")
 
+# Where the agent's stdout/stderr go:
+#   "file"    - worktree agent.log (default, readable via get_logs())
+#   "inherit" - the parent's fds (interactive / CI runs)
+#   "null"    - discarded (short-lived test runs)
+Capture = Literal["file", "inherit", "null"]
+
+
+# === Win32 process API (ctypes, loaded on first use) ===
+
+_PROCESS_TERMINATE = 0x0001
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_SYNCHRONIZE = 0x00100000
+_STILL_ACTIVE = 259
+_WAIT_OBJECT_0 = 0
+
+_kernel32 = None
+
+
+def _k32():
+    """kernel32 with typed signatures, cached after the first call."""
+    global _kernel32
+    if _kernel32 is None:
+        import ctypes
+        from ctypes import wintypes
+        
+        k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        k32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+        k32.OpenProcess.restype = wintypes.HANDLE
+        k32.GetExitCodeProcess.argtypes = (wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD))
+        k32.GetExitCodeProcess.restype = wintypes.BOOL
+        k32.TerminateProcess.argtypes = (wintypes.HANDLE, wintypes.UINT)
+        k32.TerminateProcess.restype = wintypes.BOOL
+        k32.WaitForSingleObject.argtypes = (wintypes.HANDLE, wintypes.DWORD)
+        k32.WaitForSingleObject.restype = wintypes.DWORD
+        k32.CloseHandle.argtypes = (wintypes.HANDLE,)
+        k32.CloseHandle.restype = wintypes.BOOL
+        _kernel32 = k32
+    return _kernel32
+
+
+def _process_exists_win(pid: int) -> bool:
+    """OpenProcess + GetExitCodeProcess instead of spawning tasklist."""
+    import ctypes
+    from ctypes import wintypes
+    
+    k32 = _k32()
+    handle = k32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        return False
+    try:
+        code = wintypes.DWORD()
+        if not k32.GetExitCodeProcess(handle, ctypes.byref(code)):
+            return False
+        return code.value == _STILL_ACTIVE
+    finally:
+        k32.CloseHandle(handle)
+
+
+def _terminate_win(pid: int) -> bool:
+    """TerminateProcess instead of spawning taskkill /F."""
+    k32 = _k32()
+    handle = k32.OpenProcess(_PROCESS_TERMINATE, False, pid)
+    if not handle:
+        return False
+    try:
+        return bool(k32.TerminateProcess(handle, 1))
+    finally:
+        k32.CloseHandle(handle)
+
+
+def _wait_process_win(pid: int, timeout: Optional[float]) -> bool:
+    """WaitForSingleObject on the process handle. True if it exited."""
+    k32 = _k32()
+    handle = k32.OpenProcess(_SYNCHRONIZE, False, pid)
+    if not handle:
+        return True  # already gone
+    try:
+        timeout_ms = 0xFFFFFFFF if timeout is None else int(timeout * 1000)  # INFINITE
+        return k32.WaitForSingleObject(handle, timeout_ms) == _WAIT_OBJECT_0
+    finally:
+        k32.CloseHandle(handle)
+
+
+# === Event-driven process waits ===
+
+def _wait_pid_event_driven(pid: int, timeout: Optional[float]) -> Optional[bool]:
+    """
+    Block until process `pid` exits, without polling.
+    
+    Uses pidfd_open + poll on Linux (>= 5.3), kqueue NOTE_EXIT on macOS/BSD
+    and WaitForSingleObject on Windows.
+    
+    Returns:
+        True if the process exited, False on timeout,
+        None if no event-driven wait is available (caller should poll)
+    """
+    if os.name == 'nt':
+        return _wait_process_win(pid, timeout)
+    
+    if hasattr(os, "pidfd_open"):
+        try:
+            fd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            return None
+        try:
+            poller = select.poll()
+            poller.register(fd, select.POLLIN)
+            return bool(poller.poll(None if timeout is None else int(timeout * 1000)))
+        finally:
+            os.close(fd)
+    
+    if hasattr(select, "kqueue"):
+        kq = select.kqueue()
+        try:
+            event = select.kevent(
+                pid,
+                filter=select.KQ_FILTER_PROC,
+                flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT,
+                fflags=select.KQ_NOTE_EXIT,
+            )
+            return bool(kq.control([event], 1, timeout))
+        except ProcessLookupError:
+            return True
+        finally:
+            kq.close()
+    
+    return None
+
+
+def wait_any(
+    runners: Iterable["AgentRunner"],
+    timeout: Optional[float] = None,
+    poll_interval: float = 0.5,
+) -> List["AgentRunner"]:
+    """
+    Block until at least one of `runners` exits (or `timeout` passes).
+    
+    On Linux each agent's pidfd is registered with one epoll selector, on
+    macOS/BSD one kevent list watches NOTE_EXIT; elsewhere (or if those
+    fail) it sleeps `poll_interval` and checks is_running().
+    
+    Returns:
+        Runners whose process exited (empty on timeout)
+    """
+    runners = list(runners)
+    by_pid = {}
+    for runner in runners:
+        pid = runner.get_pid()
+        if pid is None:
+            return [runner]  # no PID file: nothing to wait for
+        by_pid[pid] = runner
+    if not by_pid:
+        return []
+    
+    if hasattr(os, "pidfd_open"):
+        sel = selectors.DefaultSelector()
+        fds = []
+        try:
+            for pid, runner in by_pid.items():
+                try:
+                    fd = os.pidfd_open(pid)
+                except ProcessLookupError:
+                    return [runner]  # already gone
+                fds.append(fd)
+                sel.register(fd, selectors.EVENT_READ, runner)
+            return [key.data for key, _ in sel.select(timeout)]
+        except OSError:
+            pass  # pidfd unavailable: fall through to polling
+        finally:
+            sel.close()
+            for fd in fds:
+                os.close(fd)
+    
+    elif hasattr(select, "kqueue"):
+        kq = select.kqueue()
+        try:
+            events = [
+                select.kevent(
+                    pid,
+                    filter=select.KQ_FILTER_PROC,
+                    flags=select.KQ_EV_ADD | select.KQ_EV_ONESHOT,
+                    fflags=select.KQ_NOTE_EXIT,
+                )
+                for pid in by_pid
+            ]
+            return [by_pid[ev.ident] for ev in kq.control(events, len(events), timeout)]
+        except ProcessLookupError:
+            pass  # one is already gone: found by the scan below
+        finally:
+            kq.close()
+    
+    # No pidfd/kqueue, or it failed (EPERM/ENOSYS under seccomp): poll,
+    # sleeping between scans so callers looping on us don't spin.
+    exited = [runner for runner in runners if not runner.is_running()]
+    if exited:
+        return exited
+    time.sleep(poll_interval if timeout is None else min(poll_interval, timeout))
+    return [runner for runner in runners if not runner.is_running()]
+
+
+def _pidfd_exit_future(loop: asyncio.AbstractEventLoop, pid: int) -> Optional[asyncio.Future]:
+    """
+    Future resolved when `pid` exits: the pidfd is registered with the event
+    loop's selector, so waiting costs one wakeup per exit. Linux only.
+    
+    Returns:
+        The future (result None), or None if pidfd isn't available
+    """
+    if not hasattr(os, "pidfd_open"):
+        return None
+    fut = loop.create_future()
+    try:
+        fd = os.pidfd_open(pid)
+    except ProcessLookupError:
+        fut.set_result(None)  # already gone
+        return fut
+    except OSError:
+        return None
+    
+    try:
+        loop.add_reader(fd, lambda: fut.done() or fut.set_result(None))
+    except NotImplementedError:
+        os.close(fd)
+        return None
+    
+    def _release(_):
+        loop.remove_reader(fd)
+        os.close(fd)
+    
+    fut.add_done_callback(_release)
+    return fut
+
+
+# === Launch environment (built once, reused by every start()) ===
+
+_project_root: Optional[str] = None
+_base_env: Optional[Dict[str, str]] = None
+
+
+def _launch_base():
+    """Return (project_root, base_env) for agent launches, building them on first use."""
+    global _project_root, _base_env
+    if _base_env is None:
+        _project_root = str(Path.cwd())
+        _base_env = {**os.environ, "PYTHONPATH": _project_root}
+    return _project_root, _base_env
+
+
+def refresh_base_env() -> None:
+    """Forget the cached cwd/environment (after chdir or os.environ changes, e.g. in tests)."""
+    global _project_root, _base_env
+    _project_root = None
+    _base_env = None
+
 
 class AgentRunner:
     """
@@ -45,82 +305,108 @@ class AgentRunner:
         self.log_file = self.worktree / "agent.log"
         self.pid_file = self.worktree / "agent.pid"
         self.process: Optional[subprocess.Popen] = None
+        self.async_process: Optional[asyncio.subprocess.Process] = None
+        self._cached_pid: Optional[int] = None  # parsed agent.pid
+        self._exit_future: Optional[asyncio.Future] = None  # shared by async waiters
     
-    def start(self, extra_env: Optional[Dict[str, str]] = None) -> int:
+    def start(
+        self,
+        extra_env: Optional[Dict[str, str]] = None,
+        stream_logs: bool = False,
+        capture: Capture = "file",
+    ) -> int:
         """
         Start agent in background process.
         
         Args:
             extra_env: Additional environment variables
+            stream_logs: Run the child unbuffered so agent.log updates live
+                (costs one write() per print; off by default)
+            capture: "file" (agent.log), "inherit" (parent's stdout/stderr)
+                or "null" (discard output, no log file written)
             
         Returns:
             Process ID
         """
-        if not self.worktree.exists():
-            raise AgentRunnerError(f"Worktree not found: {self.worktree}")
-        
-        # Check if already running
-        if self.is_running():
-            raise AgentRunnerError(f"Agent already running with PID {self.get_pid()}")
-        
-        # Build environment
-        env = os.environ.copy()
-        env.update({
-            "AGENT_TASK_ID": self.task_id,
-            "AGENT_NAME": self.agent_name,
-            "PYTHONPATH": str(Path.cwd()),  # Project root
-            "PYTHONUNBUFFERED": "1",  # Disable output buffering
-        })
-        if extra_env:
-            env.update(extra_env)
-        
-        # Get Python executable
-        python_exe = sys.executable
-        
-        # Build command
-        # Try to run agent as module: python -m agents.{agent_name}
-        cmd = [python_exe, "-m", f"agents.{self.agent_name}"]
-        
-        logger.info(f"🚀 Starting agent: {' '.join(cmd)}")
-        logger.info(f"📂 Working directory: {self.worktree}")
-        
-        # Open log file
-        log_handle = open(self.log_file, "w", encoding="utf-8")
-        
-        # Write header
-        log_handle.write(f"=== Agent: {self.agent_name} | Task: {self.task_id} ===\n")
-        log_handle.write(f"=== Started: {datetime.now().isoformat()} ===\n")
-        log_handle.write("-" * 50 + "\n")
-        log_handle.flush()
+        cmd, env, log_handle = self._prepare_launch(extra_env, stream_logs, capture)
+        stdout, stderr = self._stdio(capture, log_handle, subprocess.STDOUT)
         
         # Start process
         # NOTE: Run from project root (not worktree) because agents import from project modules
         # The worktree path is passed via AGENT_WORKTREE env var
-        project_root = Path.cwd()
-        
+        gc_was_enabled = gc.isenabled()
+        gc.disable()  # no collection while the child is being spawned
         try:
             self.process = subprocess.Popen(
                 cmd,
-                cwd=str(project_root),  # Run from project root, not worktree
                 env=env,
-                stdout=log_handle,
-                stderr=subprocess.STDOUT,
-                # Windows doesn't support preexec_fn
-                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0,
+                stdout=stdout,
+                stderr=stderr,
+                **self._spawn_kwargs(),
             )
             
             # Save PID
             self.pid_file.write_text(str(self.process.pid))
+            self._cached_pid = self.process.pid
             
             logger.info(f"✅ Agent started with PID: {self.process.pid}")
             return self.process.pid
             
         except FileNotFoundError:
-            log_handle.close()
+            if log_handle:
+                log_handle.close()
             raise AgentRunnerError(f"Agent module not found: agents.{self.agent_name}")
         except Exception as e:
-            log_handle.close()
+            if log_handle:
+                log_handle.close()
             raise AgentRunnerError(f"Failed to start agent: {e}")
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    
+    async def start_async(
+        self,
+        extra_env: Optional[Dict[str, str]] = None,
+        stream_logs: bool = False,
+        capture: Capture = "file",
+    ) -> int:
+        """
+        Start agent as an asyncio subprocess.
+        
+        Exit is reported by the event loop's child watcher, so
+        wait_for_completion_async() simply awaits it.
+        
+        Args:
+            extra_env: Additional environment variables
+            stream_logs: Run the child unbuffered (see start())
+            capture: Output destination (see start())
+            
+        Returns:
+            Process ID
+        """
+        cmd, env, log_handle = self._prepare_launch(extra_env, stream_logs, capture)
+        stdout, stderr = self._stdio(capture, log_handle, asyncio.subprocess.STDOUT)
+        
+        try:
+            self.async_process = await asyncio.create_subprocess_exec(
+                *cmd,
+                env=env,
+                stdout=stdout,
+                stderr=stderr,
+                **self._spawn_kwargs(),
+            )
+        except FileNotFoundError:
+            raise AgentRunnerError(f"Agent module not found: agents.{self.agent_name}")
+        except Exception as e:
+            raise AgentRunnerError(f"Failed to start agent: {e}")
+        finally:
+            if log_handle:
+                log_handle.close()  # the child holds its own copy
+        
+        self.pid_file.write_text(str(self.async_process.pid))
+        self._cached_pid = self.async_process.pid
+        logger.info(f"✅ Agent started with PID: {self.async_process.pid}")
+        return self.async_process.pid
     
     def stop(self, timeout: float = 5.0) -> bool:
         """
@@ -140,26 +426,30 @@ class AgentRunner:
         try:
             # Try graceful termination
             if os.name == 'nt':
-                # Windows
-                subprocess.run(["taskkill", "/PID", str(pid)], capture_output=True)
+                # Windows: agent runs in its own process group (CREATE_NEW_PROCESS_GROUP)
+                os.kill(pid, signal.CTRL_BREAK_EVENT)
             else:
-                # Unix
                 os.kill(pid, signal.SIGTERM)
             
-            # Wait for process to exit
-            start = time.time()
-            while time.time() - start < timeout:
-                if not self._process_exists(pid):
-                    self._cleanup()
-                    logger.info(f"✅ Agent stopped gracefully (PID: {pid})")
-                    return True
-                time.sleep(0.1)
+            # Wait for process to exit (waitpid / pidfd / WaitForSingleObject)
+            if self._wait_exit(pid, timeout):
+                self._cleanup()
+                logger.info(f"✅ Agent stopped gracefully (PID: {pid})")
+                return True
             
             # Force kill
             if os.name == 'nt':
-                subprocess.run(["taskkill", "/F", "/PID", str(pid)], capture_output=True)
+                _terminate_win(pid)
             else:
-                os.kill(pid, signal.SIGKILL)
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    # Exited right at the deadline
+                    self._cleanup()
+                    logger.info(f"✅ Agent stopped gracefully (PID: {pid})")
+                    return True
+            if self.process is not None and self.process.pid == pid:
+                self.process.wait()  # reap, don't leave a zombie
             
             self._cleanup()
             logger.warning(f"⚠️ Agent force killed (PID: {pid})")
@@ -175,23 +465,29 @@ class AgentRunner:
         pid = self.get_pid()
         if not pid:
             return False
+        if self.process is not None and self.process.pid == pid:
+            return self.process.poll() is None  # reaps our child; a zombie still answers kill(0)
         return self._process_exists(pid)
     
     def get_pid(self) -> Optional[int]:
-        """Get PID of running agent."""
-        if self.pid_file.exists():
+        """Get PID of running agent (agent.pid is read once, then cached)."""
+        if self._cached_pid is None:
             try:
-                return int(self.pid_file.read_text().strip())
-            except ValueError:
+                self._cached_pid = int(self.pid_file.read_text().strip())
+            except (FileNotFoundError, ValueError):
                 return None
-        return None
+        return self._cached_pid
     
-    def get_logs(self, tail: int = 50) -> str:
+    def get_logs(self, tail: int = 50, max_bytes: int = 1024 * 1024) -> str:
         """
         Get recent log lines.
         
+        Reads the file backwards in 8 KiB blocks, so cost is proportional to
+        the tail, not the log size.
+        
         Args:
             tail: Number of lines to return
+            max_bytes: Stop reading backwards after this many bytes
             
         Returns:
             Log content
@@ -200,9 +496,24 @@ class AgentRunner:
             return "No logs yet"
         
         try:
-            with open(self.log_file, "r", encoding="utf-8", errors="replace") as f:
-                lines = f.readlines()
-            return "".join(lines[-tail:])
+            with open(self.log_file, "rb") as f:
+                pos = f.seek(0, os.SEEK_END)
+                blocks = []
+                newlines = read_total = 0
+                # tail lines ending in "\n" need tail + 1 separators to be complete
+                while pos > 0 and (tail <= 0 or newlines <= tail) and read_total < max_bytes:
+                    size = min(8192, pos)
+                    pos -= size
+                    f.seek(pos)
+                    block = f.read(size)
+                    blocks.append(block)
+                    newlines += block.count(b"\n")
+                    read_total += size
+            
+            lines = b"".join(reversed(blocks)).splitlines(keepends=True)
+            if pos > 0 and lines:
+                lines = lines[1:]  # first line is cut off
+            return b"".join(lines[-tail:]).decode("utf-8", errors="replace")
         except Exception as e:
             return f"Error reading logs: {e}"
     
@@ -243,7 +554,8 @@ class AgentRunner:
         
         Args:
             timeout: Maximum seconds to wait (default: 5 minutes)
-            poll_interval: Seconds between status checks
+            poll_interval: Seconds between status checks (only used when
+                no event-driven wait is available for an external agent)
             
         Returns:
             True if agent completed successfully (exit code 0)
@@ -253,24 +565,15 @@ class AgentRunner:
             logger.warning("No agent process to wait for")
             return False
         
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
-            # Check if still running
-            if self.process:
-                poll_result = self.process.poll()
-                if poll_result is not None:
-                    # Process finished
-                    success = poll_result == 0
-                    self._cleanup()
-                    logger.info(f"✅ Agent completed (exit code: {poll_result})")
-                    return success
-            elif not self.is_running():
-                # Process finished (was started externally)
+        if self.process:
+            exit_code = self._wait_owned(timeout)
+            if exit_code is not None:
                 self._cleanup()
-                return True
-            
-            time.sleep(poll_interval)
+                logger.info(f"✅ Agent completed (exit code: {exit_code})")
+                return exit_code == 0
+        elif self._wait_foreign(self.get_pid(), timeout, poll_interval):
+            self._cleanup()
+            return True
         
         # Timeout reached
         logger.warning(f"⚠️ Agent timeout after {timeout}s, killing...")
@@ -281,49 +584,153 @@ class AgentRunner:
         """
         Async version of wait_for_completion.
         
-        Use with asyncio.gather() for parallel agent execution.
+        Use with asyncio.gather() for parallel agent execution. All waiters
+        share one exit future per runner (see _get_exit_future), so N parallel
+        agents cost one wakeup per exit instead of N polling loops.
         
         Args:
             timeout: Maximum seconds to wait
-            poll_interval: Seconds between status checks
+            poll_interval: Seconds between status checks (fallback only)
             
         Returns:
             True if agent completed successfully
         """
-        import asyncio
+        if self.async_process is None and not self.process and not self.is_running():
+            logger.warning("No agent process to wait for")
+            return False
         
-        start_time = time.time()
+        exit_code = None
+        exit_future = self._get_exit_future()
+        if exit_future is not None:
+            try:
+                # shield: a timed-out waiter must not cancel the shared future
+                exit_code = await asyncio.wait_for(asyncio.shield(exit_future), timeout)
+                exited = True
+            except asyncio.TimeoutError:
+                exited = False
+        else:
+            # No event source for this platform: poll on the event loop
+            exited = False
+            start_time = time.monotonic()
+            while time.monotonic() - start_time < timeout:
+                if self.process:
+                    if self.process.poll() is not None:
+                        exited = True
+                        break
+                elif not self.is_running():
+                    exited = True
+                    break
+                await asyncio.sleep(poll_interval)
+            if exited and self.process:
+                exit_code = self.process.wait()  # already exited, just reaps
         
-        while time.time() - start_time < timeout:
-            if self.process:
-                poll_result = self.process.poll()
-                if poll_result is not None:
-                    success = poll_result == 0
-                    self._cleanup()
-                    logger.info(f"✅ Agent completed (exit code: {poll_result})")
-                    return success
-            elif not self.is_running():
-                self._cleanup()
-                return True
-            
-            await asyncio.sleep(poll_interval)
+        if not exited:
+            logger.warning(f"⚠️ Agent timeout after {timeout}s, killing...")
+            self.stop()
+            return False
         
-        logger.warning(f"⚠️ Agent timeout after {timeout}s, killing...")
-        self.stop()
-        return False
+        self._cleanup()
+        if self.async_process is None and not self.process:
+            return True  # external agent: exit code unknown
+        logger.info(f"✅ Agent completed (exit code: {exit_code})")
+        return exit_code == 0
     
     # === Private Methods ===
     
+    def _prepare_launch(
+        self,
+        extra_env: Optional[Dict[str, str]] = None,
+        stream_logs: bool = False,
+        capture: Capture = "file",
+    ):
+        """
+        Validate state and build (cmd, env, log_handle) for a launch.
+        
+        log_handle is None unless capture == "file".
+        """
+        if capture not in ("file", "inherit", "null"):
+            raise AgentRunnerError(f"Unknown capture mode: {capture}")
+        
+        if not self.worktree.exists():
+            raise AgentRunnerError(f"Worktree not found: {self.worktree}")
+        
+        # Check if already running (re-read agent.pid, it may be from another runner)
+        self._cached_pid = None
+        self._exit_future = None
+        if self.is_running():
+            raise AgentRunnerError(f"Agent already running with PID {self.get_pid()}")
+        
+        # Build environment (PYTHONPATH = project root, see _launch_base)
+        env = _launch_base()[1].copy()
+        env["AGENT_TASK_ID"] = self.task_id
+        env["AGENT_NAME"] = self.agent_name
+        if stream_logs:
+            env["PYTHONUNBUFFERED"] = "1"  # Disable output buffering
+        if extra_env:
+            env.update(extra_env)
+        
+        # Get Python executable
+        python_exe = sys.executable
+        
+        # Build command
+        # Try to run agent as module: python -m agents.{agent_name}
+        cmd = [python_exe, "-m", f"agents.{self.agent_name}"]
+        
+        logger.info(f"🚀 Starting agent: {' '.join(cmd)}")
+        logger.info(f"📂 Working directory: {self.worktree}")
+        
+        if capture != "file":
+            return cmd, env, None
+        
+        # Open log file (binary, 64 KiB block buffer)
+        log_handle = open(self.log_file, "wb", buffering=65536)
+        
+        # Write header
+        log_handle.write(
+            f"=== Agent: {self.agent_name} | Task: {self.task_id} ===\n"
+            f"=== Started: {datetime.now().isoformat()} ===\n"
+            f"{'-' * 50}\n".encode("utf-8")
+        )
+        log_handle.flush()  # before the child starts appending to the same fd
+        
+        return cmd, env, log_handle
+    
+    @staticmethod
+    def _spawn_kwargs() -> Dict[str, Any]:
+        """
+        Popen options for launching the agent from the project root.
+        
+        On POSIX this keeps CPython on its posix_spawn() fast path (no fork()
+        of a large parent): cwd is left as None since we already run from the
+        project root, and close_fds=False is safe because our own fds are
+        non-inheritable by default (PEP 446).
+        """
+        if os.name == 'nt':
+            return {
+                "cwd": _launch_base()[0],  # Run from project root, not worktree
+                "creationflags": subprocess.CREATE_NEW_PROCESS_GROUP,
+            }
+        logger.debug(
+            "spawn path: posix_spawn"
+            if getattr(subprocess, "_USE_POSIX_SPAWN", False) else "spawn path: fork"
+        )
+        return {"close_fds": False}
+    
+    @staticmethod
+    def _stdio(capture: Capture, log_handle, merge_stderr):
+        """Map a capture mode to (stdout, stderr) arguments for the child."""
+        if capture == "file":
+            return log_handle, merge_stderr
+        if capture == "null":
+            return subprocess.DEVNULL, subprocess.DEVNULL
+        return None, None  # inherit the parent's fds
+    
     def _process_exists(self, pid: int) -> bool:
         """Check if process with PID exists."""
         try:
             if os.name == 'nt':
                 # Windows
-                result = subprocess.run(
-                    ["tasklist", "/FI", f"PID eq {pid}"],
-                    capture_output=True, text=True
-                )
-                return str(pid) in result.stdout
+                return _process_exists_win(pid)
             else:
                 # Unix
                 os.kill(pid, 0)
@@ -331,10 +738,91 @@ class AgentRunner:
         except (OSError, ProcessLookupError):
             return False
     
+    def _wait_exit(self, pid: int, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for `pid` to exit. True if it did."""
+        if self.process is not None and self.process.pid == pid:
+            return self._wait_owned(timeout) is not None
+        return self._wait_foreign(pid, timeout)
+    
+    def _wait_owned(self, timeout: Optional[float]) -> Optional[int]:
+        """
+        Wait for our own Popen child: one blocking waitpid, no Python loop.
+        
+        Returns:
+            Exit code, or None on timeout
+        """
+        try:
+            return self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return None
+    
+    def _wait_foreign(self, pid: int, timeout: float, poll_interval: float = 0.1) -> bool:
+        """
+        Wait for an agent started by someone else (known only by PID).
+        
+        Uses pidfd/kqueue/WaitForSingleObject; polls only if none is available.
+        
+        Returns:
+            True if the process exited, False on timeout
+        """
+        exited = _wait_pid_event_driven(pid, timeout)
+        if exited is not None:
+            return exited
+        
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if not self._process_exists(pid):
+                return True
+            time.sleep(poll_interval)
+        return False
+    
+    def _get_exit_future(self) -> Optional[asyncio.Future]:
+        """
+        One future per runner (and event loop) that resolves when the agent exits.
+        
+        Result is the exit code for agents we started, None for external ones.
+        Sources, cheapest first:
+        - start_async(): the loop's child watcher (Process.wait())
+        - pidfd registered with the loop (Linux)
+        - a blocking Popen.wait() / kqueue / WaitForSingleObject in the
+          default executor (macOS, Windows)
+        Returns None when nothing is available and the caller must poll.
+        """
+        loop = asyncio.get_running_loop()
+        fut = self._exit_future
+        if fut is not None and fut.get_loop() is loop:
+            return fut
+        
+        fut = None
+        if self.async_process is not None:
+            fut = asyncio.ensure_future(self.async_process.wait())
+        elif self.process is not None:
+            proc = self.process
+            exited = _pidfd_exit_future(loop, proc.pid)
+            if exited is not None:
+                fut = loop.create_future()
+                exited.add_done_callback(
+                    lambda _: fut.done() or fut.set_result(proc.wait())  # reap
+                )
+            else:
+                fut = loop.run_in_executor(None, proc.wait)
+        else:
+            pid = self.get_pid()
+            if pid:
+                fut = _pidfd_exit_future(loop, pid)
+                if fut is None and (os.name == 'nt' or hasattr(select, "kqueue")):
+                    fut = loop.run_in_executor(None, _wait_pid_event_driven, pid, None)
+        
+        self._exit_future = fut
+        return fut
+    
     def _cleanup(self):
         """Clean up PID file."""
-        if self.pid_file.exists():
+        self._cached_pid = None
+        try:
             self.pid_file.unlink()
+        except FileNotFoundError:
+            pass
 
 
 # === Exceptions ===
@@ -346,16 +834,34 @@ class AgentRunnerError(Exception):
 
 # === API Endpoints ===
 
+_agent_router = None  # built once by create_agent_api_router()
+_RunRequest = None
+
+
+def _run_request_model():
+    """Pydantic body for POST /run, defined on first use (fastapi/pydantic stay optional)."""
+    global _RunRequest
+    if _RunRequest is None:
+        from pydantic import BaseModel
+        
+        class RunRequest(BaseModel):
+            task_id: str
+            agent: str
+        
+        _RunRequest = RunRequest
+    return _RunRequest
+
+
 def create_agent_api_router():
-    """Create FastAPI router for agent control."""
+    """Create FastAPI router for agent control (cached after the first call)."""
+    global _agent_router
+    if _agent_router is not None:
+        return _agent_router
+    
     from fastapi import APIRouter, HTTPException
-    from pydantic import BaseModel
     
     router = APIRouter(prefix="/api/agent", tags=["agent"])
-    
-    class RunRequest(BaseModel):
-        task_id: str
-        agent: str
+    RunRequest = _run_request_model()
     
     @router.post("/run")
     def start_agent(request: RunRequest):
@@ -386,6 +892,7 @@ def create_agent_api_router():
         runner = AgentRunner(task_id, agent)
         return {"logs": runner.get_logs(tail)}
     
+    _agent_router = router
     return router
 
 
@@ -401,13 +908,19 @@ if __name__ == "__main__":
     parser.add_argument("task_id", help="Task ID")
     parser.add_argument("--agent", "-a", default="cpo", help="Agent name")
     parser.add_argument("--tail", "-n", type=int, default=50, help="Lines for logs")
+    parser.add_argument(
+        "--log", choices=["file", "inherit", "null"], default=None,
+        help="Agent output: agent.log, this terminal, or discard "
+             "(default: inherit on a TTY, file otherwise)",
+    )
     
     args = parser.parse_args()
     runner = AgentRunner(args.task_id, args.agent)
     
     if args.command == "start":
         try:
-            pid = runner.start()
+            capture = args.log or ("inherit" if sys.stdout.isatty() else "file")
+            pid = runner.start(capture=capture)
             print(f"✅ Agent started with PID: {pid}")
         except AgentRunnerError as e:
             print(f"❌ Error: {e}")
@@ -20,7 +20,7 @@ Usage:
 
 import time
 import threading
-from dataclasses import dataclass, field
+from dataclasses import dataclass, replace
 from datetime import datetime
 from typing import Dict, Optional
 import logging
@@ -28,9 +28,20 @@ import logging
 logger = logging.getLogger("CircuitBreaker")
 
 
-@dataclass
+def _to_wall_clock(monotonic_ts: float) -> datetime:
+    """Convert a time.monotonic() stamp to a wall-clock datetime for display."""
+    return datetime.fromtimestamp(time.time() - (time.monotonic() - monotonic_ts))
+
+
+@dataclass(frozen=True, slots=True)
 class CircuitState:
-    """State of a single circuit breaker."""
+    """
+    Immutable snapshot of a single circuit breaker.
+    
+    Writers publish a new snapshot (copy-on-write) under the service's lock; readers
+    take one reference and never see a half-updated state.
+    Timestamps are time.monotonic() values.
+    """
     failures: int = 0
     successes: int = 0
     last_failure_time: Optional[float] = None
@@ -52,7 +63,9 @@ class CircuitBreaker:
     
     # Shared state across instances (per service)
     _circuits: Dict[str, CircuitState] = {}
-    _lock = threading.Lock()
+    # One writer lock per service, so failures on one vendor don't block another
+    _locks: Dict[str, threading.Lock] = {}
+    _registry_lock = threading.Lock()
     
     def __init__(
         self,
@@ -62,12 +75,13 @@ class CircuitBreaker:
     ):
         self.service_name = service_name
         
-        with self._lock:
+        with self._registry_lock:
             if service_name not in self._circuits:
                 self._circuits[service_name] = CircuitState(
                     max_failures=max_failures,
                     timeout_seconds=timeout_seconds
                 )
+            self._lock = self._locks.setdefault(service_name, threading.Lock())
     
     @property
     def state(self) -> CircuitState:
@@ -75,13 +89,13 @@ class CircuitBreaker:
         return self._circuits[self.service_name]
     
     def is_open(self) -> bool:
-        """Check if circuit is open (blocking requests)."""
+        """Check if circuit is open (blocking requests). Lock-free."""
         state = self.state
         
         if state.opened_at is None:
             return False
         
-        elapsed = time.time() - state.opened_at
+        elapsed = time.monotonic() - state.opened_at
         
         # Check if we should transition to half-open
         if elapsed > state.half_open_after:
@@ -90,51 +104,70 @@ class CircuitBreaker:
         return True
     
     def is_half_open(self) -> bool:
-        """Check if circuit is in half-open state (testing)."""
+        """Check if circuit is in half-open state (testing). Lock-free."""
         state = self.state
         
         if state.opened_at is None:
             return False
         
-        elapsed = time.time() - state.opened_at
+        elapsed = time.monotonic() - state.opened_at
         return elapsed > state.half_open_after
     
+    def _publish(self, state: CircuitState) -> None:
+        """Swap in a new snapshot (caller holds the lock)."""
+        self._circuits[self.service_name] = state
+    
     def record_success(self) -> None:
         """Record a successful request."""
         with self._lock:
             state = self.state
-            state.successes += 1
             
             # If in half-open state, close the circuit
             if state.opened_at is not None:
                 logger.info(f"✅ Circuit {self.service_name} CLOSED (recovered)")
-                state.opened_at = None
-                state.failures = 0
+                self._publish(replace(state, successes=state.successes + 1, opened_at=None, failures=0))
+            else:
+                self._publish(replace(state, successes=state.successes + 1))
     
     def record_failure(self) -> None:
         """Record a failed request."""
         with self._lock:
-            state = self.state
-            state.failures += 1
-            state.last_failure_time = time.time()
+            old = self.state
+            now = time.monotonic()
+            state = replace(old, failures=old.failures + 1, last_failure_time=now)
             
             # Check if we should open the circuit
-            if state.failures >= state.max_failures:
-                if state.opened_at is None:
-                    state.opened_at = time.time()
-                    logger.warning(
-                        f"🔴 Circuit {self.service_name} OPENED "
-                        f"(failures: {state.failures})"
-                    )
+            if state.failures >= state.max_failures and state.opened_at is None:
+                state = replace(state, opened_at=now)
+                logger.warning(
+                    f"🔴 Circuit {self.service_name} OPENED "
+                    f"(failures: {state.failures})"
+                )
+            self._publish(state)
+    
+    def force_open(self, reason: str = "") -> None:
+        """Open the circuit immediately, regardless of the failure count."""
+        with self._lock:
+            state = self.state
+            now = time.monotonic()
+            self._publish(replace(
+                state,
+                failures=max(state.failures, state.max_failures),
+                last_failure_time=now,
+                opened_at=now,
+            ))
+            logger.warning(f"🔴 Circuit {self.service_name} FORCE-OPENED ({reason})")
     
     def reset(self) -> None:
         """Manually reset the circuit."""
         with self._lock:
-            state = self.state
-            state.failures = 0
-            state.successes = 0
-            state.opened_at = None
-            state.last_failure_time = None
+            self._publish(replace(
+                self.state,
+                failures=0,
+                successes=0,
+                opened_at=None,
+                last_failure_time=None,
+            ))
             logger.info(f"🔄 Circuit {self.service_name} RESET")
     
     def get_status(self) -> Dict:
@@ -153,8 +186,8 @@ class CircuitBreaker:
             "status": status,
             "failures": state.failures,
             "successes": state.successes,
-            "last_failure": datetime.fromtimestamp(state.last_failure_time).isoformat() if state.last_failure_time else None,
-            "opened_at": datetime.fromtimestamp(state.opened_at).isoformat() if state.opened_at else None,
+            "last_failure": _to_wall_clock(state.last_failure_time).isoformat() if state.last_failure_time is not None else None,
+            "opened_at": _to_wall_clock(state.opened_at).isoformat() if state.opened_at is not None else None,
         }
 
 
@@ -16,11 +16,30 @@ Usage:
 
 import os
 import json
+import time
+import atexit
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
 from typing import Optional
 import logging
 
+from services.circuit_breaker import get_vertex_circuit_breaker
+
+# Fast JSON (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import fcntl  # POSIX: flock on the ledger's sidecar lock file
+    msvcrt = None
+except ImportError:
+    fcntl = None
+    import msvcrt  # Windows: byte-range lock instead
+
 logger = logging.getLogger("CostTracker")
 
 
@@ -32,20 +51,86 @@ COST_PER_1K = {
     "gemini-1.5-pro": 0.00125,
 }
 
+# Same prices per single token, so record() is one lookup and one multiply
+COST_PER_TOKEN = {model: cost / 1000.0 for model, cost in COST_PER_1K.items()}
+_DEFAULT_COST_PER_TOKEN = COST_PER_1K["gemini-2.0-flash"] / 1000.0
+
+# How often record()/check() re-check the UTC date for midnight rollover
+DATE_CHECK_INTERVAL = 60.0
+
+# Telegram alerts: at most one per level per this many seconds
+ALERT_MIN_INTERVAL = 60.0
+
+_telegram_session = None  # requests.Session, created on first alert
+
+
+def _dumps(obj) -> bytes:
+    """Compact JSON bytes: orjson if available, else stdlib json."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _loads(raw: bytes):
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _empty_bucket() -> dict:
+    return {"spent": 0.0, "tokens": 0, "requests": 0}
+
+
+def _utc_date() -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime())
+
+
+def _get_telegram_session():
+    """Shared keep-alive session for Telegram alerts (reuses the TLS connection)."""
+    global _telegram_session
+    if _telegram_session is None:
+        import requests
+        _telegram_session = requests.Session()
+        _telegram_session.headers["Content-Type"] = "application/json"
+    return _telegram_session
+
 
 class CostTracker:
     """
     Tracks daily API costs with budget limits and alerts.
     
     Uses local file storage (for Redis-free mode).
+    
+    Records are accumulated in memory and flushed to disk every
+    `flush_every` records or `flush_interval` seconds (and at exit).
+    A flush takes an exclusive flock on costs.json.lock, re-reads the file
+    and adds only this process's unflushed deltas, so concurrent flushes
+    from several processes don't lose each other's records. Reads
+    (check(), get_spent_today()) stat the file and reload it when another
+    process has replaced it, so a process that only checks still sees
+    what the others spend.
     """
     
-    def __init__(self):
+    def __init__(self, flush_every: int = 50, flush_interval: float = 5.0):
         self.daily_budget = float(os.getenv("DAILY_BUDGET_USD", "50.0"))
         self.alert_threshold = 0.8  # 80%
-        self.today = datetime.utcnow().strftime("%Y-%m-%d")
+        self.today = _utc_date()
         self.data_file = Path("data/costs.json")
+        self.lock_file = self.data_file.with_suffix(".json.lock")
         self._ensure_data_file()
+        
+        self._lock = threading.Lock()
+        self._flush_every = flush_every
+        self._flush_interval = flush_interval
+        self._file_sig = None           # (inode, mtime_ns, size) of the loaded file
+        self._cache = self._load()      # file contents + local deltas
+        self._unflushed: dict = {}      # local deltas not yet on disk
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._last_alert: dict = {}     # level -> monotonic time of last Telegram send
+        self._date_checked = time.monotonic()
+        self._bind_today()
+        atexit.register(self.flush)
     
     def _ensure_data_file(self):
         """Create data file if not exists."""
@@ -53,21 +138,113 @@ class CostTracker:
         if not self.data_file.exists():
             self.data_file.write_text("{}", encoding="utf-8")
     
+    def _stat_sig(self):
+        """Identity of the ledger file on disk; changes on every os.replace()."""
+        try:
+            st = os.stat(self.data_file)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
     def _load(self) -> dict:
-        """Load cost data."""
+        """Load cost data (and remember which version of the file it was)."""
+        self._file_sig = self._stat_sig()
         try:
-            return json.loads(self.data_file.read_text(encoding="utf-8"))
-        except:
+            return _loads(self.data_file.read_bytes())
+        except (OSError, json.JSONDecodeError):  # orjson.JSONDecodeError is a subclass
             return {}
     
+    @contextmanager
+    def _ledger_lock(self):
+        """Exclusive cross-process lock around read-merge-save of the ledger."""
+        with open(self.lock_file, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    
     def _save(self, data: dict):
-        """Save cost data."""
-        self.data_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        """
+        Save cost data atomically.
+        
+        Writes a compact temp file, fsyncs it, then os.replace()s it over the
+        ledger, so a crash mid-write never leaves a truncated costs.json.
+        Only called from flush, so the fsync is paid once per batch.
+        """
+        tmp = self.data_file.with_suffix(f".json.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(_dumps(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.data_file)
+    
+    def flush(self):
+        """Write unflushed deltas to disk (merged into the current file)."""
+        with self._lock:
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        if not self._unflushed:
+            return
+        with self._ledger_lock():
+            data = self._load()
+            self._apply_unflushed(data)
+            self._save(data)
+            self._file_sig = self._stat_sig()
+        self._cache = data
+        self._unflushed = {}
+        self._bind_today()
+    
+    def _apply_unflushed(self, data: dict):
+        """Add this process's unflushed deltas onto `data` in place."""
+        for day, delta in self._unflushed.items():
+            bucket = data.setdefault(day, _empty_bucket())
+            for key, value in delta.items():
+                bucket[key] = bucket.get(key, 0) + value
+    
+    def _refresh(self):
+        """Reload the ledger if another process replaced it since we last read it."""
+        if self._stat_sig() == self._file_sig:
+            return
+        with self._lock:
+            data = self._load()
+            self._apply_unflushed(data)
+            self._cache = data
+            self._bind_today()
+    
+    def _bind_today(self):
+        """Point self._today / self._today_delta at today's buckets (lock held or in __init__)."""
+        self._today = self._cache.setdefault(self.today, _empty_bucket())
+        self._today_delta = None  # created in _unflushed on the next record()
+    
+    def _check_rollover(self):
+        """Re-read the UTC date at most once per DATE_CHECK_INTERVAL."""
+        now = time.monotonic()
+        if now - self._date_checked < DATE_CHECK_INTERVAL:
+            return
+        with self._lock:
+            self._date_checked = now
+            today = _utc_date()
+            if today != self.today:
+                self.today = today
+                self._bind_today()
     
     def get_spent_today(self) -> float:
-        """Get total spent today."""
-        data = self._load()
-        return data.get(self.today, {}).get("spent", 0.0)
+        """Get total spent today (across all processes sharing the ledger)."""
+        self._check_rollover()
+        self._refresh()
+        return self._today["spent"]
     
     def check(self, estimated_cost: float = 0.01) -> bool:
         """
@@ -82,19 +259,10 @@ class CostTracker:
             logger.error(f"Budget exceeded: ${spent:.2f} / ${self.daily_budget}")
             
             # Open circuit breaker
-            try:
-                from services.circuit_breaker import get_vertex_circuit_breaker
-                cb = get_vertex_circuit_breaker()
-                cb.record_failure()
-                cb.record_failure()
-                cb.record_failure()
-                cb.record_failure()
-                cb.record_failure()  # Force open
-            except:
-                pass
+            get_vertex_circuit_breaker().force_open("daily budget exceeded")
             
             # Alert
-            self._alert(f"[CRITICAL] Budget exceeded: ${spent:.2f} / ${self.daily_budget}")
+            self._alert(f"[CRITICAL] Budget exceeded: ${spent:.2f} / ${self.daily_budget}", level="CRITICAL")
             return False
         
         return True
@@ -107,38 +275,51 @@ class CostTracker:
             tokens: Number of tokens used
             model: Model name for pricing
         """
-        cost_per_1k = COST_PER_1K.get(model, 0.00035)
-        cost = (tokens / 1000) * cost_per_1k
-        
-        data = self._load()
-        
-        if self.today not in data:
-            data[self.today] = {"spent": 0.0, "tokens": 0, "requests": 0}
-        
-        data[self.today]["spent"] += cost
-        data[self.today]["tokens"] += tokens
-        data[self.today]["requests"] += 1
+        cost = tokens * COST_PER_TOKEN.get(model, _DEFAULT_COST_PER_TOKEN)
         
-        self._save(data)
+        self._check_rollover()
+        with self._lock:
+            delta = self._today_delta
+            if delta is None:
+                delta = self._today_delta = self._unflushed.setdefault(self.today, _empty_bucket())
+            for bucket in (self._today, delta):
+                bucket["spent"] += cost
+                bucket["tokens"] += tokens
+                bucket["requests"] += 1
+            
+            self._pending += 1
+            if (self._pending >= self._flush_every
+                    or time.monotonic() - self._last_flush >= self._flush_interval):
+                self._flush_locked()
+            
+            spent = self._today["spent"]
         
         # 80% warning
-        spent = data[self.today]["spent"]
         if spent / self.daily_budget >= self.alert_threshold:
-            self._alert(f"[WARNING] 80% budget used: ${spent:.2f} / ${self.daily_budget}")
+            self._alert(f"[WARNING] 80% budget used: ${spent:.2f} / ${self.daily_budget}", level="WARNING")
         
         logger.info(f"Cost recorded: ${cost:.4f} ({tokens} tokens, {model})")
     
-    def _alert(self, message: str):
-        """Send alert via Telegram (if configured) or log."""
+    def _alert(self, message: str, level: str = "WARNING"):
+        """
+        Send alert via Telegram (if configured) or log.
+        
+        Telegram sends are limited to one per level per ALERT_MIN_INTERVAL
+        so a hot record() path past 80% doesn't hit Telegram rate limits.
+        """
         logger.warning(message)
         
         telegram_token = os.getenv("TELEGRAM_BOT_TOKEN")
         chat_id = os.getenv("TELEGRAM_ALERT_CHAT_ID")
         
         if telegram_token and chat_id:
+            now = time.monotonic()
+            last = self._last_alert.get(level)
+            if last is not None and now - last < ALERT_MIN_INTERVAL:
+                return
+            self._last_alert[level] = now
             try:
-                import requests
-                requests.post(
+                _get_telegram_session().post(
                     f"https://api.telegram.org/bot{telegram_token}/sendMessage",
                     json={"chat_id": chat_id, "text": message},
                     timeout=5
@@ -148,17 +329,19 @@ class CostTracker:
     
     def get_report(self) -> dict:
         """Get cost report for today."""
-        data = self._load()
-        today_data = data.get(self.today, {})
+        self._check_rollover()
+        self._refresh()
+        today = self._today
+        spent = today["spent"]
         
         return {
             "date": self.today,
-            "spent": today_data.get("spent", 0.0),
+            "spent": spent,
             "budget": self.daily_budget,
-            "remaining": self.daily_budget - today_data.get("spent", 0.0),
-            "tokens": today_data.get("tokens", 0),
-            "requests": today_data.get("requests", 0),
-            "percentage": (today_data.get("spent", 0.0) / self.daily_budget * 100) if self.daily_budget > 0 else 0
+            "remaining": self.daily_budget - spent,
+            "tokens": today["tokens"],
+            "requests": today["requests"],
+            "percentage": (spent / self.daily_budget * 100) if self.daily_budget > 0 else 0
         }
 
 
@@ -6,63 +6,179 @@ Prevents race conditions when multiple agents commit simultaneously.
 Usage:
     lock_manager = GitLockManager()
     lock_manager.safe_commit(worktree, ["prd.md"], "feat: PRD generated")
+    status = lock_manager.safe_read(["status", "--short"], worktree)
+    
+    with lock_manager.read_lock():
+        ...  # several reads that must not see a merge half-way
 """
 
 import os
 import subprocess
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import logging
 import time
 
+try:
+    import fcntl  # POSIX: shared/exclusive flock
+    msvcrt = None
+except ImportError:
+    fcntl = None
+    import msvcrt  # Windows: exclusive byte-range lock
+
 logger = logging.getLogger("GitLock")
 
 
+def _retry_lock(try_lock, timeout: float) -> bool:
+    """Call non-blocking try_lock() with 5-100 ms backoff until it succeeds or timeout."""
+    deadline = time.monotonic() + timeout
+    delay = 0.005
+    while True:
+        try:
+            try_lock()
+            return True
+        except OSError:  # BlockingIOError / PermissionError (msvcrt)
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.1)
+
+
+def _flock_wait(fd: int, operation: int, timeout: float) -> bool:
+    """
+    flock() with a timeout: non-blocking attempts with bounded backoff until
+    the deadline. No signals or interval timers, so the host process's own
+    SIGALRM/itimer is left alone and a lock can't leak to a late alarm.
+    """
+    return _retry_lock(lambda: fcntl.flock(fd, operation | fcntl.LOCK_NB), timeout)
+
+
+def _msvcrt_lock_wait(fd: int, timeout: float) -> bool:
+    """Exclusive lock on byte 0 of the lock file (Windows has no shared flock)."""
+    def try_lock():
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    return _retry_lock(try_lock, timeout)
+
+
+def _git_env() -> dict:
+    """
+    Environment for git subprocesses.
+    
+    GIT_OPTIONAL_LOCKS=0 stops incidental index refreshes (e.g. by `git status`)
+    from taking index.lock and colliding with a concurrent commit.
+    """
+    return {**os.environ, "GIT_OPTIONAL_LOCKS": "0"}
+
+
 class GitLockManager:
     """
     Thread-safe Git operations with file locking.
+    
+    Locks are partitioned: commits lock only their own worktree, so agents
+    in different worktrees commit in parallel; merges lock the project root
+    (they check out and update main).
+    
+    Locks are reader-writer (flock LOCK_SH / LOCK_EX on POSIX): reads run in
+    parallel, commits and merges are exclusive. On Windows (msvcrt.locking)
+    every lock is exclusive. The lock files persist and the OS drops a dead
+    process's lock, so there is no stale-lock cleanup.
     """
     
     def __init__(self, project_root: Path = None):
         self.project_root = project_root or Path.cwd()
         self.lock_file = self.project_root / ".git" / "uz_factory.lock"
+        self.worktree_lock_file = self.project_root / ".git" / "uz_factory.worktree-admin.lock"
         self.timeout = 30  # seconds
     
-    def _acquire_lock(self) -> bool:
-        """Acquire file lock."""
-        start = time.time()
-        
-        while time.time() - start < self.timeout:
-            try:
-                # Create lock file exclusively
-                fd = os.open(str(self.lock_file), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-                os.write(fd, str(os.getpid()).encode())
-                os.close(fd)
-                logger.debug(f"Lock acquired: {self.lock_file}")
-                return True
-            except FileExistsError:
-                # Lock exists, check if stale
-                try:
-                    mtime = self.lock_file.stat().st_mtime
-                    if time.time() - mtime > 60:  # 60s stale threshold
-                        logger.warning("Removing stale lock")
-                        self.lock_file.unlink()
-                        continue
-                except:
-                    pass
-                
-                time.sleep(0.5)
+    def _lock_for(self, worktree: Optional[Path] = None) -> Path:
+        """
+        Lock file guarding `worktree` (project-root lock if None).
         
-        logger.error(f"Lock timeout after {self.timeout}s")
-        return False
+        Lives in the main .git dir: in a linked worktree `.git` is a file.
+        """
+        if worktree is None:
+            return self.lock_file
+        name = Path(worktree).resolve().name
+        return self.project_root / ".git" / f"uz_factory.{name}.lock"
     
-    def _release_lock(self):
-        """Release file lock."""
+    def _current_branch(self) -> Optional[str]:
+        """Branch checked out in the project root, read from .git/HEAD (no git process)."""
         try:
-            self.lock_file.unlink()
-            logger.debug("Lock released")
-        except:
-            pass
+            head = (self.project_root / ".git" / "HEAD").read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        prefix = "ref: refs/heads/"
+        return head[len(prefix):] if head.startswith(prefix) else None
+    
+    def _acquire_lock(self, lock_file: Optional[Path] = None, shared: bool = False) -> Optional[int]:
+        """
+        Acquire file lock (project-root lock by default).
+        
+        Args:
+            lock_file: Lock to take (see _lock_for)
+            shared: Shared (read) lock instead of exclusive (write)
+            
+        Returns:
+            Handle for _release_lock(), or None on timeout
+        """
+        lock_file = lock_file or self.lock_file
+        fd = os.open(str(lock_file), os.O_RDWR | os.O_CREAT, 0o644)
+        
+        if fcntl is not None:
+            acquired = _flock_wait(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX, self.timeout)
+        else:
+            acquired = _msvcrt_lock_wait(fd, self.timeout)
+        
+        if not acquired:
+            os.close(fd)
+            logger.error("Lock timeout after %ss", self.timeout)
+            return None
+        
+        logger.debug("Lock acquired (%s): %s", 'shared' if shared and fcntl else 'exclusive', lock_file)
+        return fd
+    
+    def _release_lock(self, handle: int):
+        """Release a lock taken by _acquire_lock()."""
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                os.lseek(handle, 0, os.SEEK_SET)
+                msvcrt.locking(handle, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(handle)
+        logger.debug("Lock released")
+    
+    @contextmanager
+    def _locked(self, lock_file: Path, shared: bool):
+        handle = self._acquire_lock(lock_file, shared=shared)
+        if handle is None:
+            raise TimeoutError("Could not acquire Git lock")
+        try:
+            yield
+        finally:
+            self._release_lock(handle)
+    
+    def read_lock(self, worktree: Optional[Path] = None):
+        """Shared lock on `worktree` (project root if None): blocks writers only."""
+        return self._locked(self._lock_for(worktree), shared=True)
+    
+    def write_lock(self, worktree: Optional[Path] = None):
+        """Exclusive lock on `worktree` (project root if None)."""
+        return self._locked(self._lock_for(worktree), shared=False)
+    
+    def worktree_lock(self):
+        """
+        Exclusive lock for `git worktree add/remove/prune` only.
+        
+        Those race on .git/worktrees/ ("failed to read commondir"); hold
+        it for the metadata call alone, checkouts and merges stay outside.
+        """
+        return self._locked(self.worktree_lock_file, shared=False)
     
     def safe_commit(
         self,
@@ -83,38 +199,40 @@ class GitLockManager:
         Returns:
             True if successful
         """
-        if not self._acquire_lock():
+        lock_file = self._lock_for(worktree)
+        handle = self._acquire_lock(lock_file)
+        if handle is None:
             raise TimeoutError("Could not acquire Git lock")
         
+        env = _git_env()
         try:
-            # Add files
-            add_cmd = ["git", "-C", str(worktree), "add"] + files
-            result = subprocess.run(add_cmd, capture_output=True, text=True, timeout=10)
+            # Stage, then commit the whole index (other staged changes included)
+            add_cmd = ["git", "-C", str(worktree), "add", "--"] + files
+            result = subprocess.run(add_cmd, capture_output=True, text=True, timeout=10, env=env)
             
             if result.returncode != 0:
-                logger.error(f"git add failed: {result.stderr}")
+                logger.error("git add failed: %s", result.stderr)
                 return False
             
-            # Commit
             commit_cmd = ["git", "-C", str(worktree), "commit", "-m", message]
-            result = subprocess.run(commit_cmd, capture_output=True, text=True, timeout=30)
+            result = subprocess.run(commit_cmd, capture_output=True, text=True, timeout=30, env=env)
             
             if result.returncode != 0:
                 if "nothing to commit" in result.stdout or "nothing to commit" in result.stderr:
                     logger.info("Nothing to commit")
                     return True
-                logger.error(f"git commit failed: {result.stderr}")
+                logger.error("git commit failed: %s", result.stderr)
                 return False
             
-            logger.info(f"Committed: {message[:50]}...")
+            logger.info("Committed: %s...", message[:50])
             
             # Push if requested
             if push:
                 push_cmd = ["git", "-C", str(worktree), "push"]
-                result = subprocess.run(push_cmd, capture_output=True, text=True, timeout=60)
+                result = subprocess.run(push_cmd, capture_output=True, text=True, timeout=60, env=env)
                 
                 if result.returncode != 0:
-                    logger.error(f"git push failed: {result.stderr}")
+                    logger.error("git push failed: %s", result.stderr)
                     return False
                 
                 logger.info("Pushed to remote")
@@ -125,10 +243,10 @@ class GitLockManager:
             logger.error("Git operation timed out")
             return False
         except Exception as e:
-            logger.error(f"Git error: {e}")
+            logger.error("Git error: %s", e)
             return False
         finally:
-            self._release_lock()
+            self._release_lock(handle)
     
     def safe_merge(
         self,
@@ -147,43 +265,146 @@ class GitLockManager:
         Returns:
             True if successful
         """
-        if not self._acquire_lock():
+        handle = self._acquire_lock()
+        if handle is None:
             raise TimeoutError("Could not acquire Git lock")
         
+        env = _git_env()
         try:
-            # Checkout target
-            subprocess.run(
-                ["git", "checkout", into],
-                capture_output=True, check=True, timeout=10
-            )
+            # Checkout target (skipped when already on it)
+            if self._current_branch() != into:
+                subprocess.run(
+                    ["git", "checkout", into],
+                    capture_output=True, check=True, timeout=10, env=env
+                )
             
             # Merge
             result = subprocess.run(
                 ["git", "merge", branch, "--no-ff", "-m", f"Merge {branch} into {into}"],
-                capture_output=True, text=True, timeout=30
+                capture_output=True, text=True, timeout=30, env=env
             )
             
             if result.returncode != 0:
-                logger.error(f"Merge failed: {result.stderr}")
+                logger.error("Merge failed: %s", result.stderr)
                 return False
             
-            logger.info(f"Merged {branch} into {into}")
+            logger.info("Merged %s into %s", branch, into)
             
             # Delete branch if requested
             if delete_after:
                 subprocess.run(
                     ["git", "branch", "-d", branch],
-                    capture_output=True, timeout=10
+                    capture_output=True, timeout=10, env=env
                 )
-                logger.info(f"Deleted branch {branch}")
+                logger.info("Deleted branch %s", branch)
             
             return True
             
         except Exception as e:
-            logger.error(f"Merge error: {e}")
+            logger.error("Merge error: %s", e)
             return False
         finally:
-            self._release_lock()
+            self._release_lock(handle)
+    
+    def safe_merge_many(
+        self,
+        branches: List[str],
+        into: str = "main",
+        delete_after: bool = True
+    ) -> List[str]:
+        """
+        Merge several branches under a single lock.
+        
+        Tries one octopus merge (`git merge --no-ff b1 b2 ...`); if that
+        fails (e.g. the branches conflict), aborts it and merges them one
+        by one, skipping the ones that fail.
+        
+        Args:
+            branches: Branches to merge
+            into: Target branch (default: main)
+            delete_after: Delete merged branches
+            
+        Returns:
+            Branches that were merged
+        """
+        if not branches:
+            return []
+        
+        handle = self._acquire_lock()
+        if handle is None:
+            raise TimeoutError("Could not acquire Git lock")
+        
+        env = _git_env()
+        
+        def git(*args, timeout=30):
+            return subprocess.run(["git", *args], capture_output=True, text=True, timeout=timeout, env=env)
+        
+        merged: List[str] = []
+        try:
+            if self._current_branch() != into:
+                subprocess.run(
+                    ["git", "checkout", into],
+                    capture_output=True, check=True, timeout=10, env=env
+                )
+            
+            if len(branches) > 1:
+                result = git("merge", "--no-ff", "-m",
+                             f"Merge {len(branches)} branches into {into}", *branches, timeout=60)
+                if result.returncode == 0:
+                    merged = list(branches)
+                    logger.info("Merged %s branches into %s (octopus)", len(branches), into)
+                else:
+                    logger.warning("Octopus merge failed, merging one by one: %s", result.stderr.strip())
+                    git("merge", "--abort", timeout=10)
+            
+            if not merged:
+                for branch in branches:
+                    result = git("merge", branch, "--no-ff", "-m", f"Merge {branch} into {into}")
+                    if result.returncode == 0:
+                        merged.append(branch)
+                        logger.info("Merged %s into %s", branch, into)
+                    else:
+                        logger.error("Merge failed for %s: %s", branch, result.stderr)
+                        git("merge", "--abort", timeout=10)
+            
+            # Delete merged branches in one call
+            if delete_after and merged:
+                git("branch", "-d", *merged, timeout=10)
+                logger.info("Deleted branches: %s", ', '.join(merged))
+            
+            return merged
+            
+        except Exception as e:
+            logger.error("Merge error: %s", e)
+            return merged
+        finally:
+            self._release_lock(handle)
+    
+    def safe_read(self, args: List[str], worktree: Optional[Path] = None, timeout: int = 30) -> str:
+        """
+        Run a read-only git command (status, log, diff, rev-parse...).
+        
+        Takes a shared lock on `worktree` (project root if None): runs in
+        parallel with other reads but never sees a commit or merge half-way.
+        With --no-optional-locks the command never writes the index either.
+        
+        Args:
+            args: git arguments, e.g. ["status", "--short"]
+            worktree: Run in this worktree (default: project root)
+            timeout: Seconds before the command is killed
+            
+        Returns:
+            Command stdout (stripped)
+            
+        Raises:
+            subprocess.CalledProcessError: git exited non-zero
+        """
+        cmd = ["git", "--no-optional-locks", "-C", str(worktree or self.project_root)] + args
+        with self.read_lock(worktree):
+            result = subprocess.run(
+                cmd, capture_output=True, text=True, check=True, timeout=timeout, env=_git_env()
+            )
+        return result.stdout.strip()
 
 
 # Singleton
@@ -1,7 +1,7 @@
 """
 Idempotency Store — Prevent duplicate work.
 
-Uses local file storage (Redis-free mode) to track completed operations.
+Uses a local SQLite database (Redis-free mode) to track completed operations.
 Prevents re-running expensive operations like PRD generation.
 
 Usage:
@@ -17,57 +17,155 @@ Usage:
 """
 
 import json
+import time
+import atexit
 import hashlib
+import sqlite3
+import threading
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
 import logging
 
 logger = logging.getLogger("Idempotency")
 
+# Expired rows are deleted on every Nth record(); check() only filters them out
+CLEANUP_EVERY = 100
+
+# record() is written to SQLite at most this many seconds later (and at exit)
+FLUSH_INTERVAL = 5.0
+
+# SQLite reads pages through a shared memory map of up to this many bytes
+MMAP_SIZE = 256 * 1024 * 1024
+
+
+@lru_cache(maxsize=4096)
+def _hash_key(task: str, agent: str) -> str:
+    """
+    16-hex-char SHA256 prefix for (task, agent).
+    
+    Keys are persisted, so the hash must not change with installed packages:
+    a different scheme would miss every recorded operation and re-run it.
+    """
+    content = f"{task.strip().lower()}:{agent}"
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
 
 class IdempotencyStore:
     """
     Tracks completed operations to prevent duplicates.
+    
+    One row per "{key}:{operation}" in data/idempotency.db (WAL mode):
+    lookups are a single indexed SELECT, writes an UPSERT.
+    
+    Unexpired rows are cached in memory on first use, so repeated check()
+    calls don't touch the database; a cache miss still queries SQLite so
+    records made by other processes are seen. record() updates the cache
+    and is written behind, at most FLUSH_INTERVAL seconds later or at exit.
     """
     
     def __init__(self, ttl_hours: int = 24):
         self.ttl_hours = ttl_hours
-        self.data_file = Path("data/idempotency.json")
-        self._ensure_data_file()
+        self.db_file = Path("data/idempotency.db")
+        self.legacy_file = Path("data/idempotency.json")  # pre-SQLite store
+        self._lock = threading.Lock()
+        self._ops_since_cleanup = 0
+        self._conn = self._connect()
+        
+        self._cache: Optional[Dict[str, Tuple[float, Optional[str]]]] = None  # full_key -> (recorded_at, result_path)
+        self._dirty: Dict[str, Tuple[str, float, Optional[str]]] = {}  # full_key -> row not yet in SQLite
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
     
-    def _ensure_data_file(self):
-        """Create data file if not exists."""
-        self.data_file.parent.mkdir(parents=True, exist_ok=True)
-        if not self.data_file.exists():
-            self.data_file.write_text("{}", encoding="utf-8")
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema if needed."""
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_file), isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ops("
+            "full_key TEXT PRIMARY KEY, operation TEXT, recorded_at REAL, result_path TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ops_ts ON ops(recorded_at)")
+        self._import_legacy(conn)
+        return conn
     
-    def _load(self) -> dict:
-        """Load idempotency data."""
+    def _import_legacy(self, conn: sqlite3.Connection):
+        """One-time import of data/idempotency.json into the database."""
+        if not self.legacy_file.exists():
+            return
         try:
-            return json.loads(self.data_file.read_text(encoding="utf-8"))
-        except:
-            return {}
-    
-    def _save(self, data: dict):
-        """Save idempotency data."""
-        self.data_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
-    
-    def _cleanup_expired(self, data: dict) -> dict:
-        """Remove expired entries."""
-        now = datetime.utcnow()
-        cutoff = now - timedelta(hours=self.ttl_hours)
+            data = json.loads(self.legacy_file.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
         
-        cleaned = {}
-        for key, value in data.items():
+        rows = []
+        for full_key, value in data.items():
             try:
-                recorded_at = datetime.fromisoformat(value.get("recorded_at", ""))
-                if recorded_at > cutoff:
-                    cleaned[key] = value
-            except:
-                pass
+                # Legacy timestamps are naive utcnow() isoformat strings
+                recorded_at = datetime.fromisoformat(value["recorded_at"]).replace(tzinfo=timezone.utc).timestamp()
+            except (KeyError, TypeError, ValueError):
+                continue
+            rows.append((full_key, value.get("operation"), recorded_at, value.get("result_path")))
         
-        return cleaned
+        conn.executemany("INSERT OR IGNORE INTO ops VALUES (?, ?, ?, ?)", rows)
+        self.legacy_file.rename(self.legacy_file.with_suffix(".json.migrated"))
+        logger.info("Idempotency: imported %s entries from %s", len(rows), self.legacy_file)
+    
+    def _cutoff(self) -> float:
+        """Entries recorded before this epoch time are expired."""
+        return time.time() - self.ttl_hours * 3600
+    
+    def _load(self) -> Dict[str, Tuple[float, Optional[str]]]:
+        """Unexpired entries, read from the database once (lock held)."""
+        if self._cache is None:
+            rows = self._conn.execute(
+                "SELECT full_key, recorded_at, result_path FROM ops WHERE recorded_at > ?",
+                (self._cutoff(),),
+            )
+            self._cache = {full_key: (ts, path) for full_key, ts, path in rows}
+        return self._cache
+    
+    def _lookup(self, full_key: str) -> Optional[Tuple[float, Optional[str]]]:
+        """Unexpired (recorded_at, result_path) for full_key, or None (lock held)."""
+        cache = self._load()
+        entry = cache.get(full_key)
+        if entry is None:
+            # Not seen yet: another process may have recorded it
+            entry = self._conn.execute(
+                "SELECT recorded_at, result_path FROM ops WHERE full_key = ?", (full_key,)
+            ).fetchone()
+            if entry is None:
+                return None
+            entry = cache[full_key] = tuple(entry)
+        if entry[0] <= self._cutoff():
+            return None
+        return entry
+    
+    def flush(self):
+        """Write pending record() calls to the database."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            rows = [(full_key, *row) for full_key, row in self._dirty.items()]
+            self._conn.executemany("INSERT OR REPLACE INTO ops VALUES (?, ?, ?, ?)", rows)
+            self._dirty = {}
+    
+    def _maybe_cleanup(self):
+        """Delete expired rows every CLEANUP_EVERY records (lock held)."""
+        self._ops_since_cleanup += 1
+        if self._ops_since_cleanup >= CLEANUP_EVERY:
+            self._ops_since_cleanup = 0
+            cutoff = self._cutoff()
+            self._conn.execute("DELETE FROM ops WHERE recorded_at < ?", (cutoff,))
+            if self._cache is not None:
+                self._cache = {k: v for k, v in self._cache.items() if v[0] >= cutoff}
     
     def get_key(self, task: str, agent: str) -> str:
         """
@@ -80,8 +178,7 @@ class IdempotencyStore:
         Returns:
             SHA256 hash prefix
         """
-        content = f"{task.strip().lower()}:{agent}"
-        return hashlib.sha256(content.encode()).hexdigest()[:16]
+        return _hash_key(task, agent)
     
     def check(self, key: str, operation: str) -> bool:
         """
@@ -95,11 +192,11 @@ class IdempotencyStore:
             True if already done (skip), False if not done (proceed)
         """
         full_key = f"{key}:{operation}"
-        data = self._load()
-        data = self._cleanup_expired(data)
+        with self._lock:
+            entry = self._lookup(full_key)
         
-        if full_key in data:
-            logger.info(f"Idempotency hit: {operation} for {key[:8]}...")
+        if entry:
+            logger.info("Idempotency hit: %s for %s...", operation, key[:8])
             return True
         
         return False
@@ -114,37 +211,33 @@ class IdempotencyStore:
             result_path: Optional path to cached result
         """
         full_key = f"{key}:{operation}"
-        data = self._load()
-        data = self._cleanup_expired(data)
-        
-        data[full_key] = {
-            "operation": operation,
-            "recorded_at": datetime.utcnow().isoformat(),
-            "result_path": result_path
-        }
-        
-        self._save(data)
-        logger.info(f"Idempotency recorded: {operation} for {key[:8]}...")
+        recorded_at = time.time()
+        with self._lock:
+            self._maybe_cleanup()
+            self._load()[full_key] = (recorded_at, result_path)
+            self._dirty[full_key] = (operation, recorded_at, result_path)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(FLUSH_INTERVAL, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        logger.info("Idempotency recorded: %s for %s...", operation, key[:8])
     
     def get_cached_result(self, key: str, operation: str) -> Optional[str]:
         """Get cached result path if available."""
         full_key = f"{key}:{operation}"
-        data = self._load()
-        
-        entry = data.get(full_key)
-        if entry:
-            return entry.get("result_path")
-        return None
+        with self._lock:
+            entry = self._lookup(full_key)
+        return entry[1] if entry else None
     
     def invalidate(self, key: str, operation: str):
         """Invalidate (remove) a recorded operation."""
         full_key = f"{key}:{operation}"
-        data = self._load()
-        
-        if full_key in data:
-            del data[full_key]
-            self._save(data)
-            logger.info(f"Idempotency invalidated: {operation} for {key[:8]}...")
+        with self._lock:
+            cached = self._load().pop(full_key, None)
+            pending = self._dirty.pop(full_key, None)
+            deleted = self._conn.execute("DELETE FROM ops WHERE full_key = ?", (full_key,)).rowcount
+        if cached or pending or deleted:
+            logger.info("Idempotency invalidated: %s for %s...", operation, key[:8])
 
 
 # Singleton
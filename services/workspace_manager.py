@@ -9,20 +9,136 @@ No Docker, no complex orchestration — just Git.
 
 import subprocess
 import shutil
+import json
 import os
+import atexit
+import threading
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 import logging
 
+from services.git_lock import get_git_lock_manager
+
 # Try to import yaml, fallback to simple implementation
 try:
     import yaml
+    # libyaml C loader/dumper when PyYAML was built with it (same output, ~10x faster)
+    _YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    _YamlDumper = getattr(yaml, "CDumper", yaml.Dumper)
 except ImportError:
     yaml = None
 
+# In-process git object reads (optional, falls back to `git show`)
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
 logger = logging.getLogger("WorkspaceManager")
 
+# Resolved once: subprocess can use posix_spawn (no fork of this process)
+# only for a path executable with close_fds=False
+GIT = shutil.which("git") or "git"
+_SPAWN_KWARGS = {"close_fds": False} if os.name == "posix" else {}
+
+
+@lru_cache(maxsize=None)
+def open_repo(path: str = ".") -> "pygit2.Repository":
+    """Shared pygit2 repository handle for `path` (requires pygit2)."""
+    return pygit2.Repository(path)
+
+
+class _CatFileBatch:
+    """
+    One persistent `git cat-file --batch` process for blob reads.
+    
+    Each read is a line written to its stdin and a sized reply, instead of a
+    `git show` fork+exec per META.yml. Restarted if it dies; closed at exit.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._proc: Optional[subprocess.Popen] = None
+        atexit.register(self.close)
+    
+    def read(self, spec: str) -> Optional[bytes]:
+        """
+        Contents of `spec` (e.g. "<sha>:META.yml").
+        
+        Returns:
+            Blob bytes, or None if the object doesn't exist
+            
+        Raises:
+            OSError: if the process can't be started or died mid-read
+        """
+        with self._lock:
+            if self._proc is not None and self._proc.poll() is not None:
+                self._stop()
+            if self._proc is None:
+                self._proc = subprocess.Popen(
+                    [GIT, "cat-file", "--batch"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    **_SPAWN_KWARGS
+                )
+            proc = self._proc
+            try:
+                proc.stdin.write(spec.encode("utf-8") + b"\n")
+                proc.stdin.flush()
+                header = proc.stdout.readline().split()  # "<oid> <type> <size>" or "<spec> missing"
+                if len(header) != 3:
+                    if header:
+                        return None
+                    raise OSError("git cat-file exited")
+                size = int(header[2])
+                data = proc.stdout.read(size)
+                proc.stdout.read(1)  # trailing LF
+                if len(data) != size:
+                    raise OSError("git cat-file exited")
+                return data
+            except (OSError, ValueError):
+                self._stop()
+                raise OSError("git cat-file --batch failed")
+    
+    def close(self):
+        """Stop the process (EOF on stdin)."""
+        with self._lock:
+            self._stop()
+    
+    def _stop(self):
+        """Close the pipes and reap the process (lock held)."""
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass  # broken pipe: already dead
+        proc.stdout.close()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+_cat_file = _CatFileBatch()
+
+
+@lru_cache(maxsize=512)
+def _meta_at_commit(sha: str) -> Optional[Dict[str, Any]]:
+    """META.yml at commit `sha`: a commit never changes, so it is read once per process."""
+    return WorkspaceManager._read_meta(sha)
+
+
+@lru_cache(maxsize=4096)
+def parse_iso(value: str) -> datetime:
+    """Parse a META.yml timestamp (ISO 8601, "Z" suffix allowed); cached per string."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
 
 class WorkspaceManager:
     """
@@ -37,6 +153,7 @@ class WorkspaceManager:
     
     BASE_WORKTREE = Path("./worktrees")
     ENV_TEMPLATE = Path(".env")
+    INDEX_FILE = Path(".cache/workspaces_index.json")  # list_workspaces(cached=True)
     
     def __init__(self, base_path: Optional[Path] = None):
         """
@@ -84,7 +201,8 @@ class WorkspaceManager:
             logger.info(f"📦 Created branch: {branch}")
             
             # 2. Create worktree
-            self._run_git(["worktree", "add", str(worktree), branch])
+            with get_git_lock_manager().worktree_lock():
+                self._run_git(["worktree", "add", str(worktree), branch])
             logger.info(f"📂 Created worktree: {worktree}")
             
             # 3. Copy .env (not symlink for true isolation)
@@ -135,7 +253,8 @@ class WorkspaceManager:
             cmd = ["worktree", "remove", str(worktree)]
             if force:
                 cmd.insert(2, "--force")
-            self._run_git(cmd)
+            with get_git_lock_manager().worktree_lock():
+                self._run_git(cmd)
             logger.info(f"📂 Removed worktree: {worktree}")
             
             # Delete branch
@@ -194,69 +313,186 @@ class WorkspaceManager:
             self._run_git_in_worktree(worktree, ["commit", "-m", msg])
             logger.info(f"📝 Updated META.yml: {updates}")
     
-    def list_workspaces(self) -> list:
+    def list_workspaces(self, cached: bool = False) -> list:
         """
         List all active workspaces.
         
+        Args:
+            cached: Reuse META.yml parsed on a previous run for branches whose
+                tip commit hasn't moved (index in .cache/workspaces_index.json).
+                Only changed branches are re-read with `git show`.
+        
         Returns:
             List of dicts with workspace info
         """
-        result = []
+        return list(self.iter_workspaces(cached))
+    
+    def iter_workspaces(self, cached: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Yield workspace info dicts one at a time (see list_workspaces).
         
+        The cache index is updated once the generator is exhausted.
+        """
         try:
             output = subprocess.check_output(
-                ["git", "for-each-ref", "--format=%(refname:short)", "refs/heads/feat/*"],
+                [GIT, "for-each-ref", "--format=%(refname:short) %(objectname)", "refs/heads/feat/*"],
                 stderr=subprocess.DEVNULL,
-                encoding="utf-8",
-                errors="replace"
-            ).strip()
+                **_SPAWN_KWARGS
+            ).decode("utf-8", errors="replace").strip()
+        except subprocess.CalledProcessError:
+            return
+        
+        if not output:
+            return
+        
+        index = self._load_index() if cached else {}
+        fresh_index = {}
+        
+        for line in output.splitlines():
+            branch, sha = line.rsplit(" ", 1)
+            entry = index.get(branch)
+            if entry and entry[0] == sha:
+                meta = entry[1]
+            else:
+                meta = self._show_meta(sha)  # None: branch without META.yml — skip
+            fresh_index[branch] = [sha, meta]
             
-            if not output:
-                return []
+            if meta is not None:
+                meta = dict(meta)
+                meta["branch"] = branch
+                yield meta
+        
+        if cached and fresh_index != index:
+            self._save_index(fresh_index)
+    
+    def branch_sha(self, branch: str) -> Optional[str]:
+        """
+        Tip commit of `branch`, read from the loose ref or packed-refs
+        (no git process); `git rev-parse` as fallback.
+        
+        Args:
+            branch: Branch name (e.g., "feat/delivery-456")
             
-            for branch in output.splitlines():
-                try:
-                    # Try to get META.yml from branch
-                    meta_yaml = subprocess.check_output(
-                        ["git", "show", f"{branch}:META.yml"],
-                        stderr=subprocess.DEVNULL,
-                        encoding="utf-8",
-                        errors="replace"
-                    )
-                    
-                    meta = self._parse_yaml(meta_yaml)
-                    meta["branch"] = branch
-                    result.append(meta)
-                except subprocess.CalledProcessError:
-                    # Branch without META.yml — skip
-                    continue
-                    
+        Returns:
+            Commit SHA, or None if the branch doesn't exist
+        """
+        git_dir = Path(".git")
+        if git_dir.is_dir():
+            try:
+                return (git_dir / "refs" / "heads" / branch).read_text().strip()
+            except OSError:
+                pass
+            try:
+                ref = f" refs/heads/{branch}"
+                for line in (git_dir / "packed-refs").read_text().splitlines():
+                    if line.endswith(ref):
+                        return line.split(" ", 1)[0]
+            except OSError:
+                pass
+        try:
+            return self._run_git(["rev-parse", "--verify", "-q", f"refs/heads/{branch}"])
         except subprocess.CalledProcessError:
-            pass
+            return None
+    
+    def get_branch_meta(self, branch: str) -> Optional[Dict[str, Any]]:
+        """
+        META.yml at the tip of `branch`, via the list_workspaces index.
+        
+        The index is keyed by tip SHA, so a hit needs no git process; on a
+        miss the META is read with `git show` and the index updated.
         
-        return result
+        Args:
+            branch: Branch name (e.g., "feat/delivery-456")
+            
+        Returns:
+            Parsed META.yml, or None if the branch or its META.yml is missing
+        """
+        sha = self.branch_sha(branch)
+        if sha is None:
+            return None
+        
+        index = self._load_index()
+        entry = index.get(branch)
+        if entry and entry[0] == sha:
+            return entry[1]
+        
+        meta = self._show_meta(sha)
+        index[branch] = [sha, meta]
+        self._save_index(index)
+        return meta
     
     # === Private Methods ===
     
+    def _show_meta(self, sha: str) -> Optional[Dict[str, Any]]:
+        """META.yml at commit `sha`, or None (a copy; parsed once per SHA per process)."""
+        meta = _meta_at_commit(sha)
+        return dict(meta) if meta is not None else None
+    
+    @staticmethod
+    def _read_meta(sha: str) -> Optional[Dict[str, Any]]:
+        """
+        Read and parse META.yml at commit `sha`, or None.
+        
+        Read in-process with pygit2 if available, else through the shared
+        `git cat-file --batch` process, else with `git show`.
+        """
+        if pygit2 is not None:
+            try:
+                blob = open_repo().revparse_single(f"{sha}:META.yml")
+                return WorkspaceManager._parse_yaml(blob.data.decode("utf-8", errors="replace"))
+            except (KeyError, ValueError, pygit2.GitError):
+                return None
+        try:
+            meta_yaml = _cat_file.read(f"{sha}:META.yml")
+        except OSError:
+            try:
+                meta_yaml = subprocess.check_output(
+                    [GIT, "show", f"{sha}:META.yml"],
+                    stderr=subprocess.DEVNULL,
+                    **_SPAWN_KWARGS
+                )
+            except subprocess.CalledProcessError:
+                return None
+        if meta_yaml is None:
+            return None
+        return WorkspaceManager._parse_yaml(meta_yaml.decode("utf-8", errors="replace"))
+    
+    def _load_index(self) -> dict:
+        """Read the list_workspaces index: {branch: [tip_sha, meta]}."""
+        try:
+            return json.loads(self.INDEX_FILE.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_index(self, index: dict) -> None:
+        """Write the list_workspaces index atomically."""
+        try:
+            self.INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.INDEX_FILE.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(index, default=str), encoding="utf-8")
+            os.replace(tmp, self.INDEX_FILE)
+        except OSError as e:
+            logger.debug(f"Workspace index not saved: {e}")
+    
     def _run_git(self, args: list) -> str:
         """Run git command in main repo."""
         result = subprocess.run(
-            ["git"] + args,
+            [GIT] + args,
             check=True,
             capture_output=True,
-            text=True
+            **_SPAWN_KWARGS
         )
-        return result.stdout.strip()
+        return result.stdout.decode("utf-8", errors="replace").strip()
     
     def _run_git_in_worktree(self, worktree: Path, args: list) -> str:
         """Run git command in specific worktree."""
         result = subprocess.run(
-            ["git", "-C", str(worktree)] + args,
+            [GIT, "-C", str(worktree)] + args,
             check=True,
             capture_output=True,
-            text=True
+            **_SPAWN_KWARGS
         )
-        return result.stdout.strip()
+        return result.stdout.decode("utf-8", errors="replace").strip()
     
     def _get_main_branch(self) -> str:
         """Get name of main branch (main or master)."""
@@ -277,7 +513,7 @@ class WorkspaceManager:
     def _write_yaml(self, path: Path, data: dict) -> None:
         """Write dict to YAML file."""
         if yaml:
-            path.write_text(yaml.dump(data, default_flow_style=False, allow_unicode=True))
+            path.write_text(yaml.dump(data, Dumper=_YamlDumper, default_flow_style=False, allow_unicode=True))
         else:
             # Simple fallback without pyyaml
             lines = []
@@ -295,10 +531,11 @@ class WorkspaceManager:
         content = path.read_text()
         return self._parse_yaml(content)
     
-    def _parse_yaml(self, content: str) -> dict:
+    @staticmethod
+    def _parse_yaml(content: str) -> dict:
         """Parse YAML string to dict."""
         if yaml:
-            return yaml.safe_load(content)
+            return yaml.load(content, Loader=_YamlLoader)
         else:
             # Simple fallback parser
             result = {}
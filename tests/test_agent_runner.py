@@ -0,0 +1,137 @@
+"""
+Tests for AgentRunner service.
+"""
+
+import os
+import sys
+import time
+import subprocess
+import pytest
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from services import agent_runner
+from services.agent_runner import AgentRunner, wait_any
+
+
+def _runner_for(tmp_path, name: str, seconds: float) -> AgentRunner:
+    """Runner wrapping a real `sleep` child, without going through start()."""
+    runner = AgentRunner(name, "test")
+    runner.worktree = tmp_path / name
+    runner.worktree.mkdir()
+    runner.pid_file = runner.worktree / "agent.pid"
+    runner.log_file = runner.worktree / "agent.log"
+    runner.process = subprocess.Popen([sys.executable, "-c", f"import time; time.sleep({seconds})"])
+    runner.pid_file.write_text(str(runner.process.pid))
+    return runner
+
+
+class TestWaitAny:
+    """Tests for wait_any()."""
+    
+    @pytest.fixture
+    def runners(self, tmp_path):
+        """One short-lived and one long-lived child; both reaped afterwards."""
+        created = [_runner_for(tmp_path, "fast", 0.2), _runner_for(tmp_path, "slow", 30)]
+        yield created
+        for runner in created:
+            runner.process.kill()
+            runner.process.wait()
+    
+    def test_returns_exited_runner(self, runners):
+        """Should wake when the first child exits and return only it."""
+        fast, slow = runners
+        exited = wait_any(runners, timeout=10)
+        assert exited == [fast]
+        assert slow.is_running()
+    
+    def test_timeout_returns_empty(self, runners):
+        """Should return [] when nothing exits before the timeout."""
+        slow = runners[1]
+        assert wait_any([slow], timeout=0.1) == []
+    
+    def test_missing_pid_file_returns_runner(self, tmp_path):
+        """A runner without agent.pid has nothing to wait for."""
+        runner = AgentRunner("nopid", "test")
+        runner.pid_file = tmp_path / "agent.pid"
+        assert wait_any([runner], timeout=1) == [runner]
+    
+    @pytest.mark.skipif(not hasattr(os, "pidfd_open"), reason="pidfd is Linux-only")
+    def test_pidfd_failure_sleeps_instead_of_spinning(self, runners, monkeypatch):
+        """If pidfd_open is denied (seccomp), each call should sleep poll_interval."""
+        def denied(pid):
+            raise PermissionError(1, "Operation not permitted")
+        
+        monkeypatch.setattr(agent_runner.os, "pidfd_open", denied)
+        slow = runners[1]
+        
+        calls = 0
+        started = time.monotonic()
+        while time.monotonic() - started < 0.5:
+            assert wait_any([slow], poll_interval=0.1) == []
+            calls += 1
+        assert calls <= 6
+    
+    @pytest.mark.skipif(not hasattr(os, "pidfd_open"), reason="pidfd is Linux-only")
+    def test_pidfd_failure_still_reports_exit(self, runners, monkeypatch):
+        """The polling fallback should still notice the child exiting."""
+        def denied(pid):
+            raise PermissionError(1, "Operation not permitted")
+        
+        monkeypatch.setattr(agent_runner.os, "pidfd_open", denied)
+        fast = runners[0]
+        
+        deadline = time.monotonic() + 10
+        exited = []
+        while not exited and time.monotonic() < deadline:
+            exited = wait_any([fast], poll_interval=0.05)
+        assert exited == [fast]
+
+
+class TestGetLogs:
+    """Tests for get_logs() reading the tail of agent.log backwards."""
+    
+    @pytest.fixture
+    def runner(self, tmp_path):
+        runner = AgentRunner("logs", "test")
+        runner.log_file = tmp_path / "agent.log"
+        return runner
+    
+    def test_no_log_file(self, runner):
+        assert runner.get_logs() == "No logs yet"
+    
+    def test_short_log_returned_whole(self, runner):
+        runner.log_file.write_text("one\ntwo\n")
+        assert runner.get_logs(tail=50) == "one\ntwo\n"
+    
+    @pytest.mark.parametrize("trailing_newline", [True, False])
+    def test_tail_spans_several_blocks(self, runner, trailing_newline):
+        """Lines far longer in total than one 8 KiB block; only the tail comes back."""
+        lines = [f"line {i:05d} " + "x" * 90 for i in range(2000)]
+        runner.log_file.write_text("\n".join(lines) + ("\n" if trailing_newline else ""))
+        
+        expected = "\n".join(lines[-120:]) + ("\n" if trailing_newline else "")
+        assert runner.get_logs(tail=120) == expected
+    
+    def test_line_longer_than_block(self, runner):
+        """A single line bigger than a block is returned intact, not cut at 8 KiB."""
+        long_line = "y" * 20000
+        runner.log_file.write_text("first\n" + long_line + "\nlast\n")
+        assert runner.get_logs(tail=2) == long_line + "\nlast\n"
+    
+    def test_max_bytes_drops_partial_first_line(self, runner):
+        """When max_bytes stops the scan, the cut-off first line is not returned."""
+        lines = [f"{i:04d}" + "z" * 95 for i in range(500)]  # 100 bytes per line
+        runner.log_file.write_text("\n".join(lines) + "\n")
+        
+        out = runner.get_logs(tail=400, max_bytes=8192)
+        returned = out.splitlines()
+        assert 0 < len(returned) < 400
+        assert returned == lines[-len(returned):]
+    
+    def test_invalid_utf8_replaced(self, runner):
+        runner.log_file.write_bytes(b"ok\n\xff\xfe broken\n")
+        assert runner.get_logs(tail=1) == "�� broken\n"
@@ -0,0 +1,95 @@
+"""
+Tests for CostTracker service.
+"""
+
+import json
+import sys
+import subprocess
+import pytest
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from services.cost_tracker import CostTracker, COST_PER_TOKEN
+
+
+@pytest.fixture(autouse=True)
+def ledger_dir(tmp_path, monkeypatch):
+    """Run each test against its own data/costs.json."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DAILY_BUDGET_USD", "1.0")
+    return tmp_path
+
+
+def _ledger(ledger_dir: Path) -> dict:
+    return json.loads((ledger_dir / "data" / "costs.json").read_text())
+
+
+class TestCostTrackerFlush:
+    """Tests for the in-memory batch and its merge into the shared file."""
+    
+    def test_records_are_batched_until_flush(self, ledger_dir):
+        """Records stay in memory until flush_every is reached."""
+        tracker = CostTracker(flush_every=10, flush_interval=3600)
+        tracker.record(1000)
+        assert _ledger(ledger_dir) == {}
+        assert tracker.get_spent_today() == pytest.approx(1000 * COST_PER_TOKEN["gemini-2.0-flash"])
+        
+        tracker.flush()
+        day = _ledger(ledger_dir)[tracker.today]
+        assert day["tokens"] == 1000
+        assert day["requests"] == 1
+    
+    def test_flush_merges_with_other_writers(self, ledger_dir):
+        """A flush adds its deltas to the file instead of overwriting it."""
+        a = CostTracker(flush_every=100, flush_interval=3600)
+        b = CostTracker(flush_every=100, flush_interval=3600)
+        a.record(100)
+        b.record(200)
+        b.record(300)
+        a.flush()
+        b.flush()
+        
+        day = _ledger(ledger_dir)[a.today]
+        assert day["tokens"] == 600
+        assert day["requests"] == 3
+    
+    def test_checker_sees_other_writers(self, ledger_dir):
+        """A tracker that never records still sees what others flushed."""
+        checker = CostTracker()
+        assert checker.check(estimated_cost=0.0)
+        
+        agent = CostTracker(flush_every=1)
+        agent.record(10_000_000)  # $3.50 with a $1 budget
+        
+        assert checker.get_spent_today() == pytest.approx(agent.get_spent_today())
+        assert checker.check(estimated_cost=0.0) is False
+    
+    def test_reload_keeps_local_unflushed_deltas(self, ledger_dir):
+        """Reloading after another flush must not drop this process's pending records."""
+        a = CostTracker(flush_every=100, flush_interval=3600)
+        b = CostTracker(flush_every=1)
+        a.record(100)
+        b.record(200)
+        
+        assert a.get_report()["tokens"] == 300
+        a.flush()
+        assert _ledger(ledger_dir)[a.today]["tokens"] == 300
+    
+    def test_concurrent_processes_do_not_lose_records(self, ledger_dir):
+        """Processes flushing at the same time all land in the ledger."""
+        script = (
+            "import sys; sys.path.insert(0, %r)\n"
+            "from services.cost_tracker import CostTracker\n"
+            "t = CostTracker(flush_every=1)\n"
+            "for _ in range(25):\n"
+            "    t.record(1)\n"
+        ) % str(BASE_DIR)
+        procs = [subprocess.Popen([sys.executable, "-c", script]) for _ in range(4)]
+        assert all(p.wait(timeout=60) == 0 for p in procs)
+        
+        day = next(iter(_ledger(ledger_dir).values()))
+        assert day["requests"] == 100
+        assert day["tokens"] == 100
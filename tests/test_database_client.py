@@ -0,0 +1,183 @@
+"""
+Tests for the COPY encoders and bulk insert in cloud/database/client.py.
+
+Expected bytes were produced by PostgreSQL 16 with
+`COPY (SELECT <value>) TO STDOUT (FORMAT binary)`.
+"""
+
+import json
+import struct
+import sys
+import pytest
+from contextlib import contextmanager
+from decimal import Decimal
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from cloud.database.client import (
+    PAIN_COLUMNS,
+    DatabaseClient,
+    _bin_numeric,
+    _bin_text_array,
+    _pains_binary_buffer,
+)
+
+
+def read_pgcopy(data: bytes) -> list:
+    """Split a PGCOPY buffer into rows of raw field bytes (None for NULL)."""
+    assert data[:11] == b"PGCOPY\n\xff\r\n\x00"
+    flags, ext_len = struct.unpack_from("!ii", data, 11)
+    assert (flags, ext_len) == (0, 0)
+    pos = 19
+    rows = []
+    while True:
+        (count,) = struct.unpack_from("!h", data, pos)
+        pos += 2
+        if count == -1:
+            assert pos == len(data), "bytes after trailer"
+            return rows
+        row = []
+        for _ in range(count):
+            (size,) = struct.unpack_from("!i", data, pos)
+            pos += 4
+            if size == -1:
+                row.append(None)
+            else:
+                row.append(data[pos:pos + size])
+                pos += size
+        rows.append(row)
+
+
+class TestBinNumeric:
+    """NUMERIC send format: base-10000 digits aligned on the decimal point."""
+    
+    @pytest.mark.parametrize("value, expected", [
+        ("0", "0000000000000000"),
+        ("-0", "0000000000000000"),
+        ("12.5", "0002000000000001000c1388"),
+        ("-1234.56789", "000300004000000504d2162e2328"),
+        ("0.001", "0001ffff00000003000a"),
+        ("0.10", "0001ffff0000000203e8"),
+        ("10000", "00010001000000000001"),
+        ("1E+3", "000100000000000003e8"),
+        ("12345678.9", "000300010000000104d2162e2328"),
+        ("99999999.99", "0003000100000002270f270f26ac"),
+    ])
+    def test_matches_postgres(self, value, expected):
+        assert _bin_numeric(value).hex() == expected
+    
+    def test_accepts_float_and_decimal(self):
+        assert _bin_numeric(12.5) == _bin_numeric(Decimal("12.5")) == _bin_numeric("12.5")
+    
+    @pytest.mark.parametrize("value", ["NaN", "Infinity"])
+    def test_rejects_special_values(self, value):
+        with pytest.raises(ValueError):
+            _bin_numeric(value)
+
+
+class TestBinTextArray:
+    """TEXT[] send format: ndim, has-null flag, element OID, dims, elements."""
+    
+    @pytest.mark.parametrize("items, expected", [
+        ([], "000000000000000000000019"),
+        (["a", "b c"], "0000000100000000000000190000000200000001000000016100000003622063"),
+        (["x", None], "00000001000000010000001900000002000000010000000178ffffffff"),
+        (["тест"], "000000010000000000000019000000010000000100000008d182d0b5d181d182"),
+    ])
+    def test_matches_postgres(self, items, expected):
+        assert _bin_text_array(items).hex() == expected
+
+
+class TestPainsBinaryBuffer:
+    """Whole-buffer layout for add_pains_bulk."""
+    
+    def test_round_trip(self):
+        cols = [
+            ["Slow taxi", "Kimyo"],
+            ["desc\twith tab\nnewline", None],
+            ["tech", "work"],
+            [3, 1],
+            [7, 10],
+            [5, 1],
+            [[{"url": "https://x", "n": 1}], None],
+            [["taxi", "yandex"], []],
+            [["ex1"], None],
+            ["idea", None],
+            [10.5, None],
+            [99.99, 0],
+        ]
+        rows = read_pgcopy(_pains_binary_buffer(cols).getvalue())
+        
+        assert len(rows) == 2
+        assert all(len(row) == len(PAIN_COLUMNS) for row in rows)
+        first, second = (dict(zip(PAIN_COLUMNS, row)) for row in rows)
+        
+        assert first["title"] == b"Slow taxi"
+        assert first["description"] == b"desc\twith tab\nnewline"
+        assert struct.unpack("!i", first["frequency"]) == (3,)
+        assert struct.unpack("!i", second["pain_score"]) == (10,)
+        assert first["sources"][:1] == b"\x01"  # JSONB format version
+        assert json.loads(first["sources"][1:]) == [{"url": "https://x", "n": 1}]
+        assert first["keywords"] == _bin_text_array(["taxi", "yandex"])
+        assert second["keywords"] == _bin_text_array([])
+        assert first["estimated_price_min"] == _bin_numeric("10.5")
+        assert second["estimated_price_max"] == _bin_numeric("0")
+        for name in ("description", "sources", "examples", "business_idea", "estimated_price_min"):
+            assert second[name] is None
+    
+    def test_empty_batch_is_header_and_trailer(self):
+        data = _pains_binary_buffer([[] for _ in PAIN_COLUMNS]).getvalue()
+        assert read_pgcopy(data) == []
+        assert len(data) == 19 + 2
+
+
+class TestAddPainsBulk:
+    """Missing columns and None values in add_pains_bulk."""
+    
+    @pytest.fixture
+    def copied(self, monkeypatch):
+        """Captures the COPY query and buffer instead of talking to PostgreSQL."""
+        calls = []
+        
+        class FakeCursor:
+            rowcount = 0
+            
+            def copy_expert(self, query, buf):
+                calls.append((query, buf.getvalue()))
+        
+        @contextmanager
+        def fake_cursor(self, *args, **kwargs):
+            yield FakeCursor()
+        
+        monkeypatch.setattr(DatabaseClient, "get_cursor", fake_cursor)
+        return calls
+    
+    def test_defaults_filled_for_missing_and_none(self, copied):
+        """frequency and sources get their schema DEFAULT instead of NULL."""
+        DatabaseClient().add_pains_bulk({
+            "title": ["a", "b"],
+            "category": ["tech", "work"],
+            "frequency": [None, 4],
+        })
+        
+        (query, data), = copied
+        assert "FORMAT binary" in query
+        first, second = (dict(zip(PAIN_COLUMNS, row)) for row in read_pgcopy(data))
+        assert struct.unpack("!i", first["frequency"]) == (1,)
+        assert struct.unpack("!i", second["frequency"]) == (4,)
+        assert json.loads(first["sources"][1:]) == []
+        assert first["pain_score"] is None
+        assert first["keywords"] is None
+    
+    def test_csv_fallback_fills_defaults(self, copied):
+        DatabaseClient().add_pains_bulk({"title": ["a"], "category": ["tech"]}, binary=False)
+        
+        (query, data), = copied
+        assert "FORMAT csv" in query
+        fields = dict(zip(PAIN_COLUMNS, data.rstrip("\n").split("\t")))
+        assert fields["frequency"] == "1"
+        assert fields["sources"] == "[]"
+        assert fields["pain_score"] == "\\N"
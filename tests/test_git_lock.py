@@ -0,0 +1,131 @@
+"""
+Tests for GitLockManager (run against a throwaway repo).
+"""
+
+import os
+import sys
+import signal
+import subprocess
+import time
+import pytest
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from services import git_lock
+from services.git_lock import GitLockManager
+
+
+def git(repo: Path, *args) -> str:
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, capture_output=True, text=True
+    ).stdout
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Repo with two committed files, a.txt and b.txt."""
+    for var in ("GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME"):
+        monkeypatch.setenv(var, "Test")
+    for var in ("GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"):
+        monkeypatch.setenv(var, "test@example.com")
+    git(tmp_path, "init", "-q", "-b", "main")
+    (tmp_path / "a.txt").write_text("a\n")
+    (tmp_path / "b.txt").write_text("b\n")
+    git(tmp_path, "add", "-A")
+    git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+class TestSafeCommit:
+    """Tests for GitLockManager.safe_commit()."""
+    
+    def test_commits_tracked_and_new_files(self, repo):
+        (repo / "a.txt").write_text("a2\n")
+        (repo / "new.txt").write_text("new\n")
+        manager = GitLockManager(repo)
+        
+        assert manager.safe_commit(repo, ["a.txt", "new.txt"], "feat: update")
+        assert git(repo, "show", "--name-only", "--format=", "HEAD").split() == ["a.txt", "new.txt"]
+        assert git(repo, "status", "--porcelain") == ""
+    
+    def test_staged_change_plus_unchanged_file(self, repo):
+        """Already-staged changes are committed even if the listed file is unchanged."""
+        (repo / "b.txt").write_text("b2\n")
+        git(repo, "add", "b.txt")
+        manager = GitLockManager(repo)
+        
+        assert manager.safe_commit(repo, ["a.txt"], "feat: staged")
+        assert git(repo, "log", "-1", "--format=%s") == "feat: staged\n"
+        assert git(repo, "show", "--name-only", "--format=", "HEAD").split() == ["b.txt"]
+        assert git(repo, "status", "--porcelain") == ""
+    
+    def test_nothing_to_commit_is_success(self, repo):
+        manager = GitLockManager(repo)
+        head = git(repo, "rev-parse", "HEAD")
+        
+        assert manager.safe_commit(repo, ["a.txt"], "noop")
+        assert git(repo, "rev-parse", "HEAD") == head
+    
+    def test_missing_file_fails(self, repo):
+        manager = GitLockManager(repo)
+        assert manager.safe_commit(repo, ["does-not-exist.txt"], "broken") is False
+
+
+@pytest.mark.skipif(git_lock.fcntl is None, reason="flock is POSIX-only")
+class TestFlockWait:
+    """Tests for the flock() timeout."""
+    
+    @pytest.fixture
+    def held_lock(self, tmp_path):
+        """A lock file held exclusively by another process."""
+        lock_file = tmp_path / "held.lock"
+        holder = subprocess.Popen([
+            sys.executable, "-c",
+            "import fcntl, sys, time\n"
+            f"f = open({str(lock_file)!r}, 'w')\n"
+            "fcntl.flock(f, fcntl.LOCK_EX)\n"
+            "print('locked', flush=True)\n"
+            "time.sleep(30)\n",
+        ], stdout=subprocess.PIPE, text=True)
+        assert holder.stdout.readline().strip() == "locked"
+        yield lock_file
+        holder.kill()
+        holder.wait()
+        holder.stdout.close()
+    
+    def test_times_out_on_contended_lock(self, held_lock):
+        fd = os.open(held_lock, os.O_RDWR)
+        try:
+            started = time.monotonic()
+            assert git_lock._flock_wait(fd, git_lock.fcntl.LOCK_EX, 0.3) is False
+            assert 0.25 <= time.monotonic() - started < 1.0
+        finally:
+            os.close(fd)
+    
+    @pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="needs setitimer")
+    def test_leaves_host_alarm_alone(self, held_lock):
+        """The caller's SIGALRM handler and pending itimer survive a lock wait."""
+        def handler(signum, frame):
+            pass
+        
+        previous = signal.signal(signal.SIGALRM, handler)
+        signal.setitimer(signal.ITIMER_REAL, 60)
+        fd = os.open(held_lock, os.O_RDWR)
+        try:
+            git_lock._flock_wait(fd, git_lock.fcntl.LOCK_EX, 0.1)
+            assert signal.getsignal(signal.SIGALRM) is handler
+            assert signal.getitimer(signal.ITIMER_REAL)[0] > 50
+        finally:
+            os.close(fd)
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    
+    def test_acquires_free_lock(self, tmp_path):
+        fd = os.open(tmp_path / "free.lock", os.O_RDWR | os.O_CREAT)
+        try:
+            assert git_lock._flock_wait(fd, git_lock.fcntl.LOCK_EX, 1) is True
+        finally:
+            os.close(fd)
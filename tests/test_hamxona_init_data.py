@@ -0,0 +1,92 @@
+"""
+Tests for Telegram Mini App initData validation in the Hamxona project
+(data/projects/hamxona_(tashkent_flatmate_finder)/src/utils.py).
+"""
+
+import hashlib
+import hmac
+import json
+import sys
+import pytest
+from pathlib import Path
+from urllib.parse import urlencode
+
+pytest.importorskip("fastapi")
+pytest.importorskip("pydantic_settings")
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROJECT_DIR = BASE_DIR / "data" / "projects" / "hamxona_(tashkent_flatmate_finder)"
+BOT_TOKEN = "123456:TEST-token"
+
+
+@pytest.fixture
+def utils(monkeypatch):
+    """Import the project's src.utils, isolated from other projects' `src` packages."""
+    monkeypatch.setenv("BOT_TOKEN", BOT_TOKEN)
+    monkeypatch.setenv("DATABASE_URL", "sqlite://")
+    saved = {name: mod for name, mod in sys.modules.items() if name == "src" or name.startswith("src.")}
+    for name in saved:
+        del sys.modules[name]
+    monkeypatch.syspath_prepend(str(PROJECT_DIR))
+    
+    import src.utils
+    yield src.utils
+    
+    for name in [name for name in sys.modules if name == "src" or name.startswith("src.")]:
+        del sys.modules[name]
+    sys.modules.update(saved)
+
+
+def sign(fields: dict) -> str:
+    """initData query string signed the way Telegram does it."""
+    check = "\n".join(f"{k}={v}" for k, v in sorted(fields.items()))
+    secret = hmac.new(b"WebAppData", BOT_TOKEN.encode(), hashlib.sha256).digest()
+    digest = hmac.new(secret, check.encode(), hashlib.sha256).hexdigest()
+    return urlencode({**fields, "hash": digest})
+
+
+USER = {"id": 42, "first_name": "Ali", "username": "ali=&?", "language_code": "uz"}
+
+
+def valid_fields() -> dict:
+    return {
+        "auth_date": "1700000000",
+        "query_id": "AAH=abc",
+        "start_param": "",
+        "user": json.dumps(USER, separators=(",", ":")),
+    }
+
+
+class TestValidateTelegramData:
+    """validate_telegram_data() against initData built like Telegram's."""
+    
+    def test_valid_data_returns_user(self, utils):
+        assert utils.validate_telegram_data(sign(valid_fields())) == USER
+    
+    def test_field_order_does_not_matter(self, utils):
+        query = sign(valid_fields())
+        shuffled = "&".join(reversed(query.split("&")))
+        assert utils.validate_telegram_data(shuffled) == USER
+    
+    def test_tampered_value_rejected(self, utils):
+        query = sign(valid_fields()).replace("auth_date=1700000000", "auth_date=1700000001")
+        with pytest.raises(utils.HTTPException) as exc:
+            utils.validate_telegram_data(query)
+        assert exc.value.status_code == 403
+    
+    def test_dropped_blank_value_rejected(self, utils):
+        """Blank values are part of the signed string, so removing one breaks the hash."""
+        query = sign(valid_fields()).replace("start_param=&", "")
+        with pytest.raises(utils.HTTPException) as exc:
+            utils.validate_telegram_data(query)
+        assert exc.value.status_code == 403
+    
+    def test_missing_hash_rejected(self, utils):
+        with pytest.raises(utils.HTTPException) as exc:
+            utils.validate_telegram_data(urlencode(valid_fields()))
+        assert exc.value.status_code == 403
+    
+    def test_empty_rejected(self, utils):
+        with pytest.raises(utils.HTTPException) as exc:
+            utils.validate_telegram_data("")
+        assert exc.value.status_code == 401
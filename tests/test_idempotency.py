@@ -0,0 +1,25 @@
+"""
+Tests for IdempotencyStore keys.
+"""
+
+import sys
+import hashlib
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from services.idempotency import _hash_key
+
+
+class TestGetKey:
+    """Keys are persisted, so the scheme must stay stable."""
+    
+    def test_key_is_sha256_prefix(self):
+        """Same scheme as before the cache: sha256("task:agent")[:16]."""
+        expected = hashlib.sha256(b"food delivery app:cpo").hexdigest()[:16]
+        assert _hash_key("  Food Delivery App ", "cpo") == expected
+    
+    def test_agent_is_part_of_key(self):
+        assert _hash_key("Food delivery app", "cpo") != _hash_key("Food delivery app", "tech_lead")
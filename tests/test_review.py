@@ -0,0 +1,195 @@
+"""
+Tests for the review CLI's git helpers (run against a throwaway repo).
+"""
+
+import sys
+import subprocess
+import pytest
+from pathlib import Path
+
+# Add project root to path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from services import git_lock
+from tools import review
+
+
+def git(*args, cwd=None) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def commit_file(path: str, content, message: str, cwd=None):
+    target = Path(cwd or ".") / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, bytes):
+        target.write_bytes(content)
+    else:
+        target.write_text(content)
+    git("add", "-A", cwd=cwd)
+    git("commit", "-q", "-m", message, cwd=cwd)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """Fresh repo with one commit on main; cwd and the git lock manager point at it."""
+    for var in ("GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME"):
+        monkeypatch.setenv(var, "Test")
+    for var in ("GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"):
+        monkeypatch.setenv(var, "test@example.com")
+    monkeypatch.chdir(tmp_path)
+    git("init", "-q", "-b", "main")
+    commit_file("README.md", "hello\n", "init")
+    monkeypatch.setattr(git_lock, "_manager", git_lock.GitLockManager(tmp_path))
+    return tmp_path
+
+
+def branch_exists(branch: str) -> bool:
+    return subprocess.run(
+        ["git", "rev-parse", "--verify", "-q", f"refs/heads/{branch}"], capture_output=True
+    ).returncode == 0
+
+
+class TestScheduleCleanup:
+    """Tests for the background worktree/branch reaper."""
+    
+    def test_removes_worktree_and_branch(self, repo, capsys):
+        """A merged branch and its worktree are both removed."""
+        worktree = repo / "worktrees" / "feat-a"
+        git("worktree", "add", "-q", "-b", "feat/a", str(worktree))
+        sha = git("rev-parse", "feat/a").strip()
+        
+        review.schedule_cleanup(worktree, "feat/a", sha)
+        review._reap_queue.join()
+        
+        assert not worktree.exists()
+        assert not branch_exists("feat/a")
+        assert "🧹 Cleaned up feat/a" in capsys.readouterr().out
+    
+    def test_keeps_branch_of_locked_worktree(self, repo):
+        """If the worktree can't be removed, its checked-out branch must survive."""
+        locked = repo / "worktrees" / "feat-locked"
+        free = repo / "worktrees" / "feat-free"
+        git("worktree", "add", "-q", "-b", "feat/locked", str(locked))
+        git("worktree", "add", "-q", "-b", "feat/free", str(free))
+        git("worktree", "lock", str(locked))
+        locked_sha = git("rev-parse", "feat/locked").strip()
+        free_sha = git("rev-parse", "feat/free").strip()
+        
+        review.schedule_cleanup(locked, "feat/locked", locked_sha)
+        review.schedule_cleanup(free, "feat/free", free_sha)
+        review._reap_queue.join()
+        
+        assert locked.exists()
+        assert branch_exists("feat/locked")
+        assert git("rev-parse", "HEAD", cwd=locked).strip() == locked_sha
+        assert not branch_exists("feat/free")
+    
+    def test_keeps_branch_that_moved(self, repo, capsys):
+        """A branch with commits after the merged SHA is not deleted."""
+        worktree = repo / "worktrees" / "feat-moved"
+        git("worktree", "add", "-q", "-b", "feat/moved", str(worktree))
+        merged_sha = git("rev-parse", "feat/moved").strip()
+        commit_file("later.txt", "later\n", "later", cwd=worktree)
+        
+        review.schedule_cleanup(worktree, "feat/moved", merged_sha)
+        review._reap_queue.join()
+        
+        assert branch_exists("feat/moved")
+        assert "⚠️ Cleanup for feat/moved kept: branch feat/moved" in capsys.readouterr().out
+
+
+def git_version() -> tuple:
+    out = subprocess.run(["git", "--version"], capture_output=True, text=True).stdout
+    return tuple(int(part) for part in out.split()[2].split(".")[:2])
+
+
+@pytest.mark.skipif(git_version() < (2, 38), reason="merge-tree --write-tree needs git >= 2.38")
+class TestHasMergeConflicts:
+    """Tests for the in-memory merge pre-check."""
+    
+    def test_clean_merge(self, repo):
+        git("checkout", "-q", "-b", "feat/clean")
+        commit_file("new file.txt", "new\n", "add file")
+        git("checkout", "-q", "main")
+        commit_file("README.md", "hello\nmain\n", "main change")
+        
+        assert review.has_merge_conflicts("feat/clean") == []
+    
+    def test_conflicting_paths_listed(self, repo):
+        commit_file("dir with space/notes.md", "base\n", "base")
+        git("checkout", "-q", "-b", "feat/conflict")
+        commit_file("dir with space/notes.md", "branch\n", "branch edit")
+        commit_file("README.md", "branch\n", "branch readme")
+        git("checkout", "-q", "main")
+        commit_file("dir with space/notes.md", "main\n", "main edit")
+        commit_file("README.md", "main\n", "main readme")
+        head = git("rev-parse", "HEAD").strip()
+        
+        conflicts = review.has_merge_conflicts("feat/conflict")
+        
+        assert sorted(conflicts) == ["README.md", "dir with space/notes.md"]
+        assert git("rev-parse", "HEAD").strip() == head  # main untouched
+        assert git("status", "--porcelain") == ""
+    
+    def test_unknown_branch_is_not_a_conflict(self, repo):
+        """An error (no tree printed) must not be reported as conflicts."""
+        assert review.has_merge_conflicts("does-not-exist") == []
+
+
+@pytest.fixture
+def diff_branch(repo):
+    """feat/diff vs main: a rename, a binary file, spaces and non-ASCII in paths."""
+    commit_file("docs/old name.md", "".join(f"line {i}\n" for i in range(20)), "base doc")
+    git("checkout", "-q", "-b", "feat/diff")
+    git("mv", "docs/old name.md", "docs/new name.md")
+    commit_file("docs/new name.md", "".join(f"line {i}\n" for i in range(20)) + "extra\n", "rename")
+    commit_file("assets/logo.png", b"\x89PNG\r\n\x1a\n\x00\x00binary", "binary")
+    commit_file("src/ölçü file.py", "a = 1\nb = 2\n", "unicode path")
+    commit_file("README.md", "hi\n", "edit readme")
+    git("checkout", "-q", "main")
+    return "feat/diff"
+
+
+NUMSTAT_IMPLS = [review._diff_numstat_git]
+if review.pygit2 is not None:
+    NUMSTAT_IMPLS.append(review._diff_numstat_pygit2)
+
+
+class TestDiffNumstat:
+    """Tests for the -z numstat parser (and the libgit2 variant, if installed)."""
+    
+    @pytest.mark.parametrize("numstat", NUMSTAT_IMPLS, ids=lambda fn: fn.__name__)
+    def test_parses_rename_binary_and_odd_paths(self, diff_branch, numstat):
+        stats, summary = numstat(diff_branch)
+        
+        assert sorted(stats, key=lambda s: s[2]) == [
+            ("1", "1", "README.md"),
+            ("-", "-", "assets/logo.png"),
+            ("1", "0", "docs/old name.md => docs/new name.md"),
+            ("2", "0", "src/ölçü file.py"),
+        ]
+        assert summary == " 4 files changed, 4 insertions(+), 1 deletion(-)"
+    
+    def test_parsers_agree(self, diff_branch):
+        if len(NUMSTAT_IMPLS) < 2:
+            pytest.skip("pygit2 not installed")
+        git_stats, git_summary = review._diff_numstat_git(diff_branch)
+        lib_stats, lib_summary = review._diff_numstat_pygit2(diff_branch)
+        assert sorted(git_stats) == sorted(lib_stats)
+        assert git_summary == lib_summary
+    
+    def test_no_changes(self, repo):
+        git("branch", "feat/same")
+        assert review._diff_numstat_git("feat/same") == ([], "")
+    
+    def test_branch_summary_formats_lines(self, diff_branch, monkeypatch):
+        monkeypatch.setattr(review, "pygit2", None)
+        summary = review.get_branch_summary(diff_branch)
+        
+        assert "docs/old name.md => docs/new name.md" in summary["files"]
+        lines = summary["diffstat"].splitlines()
+        assert any(line.startswith(" assets/logo.png") and line.endswith("| Bin") for line in lines)
+        assert lines[-1] == " 4 files changed, 4 insertions(+), 1 deletion(-)"
@@ -17,6 +17,7 @@ Usage:
 import sys
 import argparse
 from pathlib import Path
+from typing import Optional
 from datetime import datetime
 import logging
 
@@ -61,7 +62,7 @@ def auto_merge_task(wm: WorkspaceManager, task_id: str, dry_run: bool = False) -
     branch = f"feat/{task_id}"
     
     if dry_run:
-        logger.info(f"[DRY RUN] Would merge: {branch}")
+        logger.info("[DRY RUN] Would merge: %s", branch)
         return True
     
     try:
@@ -71,48 +72,89 @@ def auto_merge_task(wm: WorkspaceManager, task_id: str, dry_run: bool = False) -
         if success:
             # Cleanup worktree
             wm.remove(task_id, force=True)
-            logger.info(f"Merged and cleaned: {task_id}")
+            logger.info("Merged and cleaned: %s", task_id)
             return True
         else:
-            logger.error(f"Failed to merge: {task_id}")
+            logger.error("Failed to merge: %s", task_id)
             return False
             
     except Exception as e:
-        logger.error(f"Auto-merge error for {task_id}: {e}")
+        logger.error("Auto-merge error for %s: %s", task_id, e)
         return False
 
 
-def run_auto_merge(min_xp: int = 80, dry_run: bool = False):
+def merge_tasks(wm: WorkspaceManager, task_ids: list, dry_run: bool = False) -> list:
+    """
+    Merge several tasks with one lock cycle (octopus merge, per-branch fallback).
+    
+    Args:
+        wm: WorkspaceManager instance
+        task_ids: Tasks to merge
+        dry_run: Don't actually merge
+        
+    Returns:
+        Task IDs merged successfully
+    """
+    if dry_run:
+        for task_id in task_ids:
+            logger.info("[DRY RUN] Would merge: feat/%s", task_id)
+        return list(task_ids)
+    
+    if len(task_ids) <= 1:
+        return [t for t in task_ids if auto_merge_task(wm, t)]
+    
+    try:
+        git_lock = get_git_lock_manager()
+        merged_branches = git_lock.safe_merge_many([f"feat/{t}" for t in task_ids], "main")
+    except Exception as e:
+        logger.error("Auto-merge error: %s", e)
+        return []
+    
+    merged = []
+    for task_id in task_ids:
+        if f"feat/{task_id}" not in merged_branches:
+            logger.error("Failed to merge: %s", task_id)
+            continue
+        try:
+            # Cleanup worktree
+            wm.remove(task_id, force=True)
+            logger.info("Merged and cleaned: %s", task_id)
+        except Exception as e:
+            logger.error("Merged %s, cleanup failed: %s", task_id, e)
+        merged.append(task_id)
+    return merged
+
+
+def run_auto_merge(min_xp: int = 80, dry_run: bool = False, wm: Optional[WorkspaceManager] = None):
     """
     Run auto-merge for all qualifying tasks.
     """
-    wm = WorkspaceManager()
-    workspaces = wm.list_workspaces()
+    wm = wm or WorkspaceManager()
+    workspaces = wm.list_workspaces(cached=True)
     
     logger.info("=" * 60)
-    logger.info(f"AUTO-MERGE (min_xp={min_xp}, dry_run={dry_run})")
+    logger.info("AUTO-MERGE (min_xp=%s, dry_run=%s)", min_xp, dry_run)
     logger.info("=" * 60)
     
-    merged = 0
+    qualifying = []
     skipped = 0
-    failed = 0
     
     for ws in workspaces:
         meta = ws.get("meta", {})
         task_id = ws.get("task_id", "unknown")
         
         if should_auto_merge(meta, min_xp):
-            logger.info(f"Qualifying: {task_id} (XP={meta.get('xp_reward', 0)})")
-            
-            if auto_merge_task(wm, task_id, dry_run):
-                merged += 1
-            else:
-                failed += 1
+            logger.info("Qualifying: %s (XP=%s)", task_id, meta.get('xp_reward', 0))
+            qualifying.append(task_id)
         else:
             skipped += 1
     
+    merged_ids = merge_tasks(wm, qualifying, dry_run)
+    merged = len(merged_ids)
+    failed = len(qualifying) - merged
+    
     logger.info("=" * 60)
-    logger.info(f"Merged: {merged}, Skipped: {skipped}, Failed: {failed}")
+    logger.info("Merged: %s, Skipped: %s, Failed: %s", merged, skipped, failed)
     logger.info("=" * 60)
     
     return {"merged": merged, "skipped": skipped, "failed": failed}
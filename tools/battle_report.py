@@ -7,68 +7,61 @@ Usage:
 
 import json
 import sys
+from collections import Counter
 from pathlib import Path
+from typing import Optional
 from datetime import datetime
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from services.workspace_manager import WorkspaceManager
+from services.workspace_manager import WorkspaceManager, parse_iso
 
 
-def generate_report():
-    """Generate battle report from all workspaces."""
-    wm = WorkspaceManager()
-    workspaces = wm.list_workspaces()
-    
-    if not workspaces:
-        print("No workspaces found.")
-        return
+def generate_report(wm: Optional[WorkspaceManager] = None):
+    """Generate battle report from all workspaces (single streaming pass)."""
+    wm = wm or WorkspaceManager()
     
     # Collect metrics
-    total = len(workspaces)
-    completed = 0
-    failed = 0
-    running = 0
-    backlog = 0
-    
+    total = 0
+    status_counts = Counter()
     total_xp = 0
-    durations = []
+    duration_sum = 0.0
+    duration_count = 0
     
-    print("=" * 60)
-    print("📊 BATTLE REPORT")
-    print("=" * 60)
-    print(f"Generated: {datetime.now().isoformat()}")
-    print()
-    
-    for ws in workspaces:
+    for ws in wm.iter_workspaces(cached=True):
         meta = ws.get("meta", {})
-        status = meta.get("status", "unknown")
-        xp = meta.get("xp_reward", 0) or 0
-        
-        if status == "completed":
-            completed += 1
-        elif status == "failed":
-            failed += 1
-        elif status == "running":
-            running += 1
-        elif status == "backlog":
-            backlog += 1
-        
-        total_xp += xp
+        total += 1
+        status_counts[meta.get("status", "unknown")] += 1
+        total_xp += meta.get("xp_reward", 0) or 0
         
         # Calculate duration if timestamps available
         created = meta.get("created_at")
         updated = meta.get("updated_at")
         if created and updated:
             try:
-                start = datetime.fromisoformat(created.replace("Z", "+00:00"))
-                end = datetime.fromisoformat(updated.replace("Z", "+00:00"))
-                duration = (end - start).total_seconds()
-                durations.append(duration)
+                start = parse_iso(created)
+                end = parse_iso(updated)
+                duration_sum += (end - start).total_seconds()
+                duration_count += 1
             except:
                 pass
     
-    avg_duration = sum(durations) / len(durations) if durations else 0
+    if not total:
+        print("No workspaces found.")
+        return
+    
+    completed = status_counts["completed"]
+    failed = status_counts["failed"]
+    running = status_counts["running"]
+    backlog = status_counts["backlog"]
+    
+    print("=" * 60)
+    print("📊 BATTLE REPORT")
+    print("=" * 60)
+    print(f"Generated: {datetime.now().isoformat()}")
+    print()
+    
+    avg_duration = duration_sum / duration_count if duration_count else 0
     success_rate = (completed / total * 100) if total > 0 else 0
     
     report = {
@@ -11,17 +11,18 @@ Usage:
 import argparse
 import sys
 from pathlib import Path
+from typing import Optional
 from datetime import datetime, timedelta
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from services.workspace_manager import WorkspaceManager
+from services.workspace_manager import WorkspaceManager, parse_iso
 
 
-def cleanup(max_age_days: int = 7, dry_run: bool = False):
+def cleanup(max_age_days: int = 7, dry_run: bool = False, wm: Optional[WorkspaceManager] = None):
     """Remove old completed/failed tasks."""
-    wm = WorkspaceManager()
-    workspaces = wm.list_workspaces()
+    wm = wm or WorkspaceManager()
+    workspaces = wm.list_workspaces(cached=True)
     
     now = datetime.now()
     removed = 0
@@ -48,7 +49,7 @@ def cleanup(max_age_days: int = 7, dry_run: bool = False):
             continue
         
         try:
-            created = datetime.fromisoformat(created_str.replace("Z", "+00:00"))
+            created = parse_iso(created_str)
             age = now - created.replace(tzinfo=None)
             
             if age.days > max_age_days:
@@ -0,0 +1,122 @@
+"""
+Tools Daemon — Run the cron tools from one long-lived process.
+
+Keeps a single WorkspaceManager and GitLockManager loaded, so each cron
+tick skips interpreter startup and imports. One JSON request per line,
+one JSON response per line:
+
+    {"cmd": "auto_merge", "min_xp": 80, "dry_run": true}
+    {"cmd": "cleanup", "max_age_days": 7}
+    {"cmd": "battle_report"}
+    {"cmd": "daily_report", "output_file": "daily.log"}
+
+Usage:
+    python tools/daemon.py                        # listen on /tmp/uz.sock
+    python tools/daemon.py --stdin                # read requests from stdin
+
+Cron (instead of starting python every minute):
+    * * * * * echo '{"cmd": "auto_merge"}' | socat - UNIX-CONNECT:/tmp/uz.sock
+"""
+
+import io
+import os
+import sys
+import json
+import argparse
+import socketserver
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.workspace_manager import WorkspaceManager
+from services.git_lock import get_git_lock_manager
+from tools.auto_merge import run_auto_merge
+from tools.cleanup_old_tasks import cleanup
+from tools.battle_report import generate_report
+from tools.daily_report import generate_daily_report
+
+SOCKET_PATH = "/tmp/uz.sock"
+
+COMMANDS = {
+    "auto_merge": lambda wm, req: run_auto_merge(
+        min_xp=req.get("min_xp", 80), dry_run=req.get("dry_run", False), wm=wm
+    ),
+    "cleanup": lambda wm, req: cleanup(
+        max_age_days=req.get("max_age_days", 7), dry_run=req.get("dry_run", False), wm=wm
+    ),
+    "battle_report": lambda wm, req: generate_report(wm=wm),
+    "daily_report": lambda wm, req: generate_daily_report(req.get("output_file"), wm=wm),
+}
+
+
+class ToolsDaemon:
+    """Dispatches JSON requests to the tool functions, sharing one WorkspaceManager."""
+    
+    def __init__(self):
+        self.wm = WorkspaceManager()
+        get_git_lock_manager()  # warm the singleton used by auto_merge
+    
+    def handle(self, line: str) -> dict:
+        """
+        Run one request.
+        
+        Args:
+            line: JSON request, e.g. '{"cmd": "cleanup", "dry_run": true}'
+        
+        Returns:
+            {"ok": bool, "result": ..., "output": captured stdout} or {"ok": False, "error": ...}
+        """
+        try:
+            req = json.loads(line)
+            handler = COMMANDS[req["cmd"]]
+        except (ValueError, KeyError, TypeError):
+            return {"ok": False, "error": f"bad request, expected one of: {', '.join(COMMANDS)}"}
+        
+        out = io.StringIO()
+        try:
+            with redirect_stdout(out):
+                result = handler(self.wm, req)
+        except Exception as e:
+            return {"ok": False, "error": str(e), "output": out.getvalue()}
+        return {"ok": True, "result": result, "output": out.getvalue()}
+
+
+def serve_stdin(daemon: ToolsDaemon):
+    """Answer requests from stdin until EOF."""
+    for line in sys.stdin:
+        if line.strip():
+            print(json.dumps(daemon.handle(line), default=str), flush=True)
+
+
+def serve_socket(daemon: ToolsDaemon, path: str):
+    """Answer one request per connection on a Unix socket (one at a time)."""
+    
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            line = self.rfile.readline().decode("utf-8")
+            response = daemon.handle(line)
+            self.wfile.write((json.dumps(response, default=str) + "\n").encode("utf-8"))
+    
+    if os.path.exists(path):
+        os.unlink(path)  # left over from a previous run
+    
+    with socketserver.UnixStreamServer(path, Handler) as server:
+        print(f"🛰️ Tools daemon listening on {path}")
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tools daemon")
+    parser.add_argument("--stdin", action="store_true", help="Read requests from stdin")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path")
+    
+    args = parser.parse_args()
+    daemon = ToolsDaemon()
+    if args.stdin:
+        serve_stdin(daemon)
+    else:
+        serve_socket(daemon, args.socket)
@@ -9,17 +9,19 @@ Creates a summary of tasks processed in the last 24 hours.
 
 import json
 import sys
+from collections import Counter
 from pathlib import Path
+from typing import Optional
 from datetime import datetime, timedelta
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from services.workspace_manager import WorkspaceManager
+from services.workspace_manager import WorkspaceManager, parse_iso
 
 
-def generate_daily_report(output_file: str = None):
+def generate_daily_report(output_file: str = None, wm: Optional[WorkspaceManager] = None):
     """Generate daily metrics report."""
-    wm = WorkspaceManager()
+    wm = wm or WorkspaceManager()
     workspaces = wm.list_workspaces()
     
     now = datetime.now()
@@ -32,17 +34,18 @@ def generate_daily_report(output_file: str = None):
         created_str = meta.get("created_at")
         if created_str:
             try:
-                created = datetime.fromisoformat(created_str.replace("Z", "+00:00"))
+                created = parse_iso(created_str)
                 if created.replace(tzinfo=None) > yesterday:
                     recent.append(ws)
             except:
                 pass
     
-    # Count by status
-    completed = sum(1 for w in recent if w.get("meta", {}).get("status") == "completed")
-    failed = sum(1 for w in recent if w.get("meta", {}).get("status") == "failed")
-    running = sum(1 for w in recent if w.get("meta", {}).get("status") == "running")
-    backlog = sum(1 for w in recent if w.get("meta", {}).get("status") == "backlog")
+    # Count by status (one pass)
+    status_counts = Counter(w.get("meta", {}).get("status") for w in recent)
+    completed = status_counts["completed"]
+    failed = status_counts["failed"]
+    running = status_counts["running"]
+    backlog = status_counts["backlog"]
     
     # XP
     total_xp = sum(w.get("meta", {}).get("xp_reward", 0) or 0 for w in recent)
@@ -55,8 +58,8 @@ def generate_daily_report(output_file: str = None):
         updated = meta.get("updated_at")
         if created and updated and meta.get("status") == "completed":
             try:
-                start = datetime.fromisoformat(created.replace("Z", "+00:00"))
-                end = datetime.fromisoformat(updated.replace("Z", "+00:00"))
+                start = parse_iso(created)
+                end = parse_iso(updated)
                 durations.append((end - start).total_seconds())
             except:
                 pass
@@ -6,22 +6,23 @@ Usage:
     python tools/new_task.py "MVP Delivery App" --agent=tech_lead --skill=prd-standard-uz
 """
 
+import re
 import sys
 import argparse
+from datetime import datetime
 from pathlib import Path
 
 # Add project root to path
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+
 
 def generate_task_id(title: str) -> str:
     """Generate task ID from title."""
-    import re
-    from datetime import datetime
-    
     # Slugify title
-    slug = re.sub(r'[^a-z0-9]+', '-', title.lower())[:20].strip('-')
+    slug = _SLUG_RE.sub('-', title.lower())[:20].strip('-')
     
     # Add timestamp
     ts = datetime.now().strftime("%H%M")
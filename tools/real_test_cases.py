@@ -31,6 +31,8 @@ def create_real_tasks():
     print("🧪 CREATING REAL TEST CASES")
     print("=" * 60)
     
+    # Sequential on purpose: wm.create runs `git branch` in the shared repo
+    # without a lock, so concurrent creates can collide on ref locks
     for i, idea in enumerate(REAL_TASKS, 1):
         # Generate task ID
         task_id = f"battle-{i:03d}"
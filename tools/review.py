@@ -7,52 +7,108 @@ Usage:
     python tools/review.py list              # List pending reviews
 """
 
+import atexit
+import queue
 import subprocess
 import sys
 import os
+import threading
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 
 # Add project root to path
 BASE_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
+from services.git_lock import get_git_lock_manager
+from services.workspace_manager import WorkspaceManager, pygit2, open_repo
+
 
 def get_branch_meta(branch: str) -> dict:
-    """Get META.yml content from branch."""
+    """Get META.yml content from branch (cached by tip SHA)."""
     try:
-        import yaml
-        content = subprocess.check_output(
-            ["git", "show", f"{branch}:META.yml"],
-            stderr=subprocess.DEVNULL,
-            encoding="utf-8"
-        )
-        return yaml.safe_load(content)
+        return WorkspaceManager().get_branch_meta(branch) or {}
     except:
         return {}
 
 
-def get_branch_diff(branch: str) -> str:
-    """Get diff statistics."""
-    try:
-        return subprocess.check_output(
-            ["git", "diff", f"main..{branch}", "--stat"],
-            encoding="utf-8"
-        )
-    except:
-        return "No diff available"
+def _diff_numstat_git(branch: str) -> tuple:
+    """([(added, deleted, path), ...], summary line) from `git diff -z --numstat --shortstat`."""
+    output = subprocess.check_output(
+        ["git", "diff", "-z", "--numstat", "--shortstat", f"main..{branch}"]
+    )
+    # NUL-terminated records, then the shortstat line; paths are raw bytes
+    records, _, summary = output.rpartition(b"\0")
+    tokens = records.split(b"\0") if records else []
+    
+    stats = []
+    i = 0
+    while i < len(tokens):
+        added, deleted, path = tokens[i].split(b"\t", 2)
+        i += 1
+        if not path:  # rename/copy: old and new path follow as separate records
+            path = tokens[i] + b" => " + tokens[i + 1]
+            i += 2
+        stats.append((added.decode(), deleted.decode(), path.decode("utf-8", errors="replace")))
+    return stats, summary.decode().rstrip("\n")
+
+
+def _diff_numstat_pygit2(branch: str) -> tuple:
+    """Same as _diff_numstat_git, computed in-process with libgit2."""
+    repo = open_repo()
+    diff = repo.diff(repo.revparse_single("main"), repo.revparse_single(branch))
+    diff.find_similar()  # rename detection, as git diff does by default
+    
+    stats = []
+    for patch in diff:
+        delta = patch.delta
+        path = delta.new_file.path
+        if delta.old_file.path != path:
+            path = f"{delta.old_file.path} => {path}"
+        if delta.is_binary:
+            stats.append(("-", "-", path))
+        else:
+            _, added, deleted = patch.line_stats
+            stats.append((str(added), str(deleted), path))
+    
+    totals = diff.stats
+    summary = ""
+    if totals.files_changed:
+        parts = [f"{totals.files_changed} file{'s' if totals.files_changed != 1 else ''} changed"]
+        if totals.insertions or not totals.deletions:  # git's shortstat rule
+            parts.append(f"{totals.insertions} insertion{'s' if totals.insertions != 1 else ''}(+)")
+        if totals.deletions or not totals.insertions:
+            parts.append(f"{totals.deletions} deletion{'s' if totals.deletions != 1 else ''}(-)")
+        summary = " " + ", ".join(parts)
+    return stats, summary
 
 
-def get_branch_files(branch: str) -> list:
-    """Get list of changed files."""
+def get_branch_summary(branch: str) -> dict:
+    """
+    Get changed files and diff statistics with one git call.
+    
+    Returns:
+        {"files": [...], "diffstat": str} — diffstat is one "file | +a -d"
+        line per file plus git's summary line
+    """
     try:
-        output = subprocess.check_output(
-            ["git", "diff", f"main..{branch}", "--name-only"],
-            encoding="utf-8"
-        )
-        return [f for f in output.strip().split("\n") if f]
+        if pygit2 is not None:
+            stats, summary = _diff_numstat_pygit2(branch)
+        else:
+            stats, summary = _diff_numstat_git(branch)
     except:
-        return []
+        return {"files": [], "diffstat": "No diff available"}
+    
+    files = [path for _, _, path in stats]
+    width = max((len(path) for path in files), default=0)
+    lines = [
+        f" {path:<{width}} | " + ("Bin" if added == "-" else f"+{added} -{deleted}")
+        for added, deleted, path in stats
+    ]
+    if summary:
+        lines.append(summary)
+    return {"files": files, "diffstat": "\n".join(lines)}
 
 
 def get_pending_reviews() -> list:
@@ -60,15 +116,125 @@ def get_pending_reviews() -> list:
     try:
         from services.workspace_manager import WorkspaceManager
         wm = WorkspaceManager()
-        workspaces = wm.list_workspaces()
+        workspaces = wm.list_workspaces(cached=True)
         return [ws for ws in workspaces if ws.get("status") == "review"]
     except Exception as e:
         print(f"Error: {e}")
         return []
 
 
+def has_merge_conflicts(branch: str, into: str = "main") -> list:
+    """
+    Dry-run the merge in memory (`git merge-tree --write-tree`, git >= 2.38).
+    
+    Returns:
+        Conflicting file names; empty if the merge is clean or the check
+        is unavailable (older git), in which case the real merge decides
+    """
+    result = subprocess.run(
+        ["git", "merge-tree", "--write-tree", "--name-only", "-z", into, branch],
+        capture_output=True
+    )
+    if result.returncode != 1 or not result.stdout:
+        return []  # 0 = clean; otherwise error / unsupported (no tree printed)
+    # Output: tree OID, then conflicted file names, then a blank entry and messages
+    entries = result.stdout.split(b"\0")
+    files = []
+    for entry in entries[1:]:
+        if not entry:
+            break
+        files.append(entry.decode("utf-8", errors="replace"))
+    return files or ["(unknown)"]
+
+
+# Worktree removals queued by merge_branch, drained by one reaper thread
+_reap_queue: "queue.Queue[tuple]" = queue.Queue()
+_reaper: Optional[threading.Thread] = None
+
+
+def _reap_loop():
+    """
+    Remove queued worktrees (one worktree-lock hold per batch), then delete
+    their branches; prints what was cleaned up and what was kept.
+    """
+    while True:
+        batch = [_reap_queue.get()]
+        while True:
+            try:
+                batch.append(_reap_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            removed = set()
+            deleted = set()
+            with get_git_lock_manager().worktree_lock():
+                for worktree, _, _ in batch:
+                    if worktree.exists():
+                        result = subprocess.run(
+                            ["git", "worktree", "remove", "--force", str(worktree)],
+                            capture_output=True
+                        )
+                        if result.returncode == 0:
+                            removed.add(worktree)
+            # update-ref doesn't check worktrees, so only branches whose worktree
+            # was just removed go into its transaction (the old SHA makes it refuse
+            # a branch that moved after its merge). The rest go through
+            # `git branch -d`, which refuses a branch still checked out somewhere
+            # (e.g. a locked worktree that remove skipped).
+            known = [(branch, sha) for worktree, branch, sha in batch if sha and worktree in removed]
+            unchecked = [branch for worktree, branch, sha in batch if not (sha and worktree in removed)]
+            if known:
+                script = b"".join(
+                    f"delete refs/heads/{branch}\0{sha}\0".encode("utf-8") for branch, sha in known
+                )
+                result = subprocess.run(["git", "update-ref", "--stdin", "-z"], input=script, capture_output=True)
+                if result.returncode == 0:
+                    deleted.update(branch for branch, _ in known)
+                else:
+                    # The transaction is all-or-nothing: retry one branch at a time
+                    unchecked += [branch for branch, _ in known]
+            for branch in unchecked:
+                if subprocess.run(["git", "branch", "-d", branch], capture_output=True).returncode == 0:
+                    deleted.add(branch)
+            
+            for worktree, branch, _ in batch:
+                kept = [f"worktree {worktree}"] if worktree.exists() else []
+                if branch not in deleted:
+                    kept.append(f"branch {branch}")
+                if kept:
+                    print(f"⚠️ Cleanup for {branch} kept: {', '.join(kept)}")
+                else:
+                    print(f"🧹 Cleaned up {branch}")
+        except Exception as e:
+            print(f"⚠️ Cleanup failed: {e}")
+        finally:
+            for _ in batch:
+                _reap_queue.task_done()
+
+
+def schedule_cleanup(worktree: Path, branch: str, sha: Optional[str] = None) -> None:
+    """
+    Remove `worktree` and delete `branch` in the background; pending work
+    is finished at exit. `sha` is the merged tip: the branch is kept if it
+    has moved since.
+    """
+    global _reaper
+    if _reaper is None:
+        _reaper = threading.Thread(target=_reap_loop, name="worktree-reaper", daemon=True)
+        _reaper.start()
+        atexit.register(_reap_queue.join)
+    _reap_queue.put((worktree, branch, sha))
+
+
 def merge_branch(branch: str, task_id: str) -> bool:
     """Merge branch to main and cleanup."""
+    conflicts = has_merge_conflicts(branch)
+    if conflicts:
+        print(f"❌ Merge would conflict in: {', '.join(conflicts[:5])}")
+        return False
+    
+    sha = WorkspaceManager().branch_sha(branch)  # tip being merged
+    
     try:
         # Switch to main
         subprocess.run(["git", "checkout", "main"], check=True, capture_output=True)
@@ -80,19 +246,8 @@ def merge_branch(branch: str, task_id: str) -> bool:
             capture_output=True
         )
         
-        # Remove worktree
-        worktree = Path(f"worktrees/feat-{task_id}")
-        if worktree.exists():
-            subprocess.run(
-                ["git", "worktree", "remove", "--force", str(worktree)],
-                capture_output=True
-            )
-        
-        # Delete branch
-        subprocess.run(
-            ["git", "branch", "-d", branch],
-            capture_output=True
-        )
+        # Remove worktree and delete branch in the background
+        schedule_cleanup(Path(f"worktrees/feat-{task_id}"), branch, sha)
         
         return True
         
@@ -113,45 +268,64 @@ def reject_task(task_id: str) -> bool:
         return False
 
 
+REVIEW_HEADER_TMPL = """
+{rule}
+  📋 TASK REVIEW: {task_id}
+{rule}"""
+
+REVIEW_BODY_TMPL = """
+
+📄 META.yml:
+{rule}
+  Title:   {title}
+  Agent:   {agent}
+  Status:  {status}
+  Skill:   {skill}
+  XP:      {xp}
+  Created: {created}
+
+📊 GIT DIFF:
+{rule}
+{diff}{files}"""
+
+
 def review_task(task_id: str, auto_approve: bool = False) -> None:
     """Interactive review process."""
     branch = f"feat/{task_id}"
     
-    print("\n" + "=" * 60)
-    print(f"  📋 TASK REVIEW: {task_id}")
-    print("=" * 60)
+    header = REVIEW_HEADER_TMPL.format(rule="=" * 60, task_id=task_id)
     
     # Get META
     meta = get_branch_meta(branch)
     if not meta:
-        print(f"❌ Branch {branch} not found or no META.yml")
+        print(f"{header}\n❌ Branch {branch} not found or no META.yml")
         return
     
-    # Display META
-    print("\n📄 META.yml:")
-    print("-" * 40)
-    print(f"  Title:   {meta.get('title', 'N/A')}")
-    print(f"  Agent:   {meta.get('agent', 'N/A')}")
-    print(f"  Status:  {meta.get('status', 'N/A')}")
-    print(f"  Skill:   {meta.get('skill', 'None')}")
-    print(f"  XP:      {meta.get('xp_reward', 0)}")
-    print(f"  Created: {meta.get('created_at', 'N/A')}")
-    
-    # Display diff
-    print("\n📊 GIT DIFF:")
-    print("-" * 40)
-    diff = get_branch_diff(branch)
-    print(diff if diff.strip() else "  No changes")
-    
-    # Display files
-    files = get_branch_files(branch)
+    summary = get_branch_summary(branch)
+    diff = summary["diffstat"]
+    
+    # Changed files section (limit to 10)
+    files = summary["files"]
+    files_section = ""
     if files:
-        print("\n📁 CHANGED FILES:")
-        print("-" * 40)
-        for f in files[:10]:  # Limit to 10
-            print(f"  • {f}")
+        lines = [f"\n\n📁 CHANGED FILES:\n{'-' * 40}"]
+        lines.extend(f"  • {f}" for f in files[:10])
         if len(files) > 10:
-            print(f"  ... and {len(files) - 10} more")
+            lines.append(f"  ... and {len(files) - 10} more")
+        files_section = "\n".join(lines)
+    
+    # One write for the whole report
+    print(header + REVIEW_BODY_TMPL.format(
+        rule="-" * 40,
+        title=meta.get('title', 'N/A'),
+        agent=meta.get('agent', 'N/A'),
+        status=meta.get('status', 'N/A'),
+        skill=meta.get('skill', 'None'),
+        xp=meta.get('xp_reward', 0),
+        created=meta.get('created_at', 'N/A'),
+        diff=diff if diff.strip() else "  No changes",
+        files=files_section,
+    ))
     
     # Auto-approve check
     if auto_approve:
@@ -159,7 +333,7 @@ def review_task(task_id: str, auto_approve: bool = False) -> None:
         if isinstance(xp, int) and xp >= 80:
             print(f"\n✅ AUTO-APPROVED (XP: {xp} >= 80)")
             if merge_branch(branch, task_id):
-                print("✅ Merged and cleaned up!")
+                print("✅ Merged! Cleanup scheduled.")
             return
         else:
             print(f"\n⚠️ Auto-approve skipped (XP: {xp} < 80)")
@@ -180,7 +354,7 @@ def review_task(task_id: str, auto_approve: bool = False) -> None:
     if choice == "A":
         print("\n⏳ Merging...")
         if merge_branch(branch, task_id):
-            print("✅ Merged and cleaned up!")
+            print("✅ Merged! Cleanup scheduled.")
             print(f"🎉 Task {task_id} completed!")
         else:
             print("❌ Merge failed. Check for conflicts.")
@@ -231,7 +405,7 @@ def main():
     
     else:
         task_id = command
-        auto = "--auto" in sys.argv or "-a" in sys.argv
+        auto = not {"--auto", "-a"}.isdisjoint(sys.argv[2:])
         review_task(task_id, auto_approve=auto)
 
 
@@ -13,22 +13,26 @@ import argparse
 import time
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 import logging
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from services.workspace_manager import WorkspaceManager
-from services.agent_runner import AgentRunner
+from services.agent_runner import AgentRunner, wait_any
+from tools.auto_merge import run_auto_merge
 from config import V2_MAX_PARALLEL_TASKS
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
 logger = logging.getLogger("RunAllTasks")
 
+# Max seconds to block waiting for an agent to exit before re-checking
+WAIT_BACKSTOP = 30
+
 
 def get_pending_tasks(wm: WorkspaceManager) -> List[Dict]:
     """Get all tasks in backlog status."""
-    workspaces = wm.list_workspaces()
+    workspaces = wm.list_workspaces(cached=True)
     return [
         ws for ws in workspaces
         if ws.get("meta", {}).get("status") == "backlog"
@@ -39,7 +43,8 @@ def run_all_tasks(
     parallel: int = 3,
     wait: bool = True,
     timeout: int = 600,
-    agent: str = "cpo"
+    agent: str = "cpo",
+    pending: Optional[List[Dict]] = None
 ):
     """
     Run all pending tasks.
@@ -49,9 +54,11 @@ def run_all_tasks(
         wait: Wait for completion
         timeout: Timeout per task in seconds
         agent: Agent to use
+        pending: Tasks from get_pending_tasks(), if the caller already has them
     """
     wm = WorkspaceManager()
-    pending = get_pending_tasks(wm)
+    if pending is None:
+        pending = get_pending_tasks(wm)
     
     logger.info("=" * 60)
     logger.info(f"RUN ALL TASKS (parallel={parallel}, wait={wait})")
@@ -87,26 +94,24 @@ def run_all_tasks(
             logger.info(f"Started {len(active_runners)} tasks (not waiting)")
             break
         
-        # Check for completed tasks
-        for task_id in list(active_runners.keys()):
-            runner = active_runners[task_id]
+        # Block until agents exit (pidfd/kqueue), then check only those
+        for runner in wait_any(active_runners.values(), timeout=WAIT_BACKSTOP):
+            if runner.is_running():
+                continue
+            task_id = runner.task_id
             
-            if not runner.is_running():
-                # Check result
-                meta = wm.get_meta(task_id)
-                status = meta.get("status", "unknown") if meta else "unknown"
-                
-                if status == "completed":
-                    logger.info(f"Completed: {task_id}")
-                    completed += 1
-                else:
-                    logger.warning(f"Failed: {task_id} (status={status})")
-                    failed += 1
-                
-                del active_runners[task_id]
-        
-        if active_runners:
-            time.sleep(2)  # Poll interval
+            # Check result
+            meta = wm.get_meta(task_id)
+            status = meta.get("status", "unknown") if meta else "unknown"
+            
+            if status == "completed":
+                logger.info(f"Completed: {task_id}")
+                completed += 1
+            else:
+                logger.warning(f"Failed: {task_id} (status={status})")
+                failed += 1
+            
+            del active_runners[task_id]
     
     logger.info("=" * 60)
     logger.info(f"Completed: {completed}")
@@ -142,13 +147,12 @@ def ralph_loop_mode(max_iterations: int = 100):
             logger.info("No more pending tasks. Exiting.")
             break
         
-        result = run_all_tasks(parallel=3, wait=True, timeout=300)
+        result = run_all_tasks(parallel=3, wait=True, timeout=300, pending=pending)
         total_completed += result.get("completed", 0)
         total_failed += result.get("failed", 0)
         
         # Auto-merge successful tasks
         logger.info("\nChecking for auto-merge...")
-        from tools.auto_merge import run_auto_merge
         run_auto_merge(min_xp=50, dry_run=False)
         
         # Wait before next iteration